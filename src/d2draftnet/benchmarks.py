@@ -0,0 +1,666 @@
+# ========================================================
+# benchmarks.py
+# ========================================================
+# Throughput benchmarks for the data and model code paths.
+# Run with: python -m d2draftnet.benchmarks <command>
+
+import subprocess
+import sys
+import time
+import click as ck
+
+from .match_store import match_source
+
+
+def _report(name: str, n: int, seconds: float, unit: str = "samples"):
+    """Print a single benchmark line."""
+    rate = n / seconds if seconds > 0 else float("inf")
+    ck.secho(f"{name:<32} {n:>10,} {unit} in {seconds:8.3f}s  ->  {rate:>14,.0f} {unit}/sec", fg="green")
+
+
+# Cumulative import time budget (seconds, checked by the imports benchmark) and heavy
+# packages each module must not pull in (also checked by tests/test_import_time.py)
+IMPORT_BUDGETS = {
+    "d2draftnet.config": (0.05, ("numpy", "pandas", "click", "torch")),
+    "d2draftnet.numpy_predictor": (0.5, ("pandas", "torch")),
+    "d2draftnet.collect_match_data": (0.5, ("pandas", "bs4", "torch")),
+    "d2draftnet.predict_embedding_model": (5.0, ("pandas", "sklearn", "scipy", "matplotlib")),
+    "d2draftnet.train_embedding_model": (5.0, ("pandas", "sklearn", "scipy", "matplotlib")),
+}
+
+
+def measure_import(module: str):
+    """
+    Import a module in a fresh interpreter with python -X importtime.
+
+    Returns:
+        tuple: (cumulative import time in seconds, set of top-level packages imported)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    seconds, packages = 0.0, set()
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            seconds = int(fields[1]) / 1e6
+    return seconds, packages
+
+
+@ck.group()
+def cli():
+    """D2DraftNet benchmarks."""
+
+
+@cli.command()
+@ck.option("--batch-size", default=64, show_default=True)
+@ck.option("--epochs", default=3, show_default=True)
+def dataset(batch_size: int, epochs: int):
+    """Samples/sec of the per-row dataset vs the pre-encoded dataset."""
+    import torch
+    from torch.utils.data import DataLoader
+    from .config import load_data
+    from .embedding_model import Dota2DraftDataset, DraftBatchSampler, EncodedDraftDataset
+    from .encoding import encode_results
+
+    data = load_data()
+    labels = encode_results(data["result"])
+    print(f"Benchmarking {len(data):,} matches from {match_source()}")
+
+    for name, dataset_cls in [("Dota2DraftDataset", Dota2DraftDataset),
+                              ("EncodedDraftDataset", EncodedDraftDataset.from_dataframe)]:
+        start = time.perf_counter()
+        ds = dataset_cls(data, labels)
+        _report(f"{name} (construct)", len(ds), time.perf_counter() - start)
+
+        loader = DataLoader(ds, batch_size=batch_size, shuffle=True, collate_fn=lambda x: tuple(zip(*x)))
+        start = time.perf_counter()
+        for _ in range(epochs):
+            for radiant_team, dire_team, batch_labels in loader:
+                torch.stack(radiant_team), torch.stack(dire_team), torch.stack(batch_labels)
+        _report(f"{name} (iterate)", epochs * len(ds), time.perf_counter() - start)
+
+    ds = EncodedDraftDataset.from_dataframe(data, labels)
+    loader = DataLoader(ds, sampler=DraftBatchSampler(len(ds), batch_size, shuffle=True), batch_size=None)
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for radiant_team, dire_team, batch_labels in loader:
+            pass
+    _report("DraftBatchSampler (iterate)", epochs * len(ds), time.perf_counter() - start)
+
+
+@cli.command()
+@ck.option("--batch-size", default=64, show_default=True)
+def cache(batch_size: int):
+    """Cold vs warm start to the first training batch via the draft cache."""
+    from torch.utils.data import DataLoader
+    from .draft_cache import load_encoded_drafts
+    from .embedding_model import DraftBatchSampler, EncodedDraftDataset
+
+    for name, rebuild in [("cold (encode + write)", True), ("warm (mmap load)", False)]:
+        start = time.perf_counter()
+        ds = EncodedDraftDataset.from_encoded(load_encoded_drafts(rebuild=rebuild))
+        loader = DataLoader(ds, sampler=DraftBatchSampler(len(ds), batch_size, shuffle=True), batch_size=None)
+        next(iter(loader))
+        _report(f"first batch, {name}", len(ds), time.perf_counter() - start)
+
+
+@cli.command()
+@ck.option("--calls", default=200, show_default=True)
+def predict(calls: int):
+    """Latency of per-call predict_draft vs the resident DraftPredictor."""
+    from .predict_embedding_model import DraftPredictor, predict_draft
+
+    radiant_heroes = ["Lycan", "Enchantress", "Dragon Knight", "Lion", "Ember Spirit"]
+    dire_heroes = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        predict_draft(radiant_heroes, dire_heroes)
+    seconds = time.perf_counter() - start
+    _report("predict_draft", calls, seconds, unit="predictions")
+    print(f"{'':<32} {seconds / calls * 1e6:,.0f} us/prediction")
+
+    predictor = DraftPredictor()
+    predictor.predict(radiant_heroes, dire_heroes)
+    start = time.perf_counter()
+    for _ in range(calls):
+        predictor.predict(radiant_heroes, dire_heroes)
+    seconds = time.perf_counter() - start
+    _report("DraftPredictor.predict", calls, seconds, unit="predictions")
+    print(f"{'':<32} {seconds / calls * 1e6:,.0f} us/prediction")
+
+
+@cli.command()
+@ck.option("--chunk-size", default=65536, show_default=True)
+def backtest(chunk_size: int):
+    """Drafts/sec of a Python loop over DraftPredictor.predict vs predict_drafts."""
+    from .config import load_data
+    from .encoding import encode_results
+    from .predict_embedding_model import DraftPredictor
+
+    data = load_data()
+    predictor = DraftPredictor()
+
+    start = time.perf_counter()
+    looped = [predictor.predict(r, d) for r, d in zip(data["radiant_draft"], data["dire_draft"])]
+    _report("loop over predict", len(data), time.perf_counter() - start, unit="drafts")
+
+    start = time.perf_counter()
+    probabilities = predictor.predict_drafts(data, chunk_size=chunk_size)
+    _report("predict_drafts", len(data), time.perf_counter() - start, unit="drafts")
+
+    accuracy = ((probabilities > 0.5) == encode_results(data["result"]).astype(bool)).mean()
+    print(f"Max abs difference: {abs(probabilities - looped).max():.2e}, backtest accuracy: {accuracy:.2%}")
+
+
+@cli.command()
+@ck.option("--events", default=200, show_default=True)
+def picks(events: int):
+    """Next-pick recommendations/sec: one predict per candidate vs PickRecommender."""
+    from .config import HEROS
+    from .pick_recommender import PickRecommender
+    from .predict_embedding_model import DraftPredictor
+
+    predictor = DraftPredictor()
+    recommender = PickRecommender(predictor)
+    radiant_heroes = ["Lycan", "Enchantress", "Dragon Knight", "Lion"]
+    dire_heroes = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
+    candidates = [hero for hero in HEROS if hero not in radiant_heroes + dire_heroes]
+
+    start = time.perf_counter()
+    for _ in range(max(events // 20, 1)):
+        sorted(candidates, key=lambda hero: predictor.predict(radiant_heroes + [hero], dire_heroes))
+    _report("predict per candidate", max(events // 20, 1), time.perf_counter() - start, unit="events")
+
+    start = time.perf_counter()
+    for _ in range(events):
+        recommender.recommend(radiant_heroes, dire_heroes, side="radiant", top_k=10)
+    _report("PickRecommender.recommend", events, time.perf_counter() - start, unit="events")
+
+
+@cli.command()
+@ck.option("--beam-width", default=8, show_default=True)
+@ck.option("--max-nodes", default=2_000_000, show_default=True)
+@ck.option("--time-budget", default=None, type=float)
+def search(beam_width: int, max_nodes: int, time_budget):
+    """Nodes evaluated per second by the lookahead draft search."""
+    from .draft_search import DraftSearch
+
+    searcher = DraftSearch(beam_width=beam_width, max_nodes=max_nodes, time_budget=time_budget)
+    for radiant_heroes, dire_heroes in [(["Lycan", "Enchantress", "Dragon Knight"], ["Gyrocopter", "Terrorblade"]),
+                                        (["Lycan"], ["Gyrocopter"])]:
+        result = searcher.search(radiant_heroes, dire_heroes)
+        _report(f"search {len(radiant_heroes)}v{len(dire_heroes)}, depth {result.depth}", result.nodes,
+                result.elapsed, unit="nodes")
+
+
+@cli.command()
+@ck.option("--teams", default=200, show_default=True, help="Radiant teams scanned against every dire team.")
+@ck.option("--cache-size", default=100_000, show_default=True)
+def matchups(teams: int, cache_size: int):
+    """Matchup scan throughput with and without the team embedding cache."""
+    import numpy as np
+    from .config import load_data
+    from .encoding import encode_drafts
+    from .predict_embedding_model import DraftPredictor
+
+    data = load_data()
+    radiant = encode_drafts(data["radiant_draft"].head(teams))
+    dire = encode_drafts(data["dire_draft"])
+    radiant_scan = np.repeat(radiant, len(dire), axis=0)
+    dire_scan = np.tile(dire, (len(radiant), 1))
+    print(f"Scanning {len(radiant):,} radiant teams against {len(dire):,} dire teams from {match_source()}")
+
+    predictor = DraftPredictor()
+    start = time.perf_counter()
+    predictor.predict_drafts(radiant_scan, dire_scan)
+    _report("predict_drafts (no cache)", len(radiant_scan), time.perf_counter() - start, unit="drafts")
+
+    cached = DraftPredictor(team_cache_size=cache_size)
+    for name in ["cold cache", "warm cache"]:
+        start = time.perf_counter()
+        cached.predict_drafts(radiant_scan, dire_scan)
+        _report(f"predict_drafts ({name})", len(radiant_scan), time.perf_counter() - start, unit="drafts")
+        print(f"{'':<32} hit rate {cached.team_cache.hit_rate:.2%}, {len(cached.team_cache.vectors):,} cached teams")
+
+
+@cli.command(name="numpy")
+@ck.option("--calls", default=2000, show_default=True)
+def numpy_predictor(calls: int):
+    """Single-draft latency and batch throughput of the torch vs NumPy predictors."""
+    from .config import load_data
+    from .numpy_predictor import NumpyDraftPredictor
+    from .predict_embedding_model import DraftPredictor
+
+    data = load_data()
+    radiant_heroes = ["Lycan", "Enchantress", "Dragon Knight", "Lion", "Ember Spirit"]
+    dire_heroes = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
+
+    for name, predictor in [("DraftPredictor", DraftPredictor()), ("NumpyDraftPredictor", NumpyDraftPredictor())]:
+        start = time.perf_counter()
+        for _ in range(calls):
+            predictor.predict(radiant_heroes, dire_heroes)
+        _report(f"{name}.predict", calls, time.perf_counter() - start, unit="predictions")
+
+        start = time.perf_counter()
+        predictor.predict_drafts(data)
+        _report(f"{name}.predict_drafts", len(data), time.perf_counter() - start, unit="drafts")
+
+
+@cli.command()
+def imports():
+    """Import time of the package entry points against IMPORT_BUDGETS."""
+    failed = False
+    for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+        seconds, packages = measure_import(module)
+        heavy = sorted(set(forbidden) & packages)
+        ok = seconds <= budget and not heavy
+        failed |= not ok
+        note = f"  imports {', '.join(heavy)}" if heavy else ""
+        ck.secho(f"{module:<36} {seconds * 1e3:8.1f} ms (budget {budget * 1e3:6.0f} ms){note}",
+                 fg="green" if ok else "red")
+    sys.exit(1 if failed else 0)
+
+
+@cli.command()
+@ck.option("--latency", default=0.2, show_default=True, help="Simulated server latency per page (s).")
+@ck.option("--concurrency", default=8, show_default=True)
+@ck.option("--parse-processes", default=4, show_default=True)
+def scrape(latency: float, concurrency: int, parse_processes: int):
+    """Pages/sec of sequential vs concurrent fetching from a local stub server."""
+    from .collect_match_data import fetch_pages
+    from .stub_server import StubDotabuffServer, stub_pages_from_parquet
+
+    pages = stub_pages_from_parquet()
+    settings = [(1, 0), (concurrency, 0), (concurrency, parse_processes)]
+    with StubDotabuffServer(pages, delay=latency) as stub:
+        for workers, processes in settings:
+            start = time.perf_counter()
+            fetcher = fetch_pages(base_url=stub.base_url, concurrency=workers, rate_limit=None,
+                                  parse_processes=processes)
+            fetched = sum(1 for _ in zip(range(len(pages)), fetcher))
+            fetcher.close()
+            _report(f"fetch_pages, {workers} threads, {processes} parse procs", fetched,
+                    time.perf_counter() - start, unit="pages")
+
+
+@cli.command()
+@ck.option("--pages", default=20, show_default=True, help="Rendered pages of 50 matches to parse.")
+def parse(pages: int):
+    """Rows/sec of the BeautifulSoup vs the streaming match table parser."""
+    from .match_table import extract_matches, extract_matches_bs4
+    from .stub_server import render_matches_page, stub_pages_from_parquet
+
+    html = [render_matches_page(page) for page in stub_pages_from_parquet(max_pages=pages)]
+    for name, extract in [("extract_matches_bs4", extract_matches_bs4), ("extract_matches", extract_matches)]:
+        start = time.perf_counter()
+        rows = sum(len(extract(page)) for page in html)
+        _report(name, rows, time.perf_counter() - start, unit="rows")
+
+
+
+@cli.command()
+@ck.option("--rows", default=1_000_000, show_default=True, help="Rows already in the dataset.")
+@ck.option("--batch", default=1_000, show_default=True, help="New matches to add.")
+def ingest(rows: int, batch: int):
+    """Cost of adding a batch of matches: parquet rewrite vs store append."""
+    import tempfile
+    from pathlib import Path
+    import pandas as pd
+    from .config import load_data
+    from .match_index import MatchIdIndex
+    from .match_store import append_matches, partition_dir, read_table
+
+    data = load_data()
+    existing = pd.concat([data] * (rows // len(data) + 1), ignore_index=True).head(rows)
+    existing["id"] = [str(10**10 + i) for i in range(rows)]
+    new = data.head(batch)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        parquet_file = tmp / "match_data.parquet"
+        existing.to_parquet(parquet_file, index=False)
+        append_matches(existing, tmp / "store", patch="bench")
+        print(f"Adding {batch:,} matches to {rows:,}")
+
+        start = time.perf_counter()
+        combined = pd.concat([pd.read_parquet(parquet_file), new], ignore_index=True)
+        combined.to_parquet(parquet_file, index=False)
+        _report("read + concat + rewrite", batch, time.perf_counter() - start, unit="matches")
+
+        start = time.perf_counter()
+        append_matches(new, tmp / "store", patch="bench")
+        _report("append_matches", batch, time.perf_counter() - start, unit="matches")
+
+        start = time.perf_counter()
+        read_table(partition_dir(tmp / "store", "bench"), columns=["id"])
+        _report("read id column (de-duplication)", rows, time.perf_counter() - start, unit="ids")
+
+        MatchIdIndex(tmp / "store").merge()
+        start = time.perf_counter()
+        index = MatchIdIndex(tmp / "store")
+        _report("open MatchIdIndex", len(index), time.perf_counter() - start, unit="ids")
+        start = time.perf_counter()
+        sum(match_id in index for match_id in new["id"])
+        _report("MatchIdIndex lookups", batch, time.perf_counter() - start, unit="ids")
+
+
+
+@cli.command()
+@ck.option("--rows", default=500_000, show_default=True)
+def schema(rows: int):
+    """File size and load time of the v1 vs v2 match schema."""
+    import tempfile
+    from pathlib import Path
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from .draft_cache import encode_match_frame, encode_match_table
+    from .match_schema import HERO_COLUMNS, schema_v1
+    from .match_store import match_source, read_table
+    from .migrate_schema import migrate_file
+
+    # Rows sampled with replacement, so the files do not compress a repeated block
+    v1 = read_table(match_source())
+    v1 = v1.take(np.random.default_rng(0).integers(0, v1.num_rows, rows))
+    v1 = v1.set_column(0, "id", pa.array([str(8 * 10**9 + i) for i in range(rows)]))
+    with tempfile.TemporaryDirectory() as tmp:
+        v1_path, v2_path = Path(tmp) / "v1.parquet", Path(tmp) / "v2.parquet"
+        pq.write_table(v1, v1_path)
+        migrate_file(v1_path, v2_path)
+        print(f"{rows:,} matches: v1 {v1_path.stat().st_size:,} bytes, v2 {v2_path.stat().st_size:,} bytes")
+
+        start = time.perf_counter()
+        pq.read_table(v1_path, schema=schema_v1()).to_pandas()
+        _report("v1 full load", rows, time.perf_counter() - start, unit="matches")
+        start = time.perf_counter()
+        read_table(v2_path).to_pandas()
+        _report("v2 full load as v1 records", rows, time.perf_counter() - start, unit="matches")
+
+        start = time.perf_counter()
+        encode_match_frame(pq.read_table(v1_path, columns=["radiant_draft", "dire_draft", "result"]).to_pandas())
+        _report("v1 drafts + result -> encoded", rows, time.perf_counter() - start, unit="matches")
+        start = time.perf_counter()
+        encode_match_table(read_table(v2_path, columns=HERO_COLUMNS + ["radiant_win"], version=2))
+        _report("v2 hero columns -> encoded", rows, time.perf_counter() - start, unit="matches")
+
+
+@cli.command()
+@ck.option("--rows", default=300_000, show_default=True, help="Matches per patch.")
+@ck.option("--fragment-rows", default=10_000, show_default=True, help="Matches per store fragment.")
+@ck.option("--since", default="2025-06-20", show_default=True, help="Date filter of the filtered load.")
+def load(rows: int, fragment_rows: int, since: str):
+    """Multi-patch loads: every column vs projected columns vs pushed-down filters."""
+    import tempfile
+    from pathlib import Path
+    import numpy as np
+    import pyarrow as pa
+    from .match_schema import HERO_COLUMNS
+    from .match_store import _fragment_name, _write_atomic, legacy_path, partition_dir, read_patches, read_table
+
+    patches = ["7_38b", "7_39b", "7_39c"]
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Path(tmp)
+        # Rows sampled with replacement and written in date order, as the scraper appends them
+        for p, patch in enumerate(patches):
+            table = read_table(legacy_path(patch), version=2)
+            table = table.take(np.sort(rng.integers(0, table.num_rows, rows)))
+            table = table.set_column(0, "id", pa.array(np.arange(rows, dtype=np.int64) + (p + 1) * 10**10))
+            for start in range(0, rows, fragment_rows):
+                _write_atomic(table.slice(start, fragment_rows), partition_dir(store, patch, "2025-07-11") / _fragment_name())
+        print(f"{len(patches)} patches x {rows:,} matches in fragments of {fragment_rows:,}")
+
+        n = len(patches) * rows
+        start = time.perf_counter()
+        read_patches(patches, store=store).to_pandas()
+        _report("all columns (load_data)", n, time.perf_counter() - start, unit="matches")
+
+        start = time.perf_counter()
+        read_patches(patches, ["skill", "result"], store=store).to_pandas()
+        _report("skill + result columns", n, time.perf_counter() - start, unit="matches")
+
+        start = time.perf_counter()
+        read_patches(patches, HERO_COLUMNS + ["radiant_win"], version=2, store=store)
+        _report("training columns (v2)", n, time.perf_counter() - start, unit="matches")
+
+        # Date filters skip whole row groups by their statistics; skill only drops rows
+        for name, filters in [(f"date >= {since}", [("date", ">=", since)]),
+                              ("ranked", [("skill", "==", "Ranked Matchmaking")])]:
+            start = time.perf_counter()
+            table = read_patches(patches, HERO_COLUMNS + ["radiant_win"], version=2, filters=filters, store=store)
+            _report(f"  {name}", n, time.perf_counter() - start, unit="matches")
+            print(f"  {table.num_rows:,} matches kept")
+
+
+@cli.command()
+@ck.option("--rows", default=2_000_000, show_default=True)
+@ck.option("--fragment-rows", default=50_000, show_default=True, help="Matches per store fragment.")
+@ck.option("--buffer-size", default=65_536, show_default=True)
+@ck.option("--mode", type=ck.Choice(["both", "memory", "streaming"]), default="both", hidden=True)
+@ck.option("--store", type=ck.Path(path_type=str), default=None, hidden=True)
+def stream(rows: int, fragment_rows: int, buffer_size: int, mode: str, store):
+    """Peak RSS and time of one training epoch: in-memory split vs streamed row groups."""
+    import resource
+    import numpy as np
+    from pathlib import Path
+
+    if mode == "both":
+        import tempfile
+        import pyarrow as pa
+        from .match_store import _fragment_name, _write_atomic, partition_dir, read_table
+
+        source = read_table(match_source(), version=2)
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as tmp:
+            for start in range(0, rows, fragment_rows):
+                n = min(fragment_rows, rows - start)
+                table = source.take(rng.integers(0, source.num_rows, n))
+                table = table.set_column(0, "id", pa.array(np.arange(start, start + n, dtype=np.int64) + 10**10))
+                _write_atomic(table, partition_dir(Path(tmp), "bench", "2025-07-11") / _fragment_name())
+            print(f"{rows:,} matches in fragments of {fragment_rows:,}, buffer {buffer_size:,}")
+            # Each mode runs in a fresh process so its peak RSS is its own
+            for child_mode in ("memory", "streaming"):
+                subprocess.run([sys.executable, "-m", "d2draftnet.benchmarks", "stream", "--mode", child_mode,
+                                "--store", tmp, "--buffer-size", str(buffer_size)], check=True)
+        return
+
+    import torch
+    from torch.utils.data import DataLoader
+    from .draft_cache import encode_match_table
+    from .embedding_model import DraftBatchSampler, EncodedDraftDataset, StreamingDraftDataset, in_test_split
+    from .match_schema import HERO_COLUMNS
+    from .match_store import read_table
+
+    def peak_mb():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    baseline = peak_mb()
+    start = time.perf_counter()
+    if mode == "memory":
+        # What ModelTraining does: load every match, then copy the train and test rows
+        table = read_table(Path(store), HERO_COLUMNS + ["id", "radiant_win"], version=2)
+        data = encode_match_table(table)
+        in_test = in_test_split(table.column("id").to_numpy(), 0.2)
+        del table
+        train = EncodedDraftDataset.from_encoded(data[~in_test])
+        test = EncodedDraftDataset.from_encoded(data[in_test])
+        loader = DataLoader(train, sampler=DraftBatchSampler(len(train), 1024, shuffle=True, seed=0), batch_size=None)
+    else:
+        train = StreamingDraftDataset([store], 1024, buffer_size=buffer_size, shuffle=True, seed=0)
+        loader = DataLoader(train, batch_size=None)
+    n = 0
+    for _, _, labels in loader:
+        n += len(labels)
+    _report(f"{mode} epoch", n, time.perf_counter() - start, unit="matches")
+    print(f"  peak RSS {peak_mb():,.0f} MB ({peak_mb() - baseline:+,.0f} MB over the imports)")
+
+
+def _int_list(ctx, param, value: str):
+    return [int(item) for item in value.split(",")]
+
+
+@cli.command()
+@ck.option("--threads", default="1,0", show_default=True, callback=_int_list,
+           help="torch.set_num_threads values; 0 keeps torch's default.")
+@ck.option("--workers", default="0,2", show_default=True, callback=_int_list, help="DataLoader worker counts.")
+@ck.option("--batch-sizes", default="64,512,2048", show_default=True, callback=_int_list)
+@ck.option("--epochs", default=2, show_default=True)
+@ck.option("--lr-scaling", type=ck.Choice(["none", "linear", "sqrt"]), default="sqrt", show_default=True)
+@ck.option("--patches", default="7_38b,7_39b,7_39c", show_default=True, help="Bundled patches to train on.")
+def cpu(threads, workers, batch_sizes, epochs: int, lr_scaling: str, patches: str):
+    """Epoch time of ModelTraining over thread, worker and batch size settings."""
+    import contextlib
+    import io
+    import os
+    import warnings
+    import torch
+    from .train_embedding_model import ModelTraining
+
+    # More workers than cores is part of the sweep
+    warnings.filterwarnings("ignore", message=".*worker processes in total")
+    default_threads = torch.get_num_threads()
+    print(f"{os.cpu_count()} CPUs, torch default {default_threads} threads, {epochs} epochs per setting")
+    ck.echo(f"{'threads':>7} {'workers':>7} {'batch':>6} {'lr':>9} {'epoch s':>8} {'samples/s':>11} {'test acc':>8}")
+    for num_threads in threads:
+        for num_workers in workers:
+            for batch_size in batch_sizes:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    trainer = ModelTraining(
+                        embedding_dim=3, dropout_prob=1e-3, batch_size=batch_size, learning_rate=5e-4,
+                        epochs=epochs, layers=[32, 16], train_test_split=0.2, seed=0, patches=patches.split(","),
+                        num_threads=num_threads or default_threads, num_workers=num_workers,
+                        persistent_workers=num_workers > 0, lr_scaling=None if lr_scaling == "none" else lr_scaling,
+                    )
+                    start = time.perf_counter()
+                    trainer.train_model(show_plot=False, verbose=False)
+                    seconds = (time.perf_counter() - start) / epochs
+                    accuracy = trainer.evaluate_model()
+                ck.echo(f"{num_threads or default_threads:>7} {num_workers:>7} {batch_size:>6} "
+                        f"{trainer.scaled_learning_rate():>9.2e} {seconds:>8.3f} "
+                        f"{len(trainer.train_data) / seconds:>11,.0f} {accuracy:>8.2%}")
+    torch.set_num_threads(default_threads)
+
+
+@cli.command()
+@ck.option("--patch", default="7_38b", show_default=True, help="Bundled patch to train on.")
+@ck.option("--batch-size", default=64, show_default=True)
+@ck.option("--epochs", default=10, show_default=True)
+@ck.option("--compile/--no-compile", "use_compile", default=True, show_default=True,
+           help="Include the torch.compile variant (compiling takes a while).")
+def engine(patch: str, batch_size: int, epochs: int, use_compile: bool):
+    """Steps/sec and epoch time of the DataLoader loop vs the resident-tensor engine."""
+    import contextlib
+    import io
+    from .match_store import legacy_path
+    from .train_embedding_model import ModelTraining
+
+    variants = [("loader", "loader", False), ("resident", "resident", False)]
+    if use_compile:
+        variants.append(("resident + torch.compile", "resident", True))
+    for name, engine_name, compiled in variants:
+        with contextlib.redirect_stdout(io.StringIO()):
+            trainer = ModelTraining(
+                embedding_dim=3, dropout_prob=1e-3, batch_size=batch_size, learning_rate=5e-4, epochs=1,
+                layers=[32, 16], train_test_split=0.2, seed=0, source=legacy_path(patch), engine=engine_name,
+                compile=compiled,
+            )
+            # One warm-up epoch, which is where compilation happens
+            start = time.perf_counter()
+            trainer.train_model(show_plot=False, verbose=False)
+            warmup = time.perf_counter() - start
+            trainer.epochs = epochs
+            start = time.perf_counter()
+            trainer.train_model(show_plot=False, verbose=False)
+            seconds = time.perf_counter() - start
+        steps = epochs * -(-len(trainer.train_data) // batch_size)
+        _report(name, steps, seconds, unit="steps")
+        print(f"  {seconds / epochs * 1e3:.1f} ms/epoch, first epoch {warmup:.2f}s, "
+              f"test accuracy {trainer.evaluate_model():.2%}")
+
+
+@cli.command()
+@ck.option("--previous", default="7_38b,7_39b", show_default=True, help="Bundled patches of the previous model.")
+@ck.option("--new", "new_patch", default="7_39c", show_default=True, help="Bundled patch of the newly scraped data.")
+@ck.option("--patience", default=3, show_default=True)
+@ck.option("--min-delta", default=1e-3, show_default=True, help="Smallest test log-loss decrease that counts.")
+@ck.option("--max-epochs", default=100, show_default=True)
+def warm(previous: str, new_patch: str, patience: int, min_delta: float, max_epochs: int):
+    """Time to early stopping of a cold retrain on all patches vs a warm start fine-tuned on the new patch."""
+    import contextlib
+    import io
+    import tempfile
+    from pathlib import Path
+    from .match_store import legacy_path
+    from .train_embedding_model import ModelTraining
+
+    params = dict(embedding_dim=3, dropout_prob=1e-3, batch_size=64, learning_rate=5e-4, epochs=max_epochs,
+                  layers=[32, 16], train_test_split=0.2, seed=0, patience=patience, min_delta=min_delta,
+                  engine="resident")
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        # The model of the previous patches, which the warm start begins from
+        trainer = ModelTraining(**params, patches=previous.split(","))
+        trainer.train_model(show_plot=False, verbose=False)
+        trainer.save_model(Path(tmp) / "previous.pth", overwrite=True)
+        variants = [
+            ("cold, all patches", dict(patches=previous.split(",") + [new_patch])),
+            ("cold, new patch", dict(source=legacy_path(new_patch))),
+            ("warm, new patch", dict(source=legacy_path(new_patch), warm_start=Path(tmp) / "previous.pth")),
+        ]
+        results = []
+        for name, options in variants:
+            start = time.perf_counter()
+            trainer = ModelTraining(**params, **options)
+            trainer.train_model(show_plot=False, verbose=False)
+            best = trainer.history.epochs[trainer.early_stopping.best_epoch]["test"]
+            results.append((name, time.perf_counter() - start, len(trainer.history.epochs), best))
+
+    cold_seconds = results[0][1]
+    for name, seconds, epochs, best in results:
+        print(f"{name:<20} {seconds:7.2f}s  {seconds / cold_seconds:5.0%} of cold  {epochs:3d} epochs  "
+              f"test log-loss {best['log_loss']:.4f}  accuracy {best['accuracy']:.2%} (n = {best['samples']:,})")
+
+
+@cli.command()
+@ck.option("--patches", default="7_38b,7_39b,7_39c", show_default=True, help="Bundled patches, oldest first.")
+@ck.option("--half-life-days", default=30.0, show_default=True)
+@ck.option("--epochs", default=5, show_default=True)
+def weighted(patches: str, half_life_days: float, epochs: int):
+    """Multi-patch load time (parquet vs cached) and epoch time with and without decayed sample weights."""
+    import contextlib
+    import io
+    from .draft_cache import PATCH_TABLE_COLUMNS, encode_patch_table, load_patch_drafts
+    from .match_store import read_patches
+    from .train_embedding_model import ModelTraining
+
+    patches = patches.split(",")
+    start = time.perf_counter()
+    encoded = encode_patch_table(read_patches(patches, PATCH_TABLE_COLUMNS, version=2), patches)
+    print(f"{'read parquet + encode':<28} {time.perf_counter() - start:8.3f}s  ({len(encoded):,} matches)")
+    start = time.perf_counter()
+    load_patch_drafts(patches, half_life_days, rebuild=True)
+    print(f"{'build cache + weights':<28} {time.perf_counter() - start:8.3f}s")
+    start = time.perf_counter()
+    _, weights = load_patch_drafts(patches, half_life_days)
+    print(f"{'cached load':<28} {time.perf_counter() - start:8.3f}s  "
+          f"(weights {weights.min():.2f} to {weights.max():.2f})")
+
+    for name, decay in [("unweighted", None), (f"half-life {half_life_days:g} days", half_life_days)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            trainer = ModelTraining(
+                embedding_dim=3, dropout_prob=1e-3, batch_size=64, learning_rate=5e-4, epochs=epochs,
+                layers=[32, 16], train_test_split=0.2, seed=0, patches=patches, half_life_days=decay,
+                engine="resident",
+            )
+            trainer.train_model(show_plot=False, verbose=False)
+        seconds = sum(sum(record["timings"].values()) for record in trainer.history.epochs)
+        print(f"{name:<28} {seconds / epochs * 1e3:8.1f} ms/epoch  "
+              f"test log-loss {trainer.history.epochs[-1]['test']['log_loss']:.4f}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,77 @@
+# ========================================================
+# checkpoints.py
+# ========================================================
+# Training checkpoints and early stopping.
+#
+# A checkpoint directory holds two files, rewritten atomically after each
+# epoch so a crash never leaves a partial file behind:
+#
+#     best.pt  state at the epoch with the lowest test log-loss so far
+#     last.pt  state after the latest epoch, used to resume training
+#
+# Each holds the model and optimizer state dicts, the epoch and step counts,
+# the training history, the early stopping state, the random generator states
+# and the model hyperparameters (so a mismatched model is refused on resume).
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+import math
+import os
+import torch
+
+BEST_CHECKPOINT = "best.pt"
+LAST_CHECKPOINT = "last.pt"
+
+
+def save_checkpoint(state: Dict[str, Any], path: Path):
+    """Write a checkpoint next to path under a hidden name, then rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    torch.save(state, tmp)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: Path) -> Dict[str, Any]:
+    """
+    Read a checkpoint written by save_checkpoint.
+
+    Checkpoints hold plain Python containers next to the tensors, so they are
+    loaded with weights_only=False; only load checkpoints you wrote.
+    """
+    return torch.load(path, map_location="cpu", weights_only=False)
+
+
+@dataclass
+class EarlyStopping:
+    """
+    Stop once a metric to minimise has not improved for patience epochs.
+
+    Args:
+        patience (int): Epochs without improvement before stopping, never stop if None.
+        min_delta (float): Decrease below the best value that counts as an improvement.
+    """
+    patience: Optional[int] = None
+    min_delta: float = 0.0
+    best: float = math.inf
+    best_epoch: int = -1
+    bad_epochs: int = 0
+
+    def update(self, value: float, epoch: int) -> bool:
+        """Record an epoch's value; returns True if it is the new best."""
+        if value < self.best - self.min_delta:
+            self.best, self.best_epoch, self.bad_epochs = value, epoch, 0
+            return True
+        self.bad_epochs += 1
+        return False
+
+    @property
+    def should_stop(self) -> bool:
+        return self.patience is not None and self.bad_epochs >= self.patience
+
+    def state_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        # The stopping rule comes from the current run, only the progress is restored
+        self.best, self.best_epoch, self.bad_epochs = state["best"], state["best_epoch"], state["bad_epochs"]
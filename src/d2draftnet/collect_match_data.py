@@ -1,110 +1,258 @@
 # ========================================================
 # collect_match_data.py
 # ========================================================
-# This script scrapes Dota 2 match data from Dotabuff and saves it to a parquet file.
+# This script scrapes Dota 2 match data from Dotabuff and appends it to the match store.
 # Make sure to update the config.py with the correct patch version.
+#
+# Pages are fetched by a thread pool sharing one keep-alive requests.Session
+# and parsed in the same threads, or in a process pool when parse_processes is
+# set (parsing is CPU bound). By default one page is fetched at a time, at most
+# DEFAULT_RATE_LIMIT per second; more concurrency is opt-in. Results are
+# consumed in page order so de-duplication behaves as a sequential scrape.
+# Known matches are looked up in the persistent match ID index (match_index.py).
+#
+# New matches are flushed to the match store in bounded batches, and the page
+# to resume from is checkpointed after each flush, so memory stays flat and an
+# interrupted scrape loses at most one batch.
+# Pages are parsed with the streaming extractor in match_table.py.
 
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple # type: ignore
+import json
+import os
+import threading
+import time
 import requests # type: ignore
-import pandas as pd # type: ignore
-from bs4 import BeautifulSoup # type: ignore
-from typing import Any, List # type: ignore
-from datetime import date
+from requests.adapters import HTTPAdapter # type: ignore
 from tqdm import tqdm # type: ignore
 
-from .config import MATCH_DATA_PATH
-
-def main(N_matches: int):
-    base_url = "https://www.dotabuff.com/matches?page={}"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    
-    matches_list: List[Any] = []
-
-    # Load existing dataset and create a set of existing match IDs
-    parquet_file = MATCH_DATA_PATH
-    existing_ids = set()
-    if parquet_file.exists():
-        df_existing = pd.read_parquet(parquet_file)
-        existing_ids = set(df_existing['id'].dropna().astype(str))
-    
-    page = 1
+from .config import MATCH_STORE_DIR, current_patch_for_parquet
+from .match_index import MatchIdIndex
+from .match_store import append_matches, import_legacy, legacy_path, partition_dir
+from .match_table import extract_matches
+
+BASE_URL = "https://www.dotabuff.com/matches?page={}"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+DEFAULT_RATE_LIMIT = 1.0  # Requests per second, to stay polite to Dotabuff
+REQUEST_TIMEOUT = 30.0  # Seconds to wait for a connection or response bytes
+
+
+class PageFetchError(Exception):
+    """Raised when a match page does not return status 200."""
+    def __init__(self, page: int, status_code: int):
+        super().__init__(f"status code {status_code} for page {page}")
+        self.page = page
+        self.status_code = status_code
+
+
+class RateLimiter:
+    """Spaces request starts at least 1 / rate seconds apart across threads."""
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        time.sleep(max(start - now, 0.0))
+
+
+def make_session(concurrency: int) -> requests.Session:
+    """A keep-alive session whose connection pool fits every request in flight."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_matches_page(html: str) -> List[Dict[str, Any]]:
+    """
+    Extract the match records from the match table of a Dotabuff page.
+    """
+    return extract_matches(html)
+
+
+def fetch_page(session: requests.Session, page: int, base_url: str = BASE_URL,
+               limiter: Optional[RateLimiter] = None, parse_pool: Optional[Executor] = None,
+               timeout: float = REQUEST_TIMEOUT) -> List[Dict[str, Any]]:
+    """Fetch and parse one match page."""
+    if limiter is not None:
+        limiter.wait()
+    response = session.get(base_url.format(page), timeout=timeout)
+    if response.status_code != 200:
+        raise PageFetchError(page, response.status_code)
+    if parse_pool is not None:
+        return parse_pool.submit(parse_matches_page, response.text).result()
+    return parse_matches_page(response.text)
+
+
+def fetch_pages(start_page: int = 1, base_url: str = BASE_URL, concurrency: int = 1,
+                rate_limit: Optional[float] = DEFAULT_RATE_LIMIT, parse_processes: int = 0,
+                session: Optional[requests.Session] = None,
+                timeout: float = REQUEST_TIMEOUT) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Fetch and parse pages concurrently, yielding (page, records) in page order.
+
+    Up to 2 * concurrency pages are in flight. The generator stops at the first
+    page that fails; close it to stop fetching early.
+
+    Args:
+        start_page (int): First page to fetch.
+        base_url (str): Page URL template with one {} for the page number.
+        concurrency (int): Number of worker threads and pooled connections.
+        rate_limit (float): Maximum requests per second, or None for no limit.
+        parse_processes (int): Parse pages in this many processes instead of the fetch threads.
+        session (requests.Session): Session to use, by default a pooled keep-alive session.
+        timeout (float): Seconds before a stalled request fails.
+    """
+    session = session or make_session(concurrency)
+    limiter = RateLimiter(rate_limit)
+    parse_pool = ProcessPoolExecutor(parse_processes) if parse_processes else None
+    pending = []
+    next_page = start_page
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    while len(pending) < 2 * concurrency:
+                        future = executor.submit(
+                            fetch_page, session, next_page, base_url, limiter, parse_pool, timeout
+                        )
+                        pending.append((next_page, future))
+                        next_page += 1
+                    page, future = pending.pop(0)
+                    yield page, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+
+
+def checkpoint_path(store: Path) -> Path:
+    """File holding the page cursor of an interrupted scrape."""
+    return store / "_scrape_checkpoint.json"
+
+
+def load_checkpoint(store: Path, base_url: str) -> Optional[int]:
+    """Page to resume a scrape of base_url from, or None if there is no checkpoint for it."""
+    path = checkpoint_path(store)
+    if not path.exists():
+        return None
+    checkpoint = json.loads(path.read_text())
+    return checkpoint["next_page"] if checkpoint.get("base_url") == base_url else None
+
+
+def save_checkpoint(store: Path, base_url: str, next_page: int):
+    """Atomically record the page a scrape should resume from."""
+    path = checkpoint_path(store)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps({"base_url": base_url, "next_page": next_page}))
+    os.replace(tmp, path)
+
+
+def main(N_matches: int, store: Path = MATCH_STORE_DIR, patch: str = current_patch_for_parquet,
+         base_url: str = BASE_URL, concurrency: int = 1, rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+         parse_processes: int = 0, flush_size: int = 500, resume: bool = True):
+    """
+    Scrape N_matches new matches into the match store.
+
+    Matches are written to the store in fragments of flush_size, and after
+    each write the page to resume from is checkpointed. If the scrape stops
+    early (a failed or timed out page, or a crash), the next run resumes from the checkpoint;
+    matches re-read from a resumed page are skipped via the match ID index. A
+    scrape that collects all N_matches clears the checkpoint.
+
+    Args:
+        N_matches (int): Number of new matches to collect.
+        store (Path): Root directory of the match store.
+        patch (str): Patch partition to write to.
+        base_url (str): Page URL template with one {} for the page number.
+        concurrency (int): Number of fetch threads.
+        rate_limit (float): Maximum requests per second, or None for no limit.
+        parse_processes (int): Parse pages in this many processes.
+        flush_size (int): Matches buffered before they are written to the store.
+        resume (bool): Start from the checkpoint of an interrupted scrape, if any.
+    """
+    # Matches scraped before the store existed become the first fragment of the patch
+    if import_legacy(store, patch) is not None:
+        print(f"Imported {legacy_path(patch)} into {store}.")
+
+    # Match IDs already in the store; buffered matches are not in it yet
+    index = MatchIdIndex(store)
+    buffer: List[Dict[str, Any]] = []
+    buffered_ids = set()
+    n_new = 0
+
+    def flush(next_page: int):
+        fragment = append_matches(buffer, store, patch)
+        if fragment is not None:
+            index.add(buffered_ids, fragment)
+        save_checkpoint(store, base_url, next_page)
+        buffer.clear()
+        buffered_ids.clear()
+
+    start_page = (load_checkpoint(store, base_url) if resume else None) or 1
+    if start_page > 1:
+        print(f"Resuming from page {start_page}.")
+
+    pages = fetch_pages(start_page=start_page, base_url=base_url, concurrency=concurrency,
+                        rate_limit=rate_limit, parse_processes=parse_processes)
+    next_page = start_page  # First page not fully consumed
     with tqdm(total=N_matches, desc="Scraping Matches", unit="match") as pbar:
-        while len(matches_list) < N_matches:
-            url = base_url.format(page)
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                print(f"Error: status code {response.status_code} for page {page}")
-                break
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            table: Any = soup.find("table")
-            if table and hasattr(table, "find_all"):
-                rows = table.find_all("tr")
-                # Skip header row
-                for tr in rows[1:]:
-                    tds = tr.find_all("td")
-                    if len(tds) < 6:
-                        continue
+        try:
+            while n_new < N_matches:
+                try:
+                    page, records = next(pages)
+                except (PageFetchError, requests.RequestException) as e:
+                    print(f"Error: {e}")
+                    break
 
-                    td0 = tds[0]
-                    match_id = td0.find("a").get_text(strip=True) if td0.find("a") else None
-                    if not match_id or match_id in existing_ids:
+                next_page = page
+                for match_data in records:
+                    if match_data["id"] in buffered_ids or match_data["id"] in index:
                         continue
 
-                    match_date = td0.find("time").get_text(strip=True) if td0.find("time") else str(date.today())
-                    
-                    td1 = tds[1]
-                    game_mode = td1.contents[0].strip() if td1.contents else ""
-                    skill_div = td1.find("div", class_="subtext")
-                    skill = skill_div.get_text(strip=True) if skill_div else ""
-                    
-                    td2 = tds[2]
-                    result_a = td2.find("a")
-                    result = result_a.get_text(strip=True) if result_a else td2.get_text(strip=True)
-                    
-                    td3 = tds[3]
-                    duration = td3.contents[0].strip() if td3.contents else ""
-                    
-                    td4 = tds[4]
-                    radiant_draft = [img.get("title") for img in td4.find_all("img") if img.get("title")]
-                    
-                    td5 = tds[5]
-                    dire_draft = [img.get("title") for img in td5.find_all("img") if img.get("title")]
-                    
-                    match_data = {
-                        "id": match_id,
-                        "date": match_date,
-                        "duration": duration,
-                        "result": result,
-                        "game_mode": game_mode,
-                        "skill": skill,
-                        "radiant_draft": radiant_draft,
-                        "dire_draft": dire_draft
-                    }
-                    
-                    matches_list.append(match_data)
-                    existing_ids.add(match_id)
+                    buffer.append(match_data)
+                    buffered_ids.add(match_data["id"])
+                    n_new += 1
                     pbar.update(1)
-                    
-                    if len(matches_list) >= N_matches:
+
+                    if len(buffer) >= flush_size:
+                        flush(next_page)
+                    if n_new >= N_matches:
                         break
-            page += 1
-
-    df_new = pd.DataFrame(matches_list)
-    
-    if parquet_file.exists():
-        if df_new.empty:
-            print("No new matches to add.")
-        else:
-            df_existing = pd.read_parquet(parquet_file)
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-            df_combined.to_parquet(parquet_file, index=False)
-            print(f"Appended {len(df_new)} new matches to {parquet_file}.")
-    else:
-        df_new.to_parquet(parquet_file, index=False)
-        print(f"Saved {len(df_new)} matches to {parquet_file}.")
+                else:
+                    next_page = page + 1
+        except BaseException:
+            # Keep what was scraped before the crash, but never let a failed write hide the crash itself
+            pages.close()
+            try:
+                flush(next_page)
+            except Exception as e:
+                print(f"Error: could not save {len(buffer)} buffered matches: {e}")
+            raise
+        pages.close()
+        flush(next_page)
 
-    print(f"Total matches: {len(existing_ids)}")
+    if n_new >= N_matches:
+        checkpoint_path(store).unlink(missing_ok=True)
+
+    if n_new == 0:
+        print("No new matches to add.")
+    else:
+        print(f"Appended {n_new} new matches to {partition_dir(store, patch)}.")
+    print(f"Total matches: {len(index)}")
 
 if __name__ == "__main__":
     main(1000)
@@ -1,6 +1,4 @@
 from pathlib import Path
-import pandas as pd
-import click as ck
 
 # Define the current patch
 current_patch_for_model = "7_39b" 
@@ -13,7 +11,9 @@ KEY = None
 # Smart thing to write the same thing twice.
 PROJECT_DIR = Path(__file__).parent.parent.parent
 MATCH_DATA_PATH = PROJECT_DIR / "data" / f"{current_patch_for_parquet}_match_data.parquet"
+MATCH_STORE_DIR = PROJECT_DIR / "data" / "matches"  # Append-only match dataset, see match_store.py
 MODEL_PATH = PROJECT_DIR / "src" / "d2draftnet" / "models" / f"{current_patch_for_model}_model.pth"
+NUMPY_MODEL_PATH = MODEL_PATH.with_suffix(".npz")  # Torch-free weight bundle, see export_numpy.py
 
 # Define the list of heroes
 HEROS_ = ['Anti-Mage', 'Axe', 'Bane', 'Bloodseeker', 'Crystal Maiden', 'Drow Ranger', 'Earthshaker', 'Juggernaut', 'Mirana', 'Morphling', 'Shadow Fiend', 
@@ -39,14 +39,35 @@ LAYERS = [32, 16]  # Layers for the current model (7.37e)
 EMBEDDING_DIM = 3  # Embedding dimension for the current model (7.37e)
 
 
-def load_data():
+def load_data(columns=None, filters=None, patches=None, store=MATCH_STORE_DIR, source=None):
     """
-    Load the dataset from the Parquet file.
+    Load matches from the match store as a DataFrame.
+
+    Args:
+        columns (list): Columns to read, all by default. Only these are read from disk.
+        filters: Row filters pushed down to the parquet reader, e.g.
+            [("skill", "==", "Ranked Matchmaking"), ("date", ">=", "2025-07-01")].
+            See match_store.filter_expression.
+        patches (list): Patches to read as one dataset with a "patch" column,
+            e.g. ["7_38b", "7_39b", "7_39c"]. By default the current patch.
+        store (Path): Root directory of the match store.
+        source (Path): Read this parquet file or store directory instead of
+            the patches.
+
+    A patch not yet ingested into the store is read from its single parquet
+    file, e.g. MATCH_DATA_PATH.
     """
-    return pd.read_parquet(MATCH_DATA_PATH)
+    from .match_store import match_source, read_patches, read_table
+    if source is not None:
+        return read_table(source, columns, filters=filters).to_pandas()
+    if patches is None:
+        return read_table(match_source(store=store), columns, filters=filters).to_pandas()
+    return read_patches(patches, columns, filters=filters, store=store).to_pandas()
 
 if __name__ == "__main__":
-    directories = [PROJECT_DIR, MATCH_DATA_PATH, MODEL_PATH]
+    import click as ck
+
+    directories = [PROJECT_DIR, MATCH_DATA_PATH, MATCH_STORE_DIR, MODEL_PATH]
     _= [
         ck.secho(f"OK: {d}", fg="green") 
         if d.exists() 
@@ -0,0 +1,248 @@
+# ========================================================
+# draft_cache.py
+# ========================================================
+# Caches the encoded drafts of a match parquet file as a memory-mappable .npy
+# file next to it, so training does not re-parse the hero name lists each run.
+# A match store partition (see match_store.py) gets its cache inside the
+# partition directory, under a name parquet dataset readers ignore.
+#
+# Several patches can be cached together as one multi-patch array, which adds
+# each match's patch index and date to the row layout. Time-decayed sample
+# weights of that array are cached next to it, one file per decay setting.
+
+from pathlib import Path
+import hashlib
+import os
+import numpy as np
+
+from typing import Optional, Sequence, Tuple
+
+from .config import MATCH_STORE_DIR
+from .encoding import HERO_MAP_VERSION, TEAM_SIZE, encode_drafts, encode_results
+from .match_schema import HERO_COLUMNS
+
+# Row layout of the cached array: radiant heroes, dire heroes, label
+RADIANT_COLS = slice(0, TEAM_SIZE)
+DIRE_COLS = slice(TEAM_SIZE, 2 * TEAM_SIZE)
+LABEL_COL = 2 * TEAM_SIZE
+# Extra columns of the multi-patch layout: index of the patch in the patch
+# list and the match date in days since 1970-01-01 (int16 lasts until 2059)
+PATCH_COL = LABEL_COL + 1
+DAY_COL = LABEL_COL + 2
+
+# Columns read to build the multi-patch layout
+PATCH_TABLE_COLUMNS = HERO_COLUMNS + ["radiant_win", "date"]
+
+# The parquet footer holds the schema and row group statistics, so hashing it
+# detects rewrites without reading the whole file.
+_FOOTER_BYTES = 64 * 1024
+
+
+def parquet_fingerprint(path: Path) -> str:
+    """
+    Fingerprint a parquet file by its size, mtime, footer hash and the HERO_MAP version.
+
+    A store directory is fingerprinted by the path, size and mtime of each of
+    its fragments, which are never modified in place.
+    """
+    if path.is_dir():
+        from .match_store import list_fragments
+
+        digest = hashlib.sha1(HERO_MAP_VERSION.encode())
+        for fragment in list_fragments(path):
+            stat = fragment.stat()
+            digest.update(f"{fragment.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:16]
+
+    stat = path.stat()
+    digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}:{HERO_MAP_VERSION}".encode())
+    with open(path, "rb") as f:
+        f.seek(max(stat.st_size - _FOOTER_BYTES, 0))
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_path(path: Path) -> Path:
+    """Path of the encoded draft cache for the current state of a parquet file or store directory."""
+    if path.is_dir():
+        # Files starting with an underscore are skipped by parquet dataset readers
+        return path / f"_{parquet_fingerprint(path)}.drafts.npy"
+    return path.with_name(f"{path.stem}.{parquet_fingerprint(path)}.drafts.npy")
+
+
+def encode_match_frame(data) -> np.ndarray:
+    """
+    Encode a match DataFrame into the cached [N, 11] int16 layout.
+    """
+    encoded = np.empty((len(data), LABEL_COL + 1), dtype=np.int16)
+    encoded[:, RADIANT_COLS] = encode_drafts(data["radiant_draft"])
+    encoded[:, DIRE_COLS] = encode_drafts(data["dire_draft"])
+    encoded[:, LABEL_COL] = encode_results(data["result"])
+    return encoded
+
+
+def encode_match_table(table) -> np.ndarray:
+    """
+    Copy the hero and radiant_win columns of a v2 match table into the cached [N, 11] int16 layout.
+    """
+    encoded = np.empty((table.num_rows, LABEL_COL + 1), dtype=np.int16)
+    for i, name in enumerate(HERO_COLUMNS):
+        encoded[:, i] = table.column(name).to_numpy()
+    encoded[:, LABEL_COL] = table.column("radiant_win").fill_null(False).to_numpy(zero_copy_only=False)
+    return encoded
+
+
+def encode_patch_table(table, patches: Sequence[str]) -> np.ndarray:
+    """
+    Encode a table from match_store.read_patches into the [N, 13] int16 multi-patch layout.
+
+    Matches without a date get the oldest date of the table.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    encoded = np.empty((table.num_rows, DAY_COL + 1), dtype=np.int16)
+    encoded[:, :LABEL_COL + 1] = encode_match_table(table)
+    encoded[:, PATCH_COL] = pc.index_in(table.column("patch"), value_set=pa.array(list(patches))).to_numpy()
+    days = pc.cast(table.column("date"), pa.int32())
+    encoded[:, DAY_COL] = pc.fill_null(days, pc.min(days)).to_numpy() if table.num_rows else 0
+    return encoded
+
+
+def decay_weights(encoded: np.ndarray, half_life_days: Optional[float] = None,
+                  patch_decay: Optional[float] = None, last_patch: Optional[int] = None) -> np.ndarray:
+    """
+    Exponentially decayed sample weights of multi-patch rows, newest matches weighted most.
+
+    A match's weight is 0.5 ** (days before the newest match / half_life_days)
+    times patch_decay ** (patches before the last one), normalised to a mean
+    of 1 so the loss keeps its scale. Either decay may be None.
+
+    Args:
+        encoded (np.ndarray): Rows of encode_patch_table.
+        half_life_days (float): Half-life of the date decay.
+        patch_decay (float): Weight factor per patch before the last one.
+        last_patch (int): Index of the last requested patch, which patch age
+            is counted from even if it has no rows. The newest patch among
+            the rows by default.
+
+    Returns:
+        np.ndarray: float32 array of shape [N].
+    """
+    if not len(encoded):
+        return np.ones(0, dtype=np.float32)
+    log_weights = np.zeros(len(encoded), dtype=np.float64)
+    if half_life_days is not None:
+        days = encoded[:, DAY_COL].astype(np.float64)
+        log_weights -= (days.max() - days) / half_life_days * np.log(2)
+    if patch_decay is not None:
+        patches = encoded[:, PATCH_COL].astype(np.float64)
+        last = patches.max() if last_patch is None else last_patch
+        log_weights += (last - patches) * np.log(patch_decay)
+    weights = np.exp(log_weights - log_weights.max())
+    return (weights / weights.mean()).astype(np.float32)
+
+
+def unpack_encoded(encoded: np.ndarray):
+    """
+    Split a cached array into (radiant, dire, labels) views.
+    """
+    return encoded[:, RADIANT_COLS], encoded[:, DIRE_COLS], encoded[:, LABEL_COL].astype(np.float32)
+
+
+def load_encoded_drafts(path: Optional[Path] = None, rebuild: bool = False) -> np.ndarray:
+    """
+    Load the encoded drafts of a parquet file, building the cache if it is missing or stale.
+
+    Args:
+        path (Path): Match parquet file or store partition, by default the current patch.
+        rebuild (bool): Re-encode even if a valid cache exists.
+
+    Returns:
+        np.ndarray: Read-only memory-mapped int16 array of shape [N, 11].
+    """
+    from .match_store import match_source, read_table
+
+    path = path or match_source()
+    target = cache_path(path)
+    if rebuild or not target.exists():
+        # v2 files hold hero indices already, so no hero names are decoded
+        table = read_table(path, columns=HERO_COLUMNS + ["radiant_win"], version=2)
+        _save_atomic(encode_match_table(table), target)
+
+        # Remove caches of older versions of the same file
+        stale_caches = path.glob("_*.drafts.npy") if path.is_dir() else path.parent.glob(f"{path.stem}.*.drafts.npy")
+        for stale in stale_caches:
+            if stale != target:
+                stale.unlink(missing_ok=True)
+
+    return np.load(target, mmap_mode="r")
+
+
+def patch_cache_path(patches: Sequence[str], store: Path = MATCH_STORE_DIR) -> Path:
+    """Path of the multi-patch cache for the current state of the sources of some patches."""
+    from .match_store import match_source
+
+    digest = hashlib.sha1(";".join(f"{patch}:{parquet_fingerprint(match_source(patch, store))}"
+                                   for patch in patches).encode())
+    return store.parent / f"{'+'.join(patches)}.{digest.hexdigest()[:16]}.drafts.npy"
+
+
+def load_patch_drafts(patches: Sequence[str], half_life_days: Optional[float] = None,
+                      patch_decay: Optional[float] = None, store: Path = MATCH_STORE_DIR,
+                      rebuild: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Load several patches as one encoded array, building the cache if it is missing or stale.
+
+    Args:
+        patches (list): Patches, oldest first, each read from its store
+            partition or legacy parquet file.
+        half_life_days (float): Half-life of the date decay of the sample weights.
+        patch_decay (float): Weight factor per patch before the last one.
+        store (Path): Match store directory; the cache is written next to it.
+        rebuild (bool): Re-encode even if a valid cache exists.
+
+    Returns:
+        (np.ndarray, np.ndarray): Read-only memory-mapped int16 array of shape
+            [N, 13] (see PATCH_COL and DAY_COL), and the float32 sample weights
+            of decay_weights, or None without a decay.
+    """
+    from .match_store import read_patches
+
+    target = patch_cache_path(patches, store)
+    if rebuild or not target.exists():
+        table = read_patches(patches, PATCH_TABLE_COLUMNS, version=2, store=store)
+        _save_atomic(encode_patch_table(table, patches), target)
+        # Remove caches, and their weights, of older versions of the same patches
+        for stale in target.parent.glob(f"{'+'.join(patches)}.*.npy"):
+            if not stale.name.startswith(target.name[:-len(".drafts.npy")]):
+                stale.unlink(missing_ok=True)
+    encoded = np.load(target, mmap_mode="r")
+    if half_life_days is None and patch_decay is None:
+        return encoded, None
+
+    weights_path = target.with_name(target.name.replace(".drafts.npy", f".{half_life_days}-{patch_decay}.weights.npy"))
+    if rebuild or not weights_path.exists():
+        _save_atomic(decay_weights(encoded, half_life_days, patch_decay, len(patches) - 1), weights_path)
+    return encoded, np.load(weights_path, mmap_mode="r")
+
+
+def _save_atomic(array: np.ndarray, target: Path):
+    # Write atomically so a concurrent reader never sees a partial file
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, target)
+
+
+if __name__ == "__main__":
+    import time
+    from .match_store import match_source
+
+    start = time.perf_counter()
+    encoded = load_encoded_drafts(rebuild=True)
+    print(f"Encoded {len(encoded):,} matches in {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    encoded = load_encoded_drafts()
+    print(f"Loaded {cache_path(match_source()).name} in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,201 @@
+# ========================================================
+# draft_search.py
+# ========================================================
+# Looks several picks ahead with a beam-limited minimax search, assuming
+# Radiant maximises and Dire minimises the predicted Radiant win probability.
+#
+# The tree is expanded one pick at a time for the whole frontier: every
+# (node, candidate hero) pair of a level is scored in one batched pass through
+# the MLP head, and each node keeps its beam_width best children. Team
+# embedding sums are carried down from parent to child, so a shared prefix is
+# summed once no matter how many leaves extend it.
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+import time
+import torch
+
+from .config import HEROS
+from .encoding import TEAM_SIZE
+from .pick_recommender import SIDES, PickRecommender, _hero_indices
+
+
+@dataclass
+class SearchResult:
+    """Outcome of a lookahead search. Values are Radiant win probabilities."""
+    best_pick: Optional[str]
+    value: float
+    line: List[Tuple[str, str]]  # Principal variation as (side, hero) pairs
+    root_moves: List[Tuple[str, float]] = field(default_factory=list)  # Beam at the root, best first
+    nodes: int = 0
+    depth: int = 0
+    elapsed: float = 0.0
+    truncated: bool = False  # True if a node or time budget stopped the search early
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+def default_pick_order(n_radiant: int, n_dire: int) -> List[str]:
+    """Alternate picks, starting with the team that has fewer heroes, until both teams are full."""
+    order = []
+    while n_radiant < TEAM_SIZE or n_dire < TEAM_SIZE:
+        side = "radiant" if n_dire >= TEAM_SIZE or (n_radiant <= n_dire and n_radiant < TEAM_SIZE) else "dire"
+        order.append(side)
+        n_radiant, n_dire = (n_radiant + 1, n_dire) if side == "radiant" else (n_radiant, n_dire + 1)
+    return order
+
+
+class DraftSearch:
+    """
+    Beam-limited minimax search over the remaining picks of both teams.
+
+    Args:
+        recommender (PickRecommender): Supplies the model and hero embeddings.
+        beam_width (int): Children kept per node at every level but the last.
+        max_nodes (int): Stop expanding once this many candidate drafts have been scored.
+        time_budget (float): Stop expanding after this many seconds, if set.
+    """
+    def __init__(self, recommender: Optional[PickRecommender] = None, beam_width: int = 8,
+                 max_nodes: int = 1_000_000, time_budget: Optional[float] = None):
+        self.recommender = recommender or PickRecommender()
+        self.beam_width = beam_width
+        self.max_nodes = max_nodes
+        self.time_budget = time_budget
+
+    def search(self, radiant_heroes: Iterable[str], dire_heroes: Iterable[str],
+               pick_order: Optional[Sequence[str]] = None, banned: Iterable[str] = ()) -> SearchResult:
+        """
+        Search the upcoming picks of a partial draft.
+
+        Args:
+            radiant_heroes: Heroes picked by Radiant so far.
+            dire_heroes: Heroes picked by Dire so far.
+            pick_order: Sides of the upcoming picks, e.g. ["dire", "dire", "radiant"].
+                Defaults to alternating picks until both teams are full.
+            banned: Banned heroes.
+
+        Returns:
+            SearchResult: Minimax value, best pick and principal variation.
+        """
+        start = time.perf_counter()
+        model = self.recommender.model
+        hero_embeddings = self.recommender.hero_embeddings
+        num_heroes = len(hero_embeddings)
+
+        radiant = torch.tensor(_hero_indices(radiant_heroes), dtype=torch.long).view(1, -1)
+        dire = torch.tensor(_hero_indices(dire_heroes), dtype=torch.long).view(1, -1)
+        banned_idx = torch.tensor(_hero_indices(banned), dtype=torch.long)
+        if pick_order is None:
+            pick_order = default_pick_order(radiant.shape[1], dire.shape[1])
+        for side in pick_order:
+            if side not in SIDES:
+                raise ValueError(f"pick_order entries must be one of {SIDES}, got {side!r}")
+        if radiant.shape[1] + list(pick_order).count("radiant") > TEAM_SIZE or \
+                dire.shape[1] + list(pick_order).count("dire") > TEAM_SIZE:
+            raise ValueError(f"pick_order would give a team more than {TEAM_SIZE} heroes")
+
+        radiant_sum = hero_embeddings[radiant].sum(dim=1)  # Shape [frontier, embedding_dim]
+        dire_sum = hero_embeddings[dire].sum(dim=1)
+
+        levels = []  # (side, children per node, hero, static score) for each expanded pick
+        nodes = 0
+        truncated = False
+        with torch.inference_mode():
+            for depth, side in enumerate(pick_order):
+                frontier = len(radiant_sum)
+                available = torch.ones(frontier, num_heroes, dtype=torch.bool)
+                available[:, 0] = False  # Padding index
+                available[:, banned_idx] = False
+                available.scatter_(1, radiant, False)
+                available.scatter_(1, dire, False)
+                rows, candidates = available.nonzero(as_tuple=True)
+                if len(candidates) == 0:
+                    break
+
+                over_nodes = nodes + len(candidates) > self.max_nodes
+                over_time = self.time_budget is not None and time.perf_counter() - start > self.time_budget
+                if depth > 0 and (over_nodes or over_time):
+                    truncated = True
+                    break
+
+                # Score every (node, candidate) pair in one pass through the MLP head
+                n_radiant, n_dire = radiant.shape[1], dire.shape[1]
+                if side == "radiant":
+                    radiant_embed = (radiant_sum[rows] + hero_embeddings[candidates]) / (n_radiant + 1)
+                    dire_embed = dire_sum[rows] / max(n_dire, 1)
+                else:
+                    radiant_embed = radiant_sum[rows] / max(n_radiant, 1)
+                    dire_embed = (dire_sum[rows] + hero_embeddings[candidates]) / (n_dire + 1)
+                radiant_win = model.score_pair(radiant_embed, dire_embed).view(-1)
+                nodes += len(radiant_win)
+
+                # Radiant keeps its highest children, Dire its lowest
+                scores = torch.full((frontier, num_heroes), float("nan"))
+                scores[rows, candidates] = radiant_win
+                goodness = torch.full((frontier, num_heroes), float("-inf"))
+                goodness[rows, candidates] = radiant_win if side == "radiant" else -radiant_win
+
+                # Leaves only need their best child, except at the root where the beam is reported
+                is_last = depth == len(pick_order) - 1
+                k = 1 if is_last and depth > 0 else min(self.beam_width, int(available[0].sum()))
+                best = goodness.topk(k, dim=1).indices  # Shape [frontier, k]
+                parent = torch.arange(frontier).repeat_interleave(k)
+                hero = best.reshape(-1)
+                levels.append((side, k, hero, scores.gather(1, best).reshape(-1)))
+
+                if not is_last:
+                    if side == "radiant":
+                        radiant = torch.cat([radiant[parent], hero.view(-1, 1)], dim=1)
+                        radiant_sum = radiant_sum[parent] + hero_embeddings[hero]
+                        dire, dire_sum = dire[parent], dire_sum[parent]
+                    else:
+                        dire = torch.cat([dire[parent], hero.view(-1, 1)], dim=1)
+                        dire_sum = dire_sum[parent] + hero_embeddings[hero]
+                        radiant, radiant_sum = radiant[parent], radiant_sum[parent]
+
+        elapsed = time.perf_counter() - start
+        if not levels:
+            with torch.inference_mode():
+                value = model.score_pair(radiant_sum / max(radiant.shape[1], 1), dire_sum / max(dire.shape[1], 1))
+            return SearchResult(None, value.item(), [], nodes=nodes, elapsed=elapsed, truncated=truncated)
+
+        # Back up minimax values from the deepest expanded level to the root
+        values = levels[-1][3]
+        choices = []
+        for side, k, _, _ in reversed(levels):
+            grouped = values.view(-1, k)
+            values, choice = grouped.max(dim=1) if side == "radiant" else grouped.min(dim=1)
+            choices.append(choice)
+            root_values = grouped
+        choices.reverse()
+
+        # Follow the best child from the root to recover the principal variation
+        line, node = [], 0
+        for (side, k, hero, _), choice in zip(levels, choices):
+            node = node * k + int(choice[node])
+            line.append((side, HEROS[int(hero[node]) - 1]))
+
+        root_side, _, root_heroes, _ = levels[0]
+        order = root_values[0].argsort(descending=root_side == "radiant")
+        root_moves = [(HEROS[int(root_heroes[i]) - 1], float(root_values[0][i])) for i in order]
+
+        return SearchResult(
+            best_pick=line[0][1],
+            value=float(values[0]),
+            line=line,
+            root_moves=root_moves,
+            nodes=nodes,
+            depth=len(levels),
+            elapsed=elapsed,
+            truncated=truncated,
+        )
+
+
+if __name__ == "__main__":
+    searcher = DraftSearch(beam_width=6, time_budget=2.0)
+    result = searcher.search(["Lycan", "Enchantress"], ["Gyrocopter", "Terrorblade"])
+    print(f"Best pick: {result.best_pick} (Radiant win {result.value:.2%})")
+    print("Line: " + ", ".join(f"{side}: {hero}" for side, hero in result.line))
+    print(f"{result.nodes:,} nodes, depth {result.depth}, {result.nodes_per_second:,.0f} nodes/sec")
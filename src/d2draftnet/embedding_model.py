@@ -1,13 +1,19 @@
 import torch
 import torch.nn as nn
-import pandas as pd
-from torch.utils.data import Dataset
+import numpy as np
+from torch.utils.data import Dataset, IterableDataset, Sampler, get_worker_info
+from pathlib import Path
+from typing import Optional, Sequence
 from .config import HERO_MAP
+from .encoding import encode_drafts
+from .draft_cache import encode_match_table, unpack_encoded
+from .match_schema import HERO_COLUMNS
+from .match_store import list_row_groups, read_row_group
 
 # Dataset class
 class Dota2DraftDataset(Dataset):
     def __init__(self, data, labels):
-        self.data: pd.DataFrame = data
+        self.data = data  # pd.DataFrame
         self.labels = torch.tensor(labels, dtype=torch.float32).view(-1, 1)
 
     def __len__(self):
@@ -33,6 +39,188 @@ class Dota2DraftDataset(Dataset):
         return radiant_draft_tensor , dire_draft_tensor, self.labels[idx]
 
 
+# Pre-encoded dataset class
+class EncodedDraftDataset(Dataset):
+    """
+    Drafts encoded once into contiguous [N, 5] index tensors.
+
+    Indexing with an int, slice or index tensor is pure tensor slicing, so a
+    whole batch can be fetched with a single __getitem__ call. With sample
+    weights, items are (radiant, dire, labels, weights).
+    """
+    def __init__(self, radiant, dire, labels, weights=None):
+        self.radiant = torch.as_tensor(radiant).long().contiguous()
+        self.dire = torch.as_tensor(dire).long().contiguous()
+        self.labels = torch.as_tensor(labels, dtype=torch.float32).view(-1, 1).contiguous()
+        self.weights = None
+        if weights is not None:
+            self.weights = torch.as_tensor(weights, dtype=torch.float32).view(-1, 1).contiguous()
+
+    @classmethod
+    def from_dataframe(cls, data, labels):
+        """Encode the radiant_draft/dire_draft columns of a match DataFrame."""
+        return cls(encode_drafts(data["radiant_draft"]), encode_drafts(data["dire_draft"]), labels)
+
+    @classmethod
+    def from_encoded(cls, encoded, weights=None):
+        """Wrap rows of the array produced by draft_cache.load_encoded_drafts or load_patch_drafts."""
+        return cls(*unpack_encoded(np.array(encoded)), weights=None if weights is None else np.array(weights))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        if self.weights is None:
+            return self.radiant[idx], self.dire[idx], self.labels[idx]
+        return self.radiant[idx], self.dire[idx], self.labels[idx], self.weights[idx]
+
+
+# Batch sampler for the pre-encoded dataset
+class DraftBatchSampler(Sampler):
+    """
+    Yield index tensors of whole batches from a single permutation.
+
+    Use with DataLoader(dataset, sampler=DraftBatchSampler(...), batch_size=None)
+    so the loader fetches [B, 5] radiant, [B, 5] dire and [B, 1] label slices
+    with one __getitem__ call and no per-sample collation.
+    """
+    def __init__(self, num_samples: int, batch_size: int, shuffle: bool = False,
+                 drop_last: bool = False, seed: Optional[int] = None):
+        self.num_samples = num_samples
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(seed)
+        else:
+            self.generator.seed()
+
+    def __len__(self):
+        if self.drop_last:
+            return self.num_samples // self.batch_size
+        return (self.num_samples + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        if self.shuffle:
+            order = torch.randperm(self.num_samples, generator=self.generator)
+        else:
+            order = torch.arange(self.num_samples)
+        for start in range(0, len(self) * self.batch_size, self.batch_size):
+            yield order[start:start + self.batch_size]
+
+
+# Deterministic train/test split on match IDs
+def in_test_split(match_ids, test_fraction: float, salt: int = 0) -> np.ndarray:
+    """
+    True for the matches in the test split.
+
+    Each ID is hashed (splitmix64) to a uniform number in [0, 1), so a match
+    stays on the same side of the split across runs, row orders and newly
+    scraped data.
+    """
+    x = np.asarray(match_ids, dtype=np.int64).astype(np.uint64) + np.uint64(salt * 0x9E3779B97F4A7C15 % 2**64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / 2.0**53 < test_fraction
+
+
+# Streaming dataset over the parquet row groups of the match store
+class StreamingDraftDataset(IterableDataset):
+    """
+    Stream (radiant, dire, labels) batches from match parquet row groups.
+
+    Row groups are read one at a time (in a shuffled order when shuffle is
+    set) into a buffer of up to buffer_size matches, which is shuffled and
+    cut into batches, so memory is bounded by the buffer plus one row group
+    rather than the dataset size. Matches are assigned to the train or test
+    split by in_test_split on their ID.
+
+    Use with DataLoader(dataset, batch_size=None). With several loader
+    workers each worker streams its own share of the row groups. Call
+    set_epoch() before each epoch to reshuffle.
+
+    Args:
+        sources (list): Parquet files or store directories.
+        batch_size (int): Matches per batch.
+        split (str): "train" or "test".
+        test_fraction (float): Share of matches in the test split.
+        buffer_size (int): Matches shuffled together.
+        shuffle (bool): Shuffle row groups and matches.
+        drop_last (bool): Drop the last incomplete batch.
+        filters: Row filters, see match_store.filter_expression.
+        seed (int): Seed for the shuffling.
+    """
+    def __init__(self, sources: Sequence[Path], batch_size: int, split: str = "train", test_fraction: float = 0.2,
+                 buffer_size: int = 65536, shuffle: bool = False, drop_last: bool = False, filters=None,
+                 seed: Optional[int] = None):
+        if split not in ("train", "test"):
+            raise ValueError(f"split must be 'train' or 'test', not {split!r}")
+        self.row_groups = [row_group for source in sources for row_group in list_row_groups(Path(source))]
+        self.batch_size = batch_size
+        self.split = split
+        self.test_fraction = test_fraction
+        self.buffer_size = max(buffer_size, batch_size)
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.filters = filters
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch, which seeds the shuffle order."""
+        self.epoch = epoch
+
+    def read_encoded(self, path: Path, index: int) -> np.ndarray:
+        """Encoded [N, 11] rows of this split in one row group."""
+        table = read_row_group(path, index, ["id"] + HERO_COLUMNS + ["radiant_win"], filters=self.filters)
+        in_test = in_test_split(table.column("id").fill_null(0).to_numpy(), self.test_fraction)
+        return encode_match_table(table)[in_test if self.split == "test" else ~in_test]
+
+    def __iter__(self):
+        rng = np.random.default_rng([self.seed, self.epoch])
+        order = rng.permutation(len(self.row_groups)) if self.shuffle else np.arange(len(self.row_groups))
+        worker = get_worker_info()
+        if worker is not None:
+            order = order[worker.id::worker.num_workers]
+
+        buffer, buffered = [], 0
+        for i in order:
+            encoded = self.read_encoded(*self.row_groups[i])
+            buffer.append(encoded)
+            buffered += len(encoded)
+            if buffered >= self.buffer_size:
+                # Emit the whole batches and carry the remainder over
+                rows = np.concatenate(buffer)
+                rows = rows[rng.permutation(len(rows))] if self.shuffle else rows
+                whole = len(rows) - len(rows) % self.batch_size
+                yield from self._batches(rows[:whole])
+                buffer, buffered = [rows[whole:]], len(rows) - whole
+
+        if buffered:
+            rows = np.concatenate(buffer)
+            rows = rows[rng.permutation(len(rows))] if self.shuffle else rows
+            if self.drop_last:
+                rows = rows[:len(rows) - len(rows) % self.batch_size]
+            yield from self._batches(rows)
+
+    def _batches(self, rows: np.ndarray):
+        for start in range(0, len(rows), self.batch_size):
+            radiant, dire, labels = unpack_encoded(rows[start:start + self.batch_size])
+            yield (torch.from_numpy(radiant.astype(np.int64)), torch.from_numpy(dire.astype(np.int64)),
+                   torch.from_numpy(labels).view(-1, 1))
+
+    def count(self) -> int:
+        """Number of matches in this split, reading only the id column."""
+        total = 0
+        for path, index in self.row_groups:
+            ids = read_row_group(path, index, ["id"], filters=self.filters).column("id").fill_null(0).to_numpy()
+            in_test = in_test_split(ids, self.test_fraction)
+            total += int(in_test.sum() if self.split == "test" else (~in_test).sum())
+        return total
+
+
 # Embedding model class
 class DraftPredictionNN(nn.Module):
     def __init__(self, num_heroes: int, embedding_dim: int, dropout_prob: float, layers: list):
@@ -55,10 +243,23 @@ class DraftPredictionNN(nn.Module):
         )
 
     def forward(self, radiant_team, dire_team):
-        # Compute team embedding by averaging hero embedding
-        radiant_embed = torch.mean(self.embedding(radiant_team), dim=1)  # Shape [batch_size, embedding_dim]
-        dire_embed = torch.mean(self.embedding(dire_team), dim=1)        # Shape [batch_size, embedding_dim]
-        
+        radiant_embed = self.encode_team(radiant_team)  # Shape [batch_size, embedding_dim]
+        dire_embed = self.encode_team(dire_team)        # Shape [batch_size, embedding_dim]
+        return self.score_pair(radiant_embed, dire_embed)
+
+    def encode_team(self, team):
+        """
+        Compute team embedding by averaging the embeddings of the picked heroes.
+
+        Padding slots (index 0) are left out of the mean, so a partial draft
+        padded to [batch_size, 5] embeds the same as its unpadded picks, and an
+        empty team embeds to the zero vector.
+        """
+        picked = (team != 0).unsqueeze(-1)
+        return (self.embedding(team) * picked).sum(dim=1) / picked.sum(dim=1).clamp(min=1)
+
+    def score_pair(self, radiant_embed, dire_embed):
+        """Apply the MLP head to [batch_size, embedding_dim] team embeddings."""
         # Concatenate radiant and dire embedding along the last dimension
         combined = torch.cat([radiant_embed, dire_embed], dim=1)  # Shape [batch_size, embedding_dim * 2]
         
@@ -67,6 +268,33 @@ class DraftPredictionNN(nn.Module):
 
 
 # Helper functions
+def remap_embedding(weight: torch.Tensor, old_heroes: Sequence[str], new_heroes: Sequence[str]) -> torch.Tensor:
+    """
+    Embedding table for new_heroes from one trained with old_heroes.
+
+    Rows are matched by hero name, since adding a hero shifts the sorted
+    HERO_MAP indices of the heroes after it. Heroes new to the table start at
+    the mean of the trained hero rows; row 0 stays the padding row.
+
+    Args:
+        weight: [len(old_heroes) + 1, embedding_dim] embedding weights.
+        old_heroes: Hero list the weights were trained with, in HERO_MAP order.
+        new_heroes: Hero list of the new table.
+
+    Returns:
+        torch.Tensor: [len(new_heroes) + 1, embedding_dim] embedding weights.
+    """
+    if len(weight) != len(old_heroes) + 1:
+        raise ValueError(f"Embedding has {len(weight)} rows, expected {len(old_heroes) + 1} for {len(old_heroes)} heroes")
+    old_rows = {hero: i + 1 for i, hero in enumerate(old_heroes)}
+    remapped = weight[1:].mean(dim=0).repeat(len(new_heroes) + 1, 1)
+    remapped[0] = weight[0]
+    for i, hero in enumerate(new_heroes):
+        if hero in old_rows:
+            remapped[i + 1] = weight[old_rows[hero]]
+    return remapped
+
+
 def save_model(model, filepath):
     torch.save(model.state_dict(), filepath)
     print(f"Model saved to {filepath}")
@@ -0,0 +1,119 @@
+"""
+Vectorised conversion of hero names to the model's hero indices.
+"""
+from itertools import chain
+import hashlib
+import numpy as np
+
+from .config import HEROS
+
+TEAM_SIZE = 5
+
+# Changes whenever a hero is added, which shifts the sorted hero indices
+HERO_MAP_VERSION = hashlib.sha1("\n".join(HEROS).encode()).hexdigest()[:12]
+
+# HERO_MAP is the 1-based position of each hero in the sorted HEROS list,
+# so a binary search over HEROS gives the index without a dict lookup per hero.
+_HERO_NAMES = np.array(HEROS)
+
+
+def encode_heroes(names) -> np.ndarray:
+    """
+    Convert a flat sequence of hero names to HERO_MAP indices.
+
+    Args:
+        names: Sequence or array of hero names.
+
+    Returns:
+        np.ndarray: int16 array of hero indices with the same length as names.
+    """
+    names = np.asarray(names).astype(str)
+    positions = np.searchsorted(_HERO_NAMES, names)
+    positions = np.minimum(positions, len(_HERO_NAMES) - 1)
+    unknown = _HERO_NAMES[positions] != names
+    if unknown.any():
+        raise KeyError(f"Unknown heroes: {sorted(set(names[unknown].tolist()))}")
+    return (positions + 1).astype(np.int16)
+
+
+def encode_drafts(drafts, team_size: int = TEAM_SIZE) -> np.ndarray:
+    """
+    Convert a column of hero name lists to a dense [N, team_size] index array.
+
+    Drafts shorter than team_size are padded with 0 (the embedding padding index).
+
+    Args:
+        drafts: Sequence of hero name lists, e.g. data["radiant_draft"].
+        team_size (int): Number of slots per team.
+
+    Returns:
+        np.ndarray: int16 array of shape [N, team_size].
+    """
+    drafts = list(drafts)
+    lengths = np.fromiter(map(len, drafts), dtype=np.int64, count=len(drafts))
+    if (lengths > team_size).any():
+        raise ValueError(f"Drafts may have at most {team_size} heroes")
+
+    encoded = np.zeros((len(drafts), team_size), dtype=np.int16)
+    if lengths.sum() == 0:
+        return encoded
+
+    flat = encode_heroes(np.fromiter(chain.from_iterable(drafts), dtype=object, count=lengths.sum()))
+    if (lengths == team_size).all():
+        return flat.reshape(-1, team_size)
+
+    # Scatter the ragged drafts into the padded array
+    rows = np.repeat(np.arange(len(drafts)), lengths)
+    cols = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    encoded[rows, cols] = flat
+    return encoded
+
+
+def encode_results(results) -> np.ndarray:
+    """Convert the "result" column to float32 labels (1 for a Radiant victory)."""
+    return (np.asarray(results) == "Radiant Victory").astype(np.float32)
+
+
+def encode_draft_pairs(drafts, dire=None):
+    """
+    Encode many drafts into [N, 5] radiant and dire index arrays.
+
+    Args:
+        drafts: One of
+            - a DataFrame with radiant_draft and dire_draft columns,
+            - a list of (radiant_heroes, dire_heroes) pairs,
+            - an integer array of hero indices with shape [N, 10] or [N, 2, 5],
+            - the radiant side (hero name lists or an [N, 5] index array) when dire is given.
+        dire: The dire side, in the same form as drafts, or None.
+
+    Returns:
+        tuple: (radiant, dire) integer arrays of shape [N, 5]. Partial drafts are
+            padded with 0, which the models leave out of the team mean.
+    """
+    if dire is not None:
+        return _encode_side(drafts), _encode_side(dire)
+    if hasattr(drafts, "columns"):
+        return encode_drafts(drafts["radiant_draft"]), encode_drafts(drafts["dire_draft"])
+    if _is_index_array(drafts):
+        drafts = np.asarray(drafts).reshape(len(drafts), 2, TEAM_SIZE)
+        return drafts[:, 0], drafts[:, 1]
+    radiant_drafts, dire_drafts = zip(*drafts) if len(drafts) else ((), ())
+    return encode_drafts(radiant_drafts), encode_drafts(dire_drafts)
+
+
+def _is_index_array(values) -> bool:
+    """True for integer NumPy arrays and CPU tensors (anything with an integer dtype)."""
+    return hasattr(values, "dtype") and np.asarray(values).dtype.kind in "iu"
+
+
+def _encode_side(team):
+    """Encode one side given as hero name lists or an index array."""
+    if _is_index_array(team):
+        return np.asarray(team).reshape(-1, TEAM_SIZE)
+    return encode_drafts(team)
+
+
+def decode_heroes(indices) -> list:
+    """Convert hero indices back to names, skipping padding."""
+    return [HEROS[i - 1] for i in np.asarray(indices).ravel() if i > 0]
+
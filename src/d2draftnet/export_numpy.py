@@ -0,0 +1,50 @@
+# ========================================================
+# export_numpy.py
+# ========================================================
+# Freezes a trained DraftPredictionNN into a plain NumPy weight bundle (.npz)
+# that numpy_predictor.py can run without importing torch.
+# Run with: python -m d2draftnet.export_numpy [--model-path ...] [--out ...]
+
+from pathlib import Path
+import click as ck
+import numpy as np
+import torch
+
+from .config import EMBEDDING_DIM, HEROS, LAYERS, MODEL_PATH, NUM_HEROS
+from .embedding_model import DraftPredictionNN
+
+
+def export_model(model: DraftPredictionNN, out_path: Path) -> Path:
+    """
+    Save the weights of a DraftPredictionNN as a NumPy bundle.
+
+    The bundle also stores the hero list the model was trained with, so the
+    NumPy predictor can refuse drafts encoded with a different HERO_MAP.
+    """
+    linear_layers = [layer for layer in model.fc if isinstance(layer, torch.nn.Linear)]
+    arrays = {"embedding": model.embedding.weight.detach().numpy(), "heroes": np.array(HEROS)}
+    for i, layer in enumerate(linear_layers):
+        arrays[f"weight_{i}"] = layer.weight.detach().numpy()
+        arrays[f"bias_{i}"] = layer.bias.detach().numpy()
+
+    out_path = Path(out_path)
+    with open(out_path, "wb") as f:
+        np.savez(f, **arrays)
+    return out_path
+
+
+@ck.command()
+@ck.option("--model-path", type=ck.Path(exists=True, path_type=Path), default=MODEL_PATH, show_default=True)
+@ck.option("--out", "out_path", type=ck.Path(path_type=Path), default=None,
+           help="Output .npz path. Defaults to the model path with a .npz suffix.")
+def main(model_path: Path, out_path):
+    """Export a trained model to a NumPy weight bundle."""
+    model = DraftPredictionNN(num_heroes=NUM_HEROS, embedding_dim=EMBEDDING_DIM, dropout_prob=1e-3, layers=LAYERS)
+    model.load_state_dict(torch.load(model_path))
+    model.eval()
+    out_path = export_model(model, out_path or model_path.with_suffix(".npz"))
+    ck.secho(f"Exported {model_path.name} to {out_path}", fg="green")
+
+
+if __name__ == "__main__":
+    main()
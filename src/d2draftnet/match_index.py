@@ -0,0 +1,148 @@
+# ========================================================
+# match_index.py
+# ========================================================
+# Persistent index of the match IDs in the match store, so the scraper can
+# skip known matches without loading the dataset.
+#
+# The index lives in the store root, next to the patch partitions:
+#
+#     _match_ids.npy   sorted unique int64 IDs
+#     _match_ids.log   int64 IDs appended since the last merge
+#     _match_ids.json  name of the newest fragment whose IDs are indexed
+#
+# Lookups binary-search the sorted array and check a set of the logged IDs.
+# add() only appends to the log; the log is merged into the sorted array once
+# it grows past merge_threshold. Fragments written after the recorded one (for
+# example if the scraper stopped between writing a fragment and indexing it)
+# are indexed from their id column when the index is opened.
+
+from pathlib import Path
+from typing import Iterable, Optional
+import json
+import os
+import numpy as np
+
+from .config import MATCH_STORE_DIR
+from .match_store import list_fragments, read_table
+
+_ID_DTYPE = np.dtype("<i8")
+
+
+class MatchIdIndex:
+    """
+    Set of the match IDs stored under a match store directory.
+
+    Args:
+        store (Path): Root directory of the match store.
+        merge_threshold (int): Logged IDs that trigger a merge into the sorted array.
+    """
+    def __init__(self, store: Path = MATCH_STORE_DIR, merge_threshold: int = 65536):
+        self.store = store
+        self.merge_threshold = merge_threshold
+        self.ids_path = store / "_match_ids.npy"
+        self.log_path = store / "_match_ids.log"
+        self.state_path = store / "_match_ids.json"
+
+        self.sorted_ids = np.load(self.ids_path) if self.ids_path.exists() else np.empty(0, dtype=_ID_DTYPE)
+        self.logged_ids = set(self._read_log().tolist())
+        self.last_fragment = json.loads(self.state_path.read_text())["last_fragment"] if self.state_path.exists() else ""
+        self.catch_up()
+
+    def __len__(self):
+        return len(self.sorted_ids) + len(self.logged_ids)
+
+    def __contains__(self, match_id) -> bool:
+        key = int(match_id)
+        if key in self.logged_ids:
+            return True
+        i = np.searchsorted(self.sorted_ids, key)
+        return bool(i < len(self.sorted_ids) and self.sorted_ids[i] == key)
+
+    def contains(self, match_ids: Iterable) -> np.ndarray:
+        """Vectorised membership test, returns a bool array."""
+        keys = np.asarray([int(match_id) for match_id in match_ids], dtype=_ID_DTYPE)
+        i = np.searchsorted(self.sorted_ids, keys).clip(max=max(len(self.sorted_ids) - 1, 0))
+        found = self.sorted_ids[i] == keys if len(self.sorted_ids) else np.zeros(len(keys), dtype=bool)
+        return found | np.fromiter((key in self.logged_ids for key in keys.tolist()), dtype=bool, count=len(keys))
+
+    def add(self, match_ids: Iterable, fragment: Optional[Path] = None):
+        """
+        Index new match IDs, appending them to the log.
+
+        Args:
+            match_ids: IDs to add, as ints or numeric strings.
+            fragment (Path): The store fragment the IDs were written to.
+        """
+        keys = np.unique(np.asarray([int(match_id) for match_id in match_ids], dtype=_ID_DTYPE))
+        keys = keys[~self.contains(keys)]
+        if len(keys):
+            self.store.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "ab") as f:
+                keys.tofile(f)
+            self.logged_ids.update(keys.tolist())
+        if fragment is not None and fragment.name > self.last_fragment:
+            self.last_fragment = fragment.name
+            self._write_state()
+        if len(self.logged_ids) >= self.merge_threshold:
+            self.merge()
+
+    def merge(self):
+        """Merge the logged IDs into the sorted array and clear the log."""
+        logged = np.fromiter(self.logged_ids, dtype=_ID_DTYPE, count=len(self.logged_ids))
+        self.sorted_ids = np.union1d(self.sorted_ids, logged).astype(_ID_DTYPE)
+        self.store.mkdir(parents=True, exist_ok=True)
+        tmp = self.ids_path.with_name(f".{self.ids_path.name}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, self.sorted_ids)
+        os.replace(tmp, self.ids_path)
+        self.log_path.unlink(missing_ok=True)
+        self.logged_ids = set()
+
+    def catch_up(self) -> int:
+        """
+        Index the IDs of fragments newer than the last indexed one.
+
+        Returns:
+            int: Number of fragments read.
+        """
+        fragments = [path for path in list_fragments(self.store) if path.name > self.last_fragment]
+        for fragment in fragments:
+            ids = read_table(fragment, columns=["id"], version=2).column("id").drop_null().to_numpy()
+            self.add(ids, fragment)
+        return len(fragments)
+
+    def rebuild(self):
+        """Rebuild the index from the id columns of every fragment."""
+        for path in (self.ids_path, self.log_path, self.state_path):
+            path.unlink(missing_ok=True)
+        self.sorted_ids = np.empty(0, dtype=_ID_DTYPE)
+        self.logged_ids = set()
+        self.last_fragment = ""
+        self.catch_up()
+        self.merge()
+
+    def _read_log(self) -> np.ndarray:
+        if not self.log_path.exists():
+            return np.empty(0, dtype=_ID_DTYPE)
+        data = self.log_path.read_bytes()
+        whole = len(data) - len(data) % _ID_DTYPE.itemsize
+        if whole < len(data):
+            # Cut a partially written ID off the end, so later appends stay aligned;
+            # its fragment is re-read by catch_up
+            with open(self.log_path, "r+b") as f:
+                f.truncate(whole)
+        return np.frombuffer(data[:whole], dtype=_ID_DTYPE)
+
+    def _write_state(self):
+        tmp = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps({"last_fragment": self.last_fragment}))
+        os.replace(tmp, self.state_path)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    index = MatchIdIndex()
+    index.rebuild()
+    print(f"Indexed {len(index):,} match IDs from {MATCH_STORE_DIR} in {time.perf_counter() - start:.3f}s")
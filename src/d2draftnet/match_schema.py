@@ -0,0 +1,243 @@
+# ========================================================
+# match_schema.py
+# ========================================================
+# On-disk schemas of the match data.
+#
+# v1 is what the scraper produces: every field a string, drafts as lists of
+# hero names. v2 is the compact typed layout the match store writes:
+#
+#     id           int64
+#     date         date32
+#     duration     int32 seconds
+#     radiant_win  bool
+#     game_mode    dictionary<int8, string>
+#     skill        dictionary<int8, string>
+#     radiant_0-4  uint8 hero index (HERO_MAP, 0 for a missing pick)
+#     dire_0-4     uint8 hero index
+#
+# The hero list the indices refer to is saved in the file metadata, so files
+# written before a hero is added are remapped on read. Readers convert
+# between the two layouts, so code that works on hero names and result
+# strings keeps reading v1 while training reads the v2 columns directly.
+# Durations are normalised by the round trip ("06:50" reads back as "6:50").
+
+from typing import List, Optional, Sequence
+import json
+import numpy as np
+
+from .config import HEROS
+from .encoding import TEAM_SIZE, encode_drafts, encode_heroes
+
+SCHEMA_VERSION_KEY = b"d2draftnet.schema_version"
+HEROES_KEY = b"d2draftnet.heroes"
+
+# Columns of a v1 match record, in file order
+MATCH_COLUMNS = ["id", "date", "duration", "result", "game_mode", "skill", "radiant_draft", "dire_draft"]
+
+TEAM_COLUMNS = {
+    "radiant_draft": [f"radiant_{i}" for i in range(TEAM_SIZE)],
+    "dire_draft": [f"dire_{i}" for i in range(TEAM_SIZE)],
+}
+HERO_COLUMNS = TEAM_COLUMNS["radiant_draft"] + TEAM_COLUMNS["dire_draft"]
+V2_COLUMNS = ["id", "date", "duration", "radiant_win", "game_mode", "skill"] + HERO_COLUMNS
+
+# Parquet writer options for v2 tables: delta-encode the integer columns,
+# dictionary-encode the rest
+_DELTA_COLUMNS = ["id", "duration"]
+V2_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "use_dictionary": [name for name in V2_COLUMNS if name not in _DELTA_COLUMNS],
+    "column_encoding": {name: "DELTA_BINARY_PACKED" for name in _DELTA_COLUMNS},
+}
+
+# v2 columns each v1 column is built from
+_V1_SOURCES = {"result": ["radiant_win"], **TEAM_COLUMNS}
+
+RESULTS = ("Dire Victory", "Radiant Victory")
+
+
+def schema_v1():
+    """Arrow schema of the scraped match records."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [(name, pa.string()) for name in MATCH_COLUMNS[:6]]
+        + [(name, pa.list_(pa.string())) for name in MATCH_COLUMNS[6:]]
+    )
+
+
+def schema_v2(heroes: Sequence[str] = HEROS):
+    """Arrow schema of the compact layout, with the hero list in its metadata."""
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int8(), pa.string())
+    fields = [
+        ("id", pa.int64()),
+        ("date", pa.date32()),
+        ("duration", pa.int32()),
+        ("radiant_win", pa.bool_()),
+        ("game_mode", category),
+        ("skill", category),
+    ] + [(name, pa.uint8()) for name in HERO_COLUMNS]
+    metadata = {SCHEMA_VERSION_KEY: b"2", HEROES_KEY: json.dumps(list(heroes)).encode()}
+    return pa.schema(fields, metadata=metadata)
+
+
+def schema_version(schema) -> int:
+    """Schema version of a file schema."""
+    return 2 if "radiant_0" in schema.names else 1
+
+
+def file_heroes(schema) -> Optional[List[str]]:
+    """Hero list a v2 file's hero indices refer to."""
+    metadata = schema.metadata or {}
+    return json.loads(metadata[HEROES_KEY]) if HEROES_KEY in metadata else None
+
+
+def v2_columns(columns: Optional[Sequence[str]]) -> List[str]:
+    """v2 columns needed to build the given v1 columns."""
+    if columns is None:
+        return list(V2_COLUMNS)
+    return [source for name in columns for source in _V1_SOURCES.get(name, [name])]
+
+
+def parse_duration(text: Optional[str]) -> Optional[int]:
+    """Seconds of an "M:SS" or "H:MM:SS" duration, None if it is not one."""
+    try:
+        seconds = 0
+        for part in text.strip().split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_duration(seconds: Optional[int]) -> Optional[str]:
+    """Format seconds as Dotabuff does, "M:SS" or "H:MM:SS"."""
+    if seconds is None:
+        return None
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def _format_durations(seconds):
+    """Vectorised format_duration over an integer column."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    hours = pc.divide(seconds, 3600)
+    minutes = pc.divide(pc.subtract(seconds, pc.multiply(hours, 3600)), 60)
+    secs = pc.subtract(seconds, pc.add(pc.multiply(hours, 3600), pc.multiply(minutes, 60)))
+
+    def text(values, width=1):
+        return pc.utf8_lpad(pc.cast(values, pa.string()), width=width, padding="0")
+
+    with_hours = pc.binary_join_element_wise(text(hours), text(minutes, 2), text(secs, 2), ":")
+    without_hours = pc.binary_join_element_wise(text(minutes), text(secs, 2), ":")
+    return pc.if_else(pc.greater(hours, 0), with_hours, without_hours)
+
+
+def to_v2(table):
+    """
+    Convert a v1 table to the v2 layout.
+
+    Dates that are empty or not ISO formatted become null rather than failing
+    the whole table, as unparseable durations and results already do.
+
+    Raises:
+        KeyError: If a draft contains an unknown hero name.
+        ValueError: If a match ID is not numeric.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    schema = schema_v2()
+    results = table.column("result")
+    columns = [
+        pc.cast(table.column("id"), pa.int64()),
+        pc.cast(pc.strptime(table.column("date"), format="%Y-%m-%d", unit="s", error_is_null=True), pa.date32()),
+        pa.array([parse_duration(text) for text in table.column("duration").to_pylist()], pa.int32()),
+        pc.if_else(pc.is_in(results, pa.array(RESULTS)), pc.equal(results, RESULTS[1]), pa.scalar(None, pa.bool_())),
+        pc.cast(table.column("game_mode"), schema.field("game_mode").type),
+        pc.cast(table.column("skill"), schema.field("skill").type),
+    ]
+    for side, names in TEAM_COLUMNS.items():
+        heroes = encode_drafts(table.column(side).to_pylist()).astype(np.uint8)
+        columns += [pa.array(heroes[:, i]) for i in range(len(names))]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def remap_heroes(table, heroes: Sequence[str]):
+    """
+    Re-index the hero columns of a v2 table written with another hero list.
+
+    Raises:
+        KeyError: If a hero of the old list no longer exists.
+    """
+    import pyarrow as pa
+
+    if not heroes or list(heroes) == HEROS:
+        return table
+    # Old index -> hero name -> current index; 0 stays the missing pick
+    lookup = np.zeros(len(heroes) + 1, dtype=np.uint8)
+    lookup[1:] = encode_heroes(heroes)
+    for name in HERO_COLUMNS:
+        if name in table.column_names:
+            column = table.column(name).to_numpy(zero_copy_only=False)
+            table = table.set_column(table.column_names.index(name), name, pa.array(lookup[column]))
+    return table
+
+
+def to_v1(table, columns: Optional[Sequence[str]] = None):
+    """
+    Convert a v2 table, or the v2 columns read for them, to the given v1 columns.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    v1 = schema_v1()
+    hero_names = pa.array(HEROS)
+    arrays = []
+    for name in columns or MATCH_COLUMNS:
+        if name == "id":
+            arrays.append(pc.cast(table.column("id"), pa.string()))
+        elif name == "date":
+            arrays.append(pc.cast(table.column("date"), pa.string()))  # ISO format
+        elif name == "duration":
+            arrays.append(_format_durations(table.column("duration")))
+        elif name == "result":
+            arrays.append(pc.if_else(table.column("radiant_win"), RESULTS[1], RESULTS[0]))
+        elif name in TEAM_COLUMNS:
+            heroes = np.stack([table.column(c).to_numpy(zero_copy_only=False) for c in TEAM_COLUMNS[name]], axis=1)
+            picked = heroes > 0
+            offsets = np.concatenate([[0], np.cumsum(picked.sum(axis=1))]).astype(np.int32)
+            heroes = pa.DictionaryArray.from_arrays(pa.array(heroes[picked] - 1), hero_names)
+            arrays.append(pa.ListArray.from_arrays(offsets, pc.cast(heroes, pa.string())))
+        else:
+            arrays.append(pc.cast(table.column(name), pa.string()))
+    return pa.Table.from_arrays(arrays, schema=pa.schema([v1.field(name) for name in columns or MATCH_COLUMNS]))
+
+
+def v2_filter(column: str, value):
+    """
+    Translate a filter on a v1 or v2 column to the v2 column and value type.
+
+    "result" filters become radiant_win filters, dates may be ISO strings,
+    IDs numeric strings and durations "M:SS" strings. Lists are converted
+    element-wise for "in" filters.
+    """
+    from datetime import date
+
+    if isinstance(value, (list, tuple, set)):
+        converted = [v2_filter(column, item)[1] for item in value]
+        return ("radiant_win" if column == "result" else column), converted
+    if column == "result":
+        return "radiant_win", value == RESULTS[1] if isinstance(value, str) else bool(value)
+    if column == "date" and isinstance(value, str):
+        return column, date.fromisoformat(value)
+    if column == "id":
+        return column, int(value)
+    if column == "duration" and isinstance(value, str):
+        return column, parse_duration(value)
+    return column, value
@@ -0,0 +1,368 @@
+# ========================================================
+# match_store.py
+# ========================================================
+# Append-only storage for scraped matches.
+#
+# Every ingest batch is written as a new parquet fragment of a hive-partitioned
+# dataset directory, so adding matches never reads or rewrites existing data:
+#
+#     data/matches/patch=7_39c/ingest_date=2025-07-11/part-<time_ns>-<uid>.parquet
+#
+# Fragments use the compact v2 schema of match_schema.py; reads return the
+# scraper's v1 records unless the v2 columns are asked for.
+#
+# Fragment names start with the write time, so sorting them by name gives the
+# ingest order. compact() merges the fragments of each partition into a single
+# file once many small batches have piled up.
+#
+# Matches naming a hero that is not in config.HEROS cannot be encoded in v2;
+# they are set aside as v1 files under _quarantine/patch=<patch>/ so a new
+# hero never loses a batch, and can be re-ingested once HEROS is updated.
+#
+# Matches scraped before the store existed live in one parquet file per patch
+# (data/<patch>_match_data.parquet). Readers fall back to that file until the
+# patch has a partition, and the scraper imports it as the first fragment.
+
+from datetime import date
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import os
+import time
+import uuid
+import numpy as np
+
+from .config import HEROS, MATCH_STORE_DIR, PROJECT_DIR, current_patch_for_parquet
+from .match_schema import (
+    MATCH_COLUMNS, V2_COLUMNS, V2_WRITE_OPTIONS, file_heroes, remap_heroes, schema_v1, schema_v2, schema_version, to_v1, to_v2,
+    v2_columns, v2_filter,
+)
+
+def legacy_path(patch: str) -> Path:
+    """Single parquet file holding the matches of a patch scraped before the store existed."""
+    return PROJECT_DIR / "data" / f"{patch}_match_data.parquet"
+
+
+def partition_dir(store: Path, patch: str, ingest_date: Optional[str] = None) -> Path:
+    """Directory of a patch partition, or of one ingest date within it."""
+    path = store / f"patch={patch}"
+    return path / f"ingest_date={ingest_date}" if ingest_date else path
+
+
+def quarantine_dir(store: Path, patch: str) -> Path:
+    """Directory of the v1 records of a patch set aside for naming unknown heroes."""
+    return store / "_quarantine" / f"patch={patch}"
+
+
+def match_source(patch: str = current_patch_for_parquet, store: Path = MATCH_STORE_DIR) -> Path:
+    """
+    Where the matches of a patch live: its store partition, or the legacy parquet file.
+    """
+    partition = partition_dir(store, patch)
+    return partition if partition.exists() else legacy_path(patch)
+
+
+def list_fragments(source: Path) -> List[Path]:
+    """
+    Parquet files under a store, partition or single file, in ingest order.
+
+    Hidden files (in-progress writes) are skipped.
+    """
+    if source.is_file():
+        return [source]
+    if not source.exists():
+        return []
+    return sorted(source.rglob("part-*.parquet"), key=lambda path: path.name)
+
+
+def _fragment_name(prefix: str = "part") -> str:
+    return f"{prefix}-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+def _write_atomic(table, target: Path):
+    """Write a v2 table next to target under a hidden name, then rename it into place."""
+    import pyarrow.parquet as pq
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    pq.write_table(table, tmp, **V2_WRITE_OPTIONS)
+    os.replace(tmp, target)
+
+
+def _to_v1_table(records):
+    """v1 match records or DataFrame -> v1 table."""
+    import pyarrow as pa
+
+    if hasattr(records, "columns"):  # DataFrame
+        return pa.Table.from_pandas(records[MATCH_COLUMNS], schema=schema_v1(), preserve_index=False)
+    return pa.Table.from_pylist(list(records), schema=schema_v1())
+
+
+def _to_table(records):
+    """v1 match records or DataFrame -> v2 table."""
+    return to_v2(_to_v1_table(records))
+
+
+def _unknown_hero_rows(table) -> np.ndarray:
+    """Mask of the rows of a v1 table whose drafts name a hero missing from HEROS."""
+    known = set(HEROS)
+    radiant, dire = table.column("radiant_draft").to_pylist(), table.column("dire_draft").to_pylist()
+    return np.array([not known.issuperset(r or ()) or not known.issuperset(d or ()) for r, d in zip(radiant, dire)],
+                    dtype=bool)
+
+
+def _quarantine(table, store: Path, patch: str) -> Path:
+    """Write v1 rows that cannot be encoded to the quarantine of their patch."""
+    import pyarrow.parquet as pq
+
+    target = quarantine_dir(store, patch) / _fragment_name("quarantine")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, target)
+    return target
+
+
+def append_matches(records: Union[Sequence[Dict[str, Any]], Any], store: Path = MATCH_STORE_DIR,
+                   patch: str = current_patch_for_parquet, ingest_date: Optional[str] = None) -> Optional[Path]:
+    """
+    Write a batch of match records as a new fragment of the store.
+
+    Records naming a hero that is not in HEROS are written to the patch's
+    quarantine_dir instead, so the rest of the batch is still stored.
+
+    Args:
+        records: Match record dicts or a DataFrame with the match columns.
+        store (Path): Root directory of the store.
+        patch (str): Patch partition to write to.
+        ingest_date (str): Ingest date partition, today by default.
+
+    Returns:
+        Path: The new fragment, or None if there were no storable records.
+    """
+    table = _to_v1_table(records)
+    unknown = _unknown_hero_rows(table)
+    if unknown.any():
+        path = _quarantine(table.filter(unknown), store, patch)
+        print(f"Quarantined {int(unknown.sum())} matches with unknown heroes to {path}.")
+        table = table.filter(~unknown)
+    if table.num_rows == 0:
+        return None
+    target = partition_dir(store, patch, ingest_date or date.today().isoformat()) / _fragment_name()
+    _write_atomic(to_v2(table), target)
+    return target
+
+
+def import_legacy(store: Path = MATCH_STORE_DIR, patch: str = current_patch_for_parquet) -> Optional[Path]:
+    """
+    Import the legacy parquet file of a patch as its first fragment.
+
+    Does nothing if the patch already has a partition or there is no legacy file.
+    """
+    source = legacy_path(patch)
+    if partition_dir(store, patch).exists() or not source.exists():
+        return None
+    ingest_date = date.fromtimestamp(source.stat().st_mtime).isoformat()
+    target = partition_dir(store, patch, ingest_date) / _fragment_name()
+    _write_atomic(read_table(source, version=2), target)
+    return target
+
+
+def _fragment_kind(path: Path):
+    """(schema version, hero list) of a fragment; consecutive fragments of a kind are read together."""
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(path)
+    return schema_version(schema), tuple(file_heroes(schema) or ())
+
+
+def filter_expression(filters):
+    """
+    Build a pyarrow expression from row filters on the v2 columns.
+
+    Args:
+        filters: A pyarrow expression, or filters in pyarrow.parquet's format:
+            a list of (column, op, value) tuples that are AND-ed, or a list of
+            such lists that are OR-ed. Values are converted with v2_filter,
+            e.g. ("date", ">=", "2025-07-01") or ("result", "==", "Radiant Victory").
+
+    Returns:
+        The expression, or None for no filters.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    def convert(column, op, value):
+        column, value = v2_filter(column, value)
+        return column, op, value
+
+    groups = filters if filters and isinstance(filters[0], list) else [filters]
+    return pq.filters_to_expression([[convert(*condition) for condition in group] for group in groups])
+
+
+def read_table(source: Path, columns: Optional[List[str]] = None, version: int = 1, filters=None):
+    """
+    Read a store, partition or single parquet file into one Arrow table, in ingest order.
+
+    Args:
+        source (Path): Store root, partition directory or parquet file.
+        columns (list): Columns to read, all by default. Only the file columns
+            they are built from are read.
+        version (int): Schema of the result: 1 for the scraper's records (hero
+            names, result strings), 2 for the compact typed columns.
+        filters: Row filters, see filter_expression. They are pushed down to
+            the parquet reader for v2 files, so row groups whose statistics
+            rule them out are skipped.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    columns = list(columns or (MATCH_COLUMNS if version == 1 else V2_COLUMNS))
+    expression = filter_expression(filters)
+    tables = []
+    for (file_version, heroes), group in groupby(list_fragments(source), key=_fragment_kind):
+        paths = [str(path) for path in group]
+        if file_version == 2:
+            dataset = ds.dataset(paths, schema=schema_v2(heroes), format="parquet")
+            table = dataset.to_table(columns=v2_columns(columns) if version == 1 else columns, filter=expression)
+            table = remap_heroes(table, heroes)
+            table = to_v1(table, columns) if version == 1 else table
+        else:
+            dataset = ds.dataset(paths, schema=schema_v1(), format="parquet")
+            if version == 1 and expression is None:
+                table = dataset.to_table(columns=columns)
+            else:
+                # Filters are written against the v2 types, so convert first
+                table = to_v2(dataset.to_table())
+                table = table.filter(expression) if expression is not None else table
+                table = to_v1(table, columns) if version == 1 else table.select(columns)
+        tables.append(table.replace_schema_metadata(None))
+
+    if not tables:
+        return (schema_v1() if version == 1 else schema_v2()).empty_table().select(columns)
+    table = pa.concat_tables(tables)
+    return table if version == 1 else table.replace_schema_metadata(schema_v2().metadata)
+
+
+def read_matches(source: Path, columns: Optional[List[str]] = None, filters=None):
+    """
+    Read a store, partition or single parquet file into a DataFrame, in ingest order.
+    """
+    return read_table(source, columns, filters=filters).to_pandas()
+
+
+def read_patches(patches: Sequence[str], columns: Optional[List[str]] = None, version: int = 1, filters=None,
+                 store: Path = MATCH_STORE_DIR):
+    """
+    Read several patches as one table with a "patch" column.
+
+    Each patch is read from its store partition, or its legacy parquet file
+    if it has none. See read_table for the other arguments.
+    """
+    import pyarrow as pa
+
+    tables = []
+    for patch in patches:
+        table = read_table(match_source(patch, store), columns, version=version, filters=filters)
+        tables.append(table.append_column("patch", pa.array([patch] * table.num_rows, pa.string())))
+    table = pa.concat_tables(tables)
+    return table if version == 1 else table.replace_schema_metadata(schema_v2().metadata)
+
+
+def list_row_groups(source: Path) -> List[Tuple[Path, int]]:
+    """
+    (fragment, row group index) of every row group under a source, in ingest order.
+
+    Only the parquet footers are read.
+    """
+    import pyarrow.parquet as pq
+
+    return [(path, i) for path in list_fragments(source) for i in range(pq.ParquetFile(path).num_row_groups)]
+
+
+def read_row_group(path: Path, index: int, columns: Optional[List[str]] = None, filters=None):
+    """
+    Read one row group of a fragment as a v2 table.
+
+    Row groups of v2 files whose statistics rule out the filters are not
+    decoded. See read_table for the arguments.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.fs as fs
+    import pyarrow.parquet as pq
+
+    columns = list(columns or V2_COLUMNS)
+    expression = filter_expression(filters)
+    file_version, heroes = _fragment_kind(path)
+    if file_version == 2:
+        fragment = ds.ParquetFileFormat().make_fragment(str(path), filesystem=fs.LocalFileSystem(), row_groups=[index])
+        table = fragment.to_table(schema=schema_v2(heroes), columns=columns, filter=expression)
+        return remap_heroes(table, heroes).replace_schema_metadata(schema_v2().metadata)
+
+    table = to_v2(pq.ParquetFile(path).read_row_group(index).cast(schema_v1()))
+    table = table.filter(expression) if expression is not None else table
+    return table.select(columns)
+
+
+def compact(store: Path = MATCH_STORE_DIR, patch: Optional[str] = None) -> int:
+    """
+    Merge the fragments of each partition into one file, dropping repeated match IDs.
+
+    The merged file replaces the newest fragment of the partition, so readers
+    that track the last fragment they have seen (like the match ID index) pick
+    up the rows of any fragment merged into it. If compaction is interrupted
+    before the other fragments are removed, their rows are repeated until the
+    next run.
+
+    Args:
+        store (Path): Root directory of the store.
+        patch (str): Only compact this patch, all patches by default.
+
+    Returns:
+        int: Number of fragments removed.
+    """
+    import pyarrow as pa
+
+    root = partition_dir(store, patch) if patch else store
+    removed = 0
+    for partition in sorted({path.parent for path in list_fragments(root)}):
+        fragments = list_fragments(partition)
+        if len(fragments) < 2:
+            continue
+        table = read_table(partition, version=2)
+        _, first = np.unique(table.column("id").to_numpy(), return_index=True)
+        table = table.take(pa.array(np.sort(first)))
+
+        _write_atomic(table, fragments[-1])
+        for fragment in fragments[:-1]:
+            fragment.unlink()
+        removed += len(fragments) - 1
+    return removed
+
+
+if __name__ == "__main__":
+    import click as ck
+
+    @ck.group()
+    def cli():
+        """Manage the append-only match store."""
+
+    @cli.command(name="import-legacy")
+    @ck.option("--patch", default=current_patch_for_parquet, show_default=True)
+    def import_legacy_command(patch: str):
+        """Import data/<patch>_match_data.parquet into the store."""
+        target = import_legacy(patch=patch)
+        if target is None:
+            ck.secho(f"Nothing to import for patch {patch}.", fg="yellow")
+        else:
+            ck.secho(f"Imported {legacy_path(patch)} to {target}.", fg="green")
+
+    @cli.command(name="compact")
+    @ck.option("--patch", default=None, help="Only compact this patch.")
+    def compact_command(patch: Optional[str]):
+        """Merge the fragments of each partition."""
+        ck.secho(f"Removed {compact(patch=patch)} fragments.", fg="green")
+
+    cli()
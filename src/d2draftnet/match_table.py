@@ -0,0 +1,238 @@
+# ========================================================
+# match_table.py
+# ========================================================
+# Extracts match records from the match table of a Dotabuff matches page.
+#
+# extract_matches streams the page through a small html.parser.HTMLParser
+# subclass that only tracks the state of the first <table> and stops at its
+# end, instead of building a full BeautifulSoup tree and searching it per cell.
+# extract_matches_bs4 is the original BeautifulSoup implementation, kept as
+# the reference the streaming parser is tested against.
+
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from datetime import date
+
+# Columns of the match table
+N_COLUMNS = 6
+
+
+class _TableEnd(Exception):
+    """Raised inside the parser once the first table is closed."""
+
+
+class _Capture:
+    """Collects the text of the first element of a kind inside a cell."""
+    def __init__(self):
+        self.parts: Optional[List[str]] = None
+        self.depth = 0  # Open elements of the captured kind, for nested divs
+
+    def start(self):
+        self.parts, self.depth = [], 1
+
+    @property
+    def active(self) -> bool:
+        return self.depth > 0
+
+    def text(self) -> Optional[str]:
+        # Matches BeautifulSoup's get_text(strip=True)
+        if self.parts is None:
+            return None
+        return _strip_join(self.parts)
+
+
+class _Cell:
+    """Streaming state of one <td>."""
+    def __init__(self):
+        self.a = _Capture()
+        self.time = _Capture()
+        self.subtext = _Capture()
+        self.parts: List[str] = []  # All text of the cell
+        self.lead: Optional[str] = None  # First child node if it is text, else "" (contents[0])
+        self.images: List[str] = []
+
+
+def _strip_join(parts: List[str]) -> str:
+    return "".join(part.strip() for part in parts if part.strip())
+
+
+class MatchTableParser(HTMLParser):
+    """
+    Streaming parser for the rows of the first <table> of a page.
+
+    After feed() and close(), rows holds one list of _Cell per <tr>.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[_Cell]] = []
+        self.table_depth = 0
+        self.cell: Optional[_Cell] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self.table_depth += 1
+            return
+        if not self.table_depth:
+            return
+        if tag == "tr":
+            self.cell = None
+            self.rows.append([])
+            return
+        if tag == "td" and self.rows:
+            self.cell = _Cell()
+            self.rows[-1].append(self.cell)
+            return
+
+        cell = self.cell
+        if cell is None:
+            return
+        if cell.lead is None:
+            cell.lead = ""
+
+        if tag == "div" and cell.subtext.active:
+            cell.subtext.depth += 1
+        elif tag == "a" and cell.a.parts is None:
+            cell.a.start()
+        elif tag == "time" and cell.time.parts is None:
+            cell.time.start()
+        elif tag == "div" and cell.subtext.parts is None and "subtext" in (dict(attrs).get("class") or "").split():
+            cell.subtext.start()
+        elif tag == "img":
+            title = dict(attrs).get("title")
+            if title:
+                cell.images.append(title)
+
+    def handle_endtag(self, tag):
+        if not self.table_depth:
+            return
+        if tag == "table":
+            self.table_depth -= 1
+            if not self.table_depth:
+                raise _TableEnd
+            return
+        if tag in ("td", "tr"):
+            self.cell = None
+            return
+
+        cell = self.cell
+        if cell is None:
+            return
+        if tag == "a" and cell.a.active:
+            cell.a.depth = 0
+        elif tag == "time" and cell.time.active:
+            cell.time.depth = 0
+        elif tag == "div" and cell.subtext.active:
+            cell.subtext.depth -= 1
+
+    def handle_data(self, data):
+        cell = self.cell
+        if cell is None:
+            return
+        if cell.lead is None:
+            cell.lead = data
+        cell.parts.append(data)
+        for capture in (cell.a, cell.time, cell.subtext):
+            if capture.active:
+                capture.parts.append(data)
+
+
+def _record(cells: List[_Cell]) -> Optional[Dict[str, Any]]:
+    """Build a match record from the cells of one row, or None to skip it."""
+    td0, td1, td2, td3, td4, td5 = cells[:N_COLUMNS]
+    match_id = td0.a.text()
+    if not match_id:
+        return None
+
+    match_date = td0.time.text()
+    result = td2.a.text()
+    return {
+        "id": match_id,
+        "date": match_date if match_date is not None else str(date.today()),
+        "duration": (td3.lead or "").strip(),
+        "result": result if result is not None else _strip_join(td2.parts),
+        "game_mode": (td1.lead or "").strip(),
+        "skill": td1.subtext.text() or "",
+        "radiant_draft": td4.images,
+        "dire_draft": td5.images,
+    }
+
+
+def extract_matches(html: str) -> List[Dict[str, Any]]:
+    """
+    Extract the match records from the match table of a Dotabuff page.
+
+    Returns the same records as extract_matches_bs4.
+    """
+    parser = MatchTableParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _TableEnd:
+        pass
+
+    records = []
+    # Skip header row
+    for cells in parser.rows[1:]:
+        if len(cells) < N_COLUMNS:
+            continue
+        record = _record(cells)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def extract_matches_bs4(html: str) -> List[Dict[str, Any]]:
+    """
+    Extract the match records with BeautifulSoup (reference implementation).
+    """
+    from bs4 import BeautifulSoup # type: ignore
+
+    records: List[Dict[str, Any]] = []
+    soup = BeautifulSoup(html, "html.parser")
+    table: Any = soup.find("table")
+    if not (table and hasattr(table, "find_all")):
+        return records
+
+    rows = table.find_all("tr")
+    # Skip header row
+    for tr in rows[1:]:
+        tds = tr.find_all("td")
+        if len(tds) < 6:
+            continue
+
+        td0 = tds[0]
+        match_id = td0.find("a").get_text(strip=True) if td0.find("a") else None
+        if not match_id:
+            continue
+
+        match_date = td0.find("time").get_text(strip=True) if td0.find("time") else str(date.today())
+
+        td1 = tds[1]
+        game_mode = td1.contents[0].strip() if td1.contents else ""
+        skill_div = td1.find("div", class_="subtext")
+        skill = skill_div.get_text(strip=True) if skill_div else ""
+
+        td2 = tds[2]
+        result_a = td2.find("a")
+        result = result_a.get_text(strip=True) if result_a else td2.get_text(strip=True)
+
+        td3 = tds[3]
+        duration = td3.contents[0].strip() if td3.contents else ""
+
+        td4 = tds[4]
+        radiant_draft = [img.get("title") for img in td4.find_all("img") if img.get("title")]
+
+        td5 = tds[5]
+        dire_draft = [img.get("title") for img in td5.find_all("img") if img.get("title")]
+
+        records.append({
+            "id": match_id,
+            "date": match_date,
+            "duration": duration,
+            "result": result,
+            "game_mode": game_mode,
+            "skill": skill,
+            "radiant_draft": radiant_draft,
+            "dire_draft": dire_draft
+        })
+    return records
@@ -0,0 +1,98 @@
+# ========================================================
+# migrate_schema.py
+# ========================================================
+# Converts match parquet files from the scraper's v1 schema (strings and
+# hero name lists) to the compact v2 schema of match_schema.py.
+#
+# Usage:
+#     python -m d2draftnet.migrate_schema                    # data/*_match_data.parquet in place
+#     python -m d2draftnet.migrate_schema --out-dir data/v2  # write copies instead
+#     python -m d2draftnet.migrate_schema --store            # v1 fragments of the match store
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+import time
+
+from .config import MATCH_STORE_DIR, PROJECT_DIR
+from .match_schema import MATCH_COLUMNS, schema_version
+from .match_store import _write_atomic, list_fragments, read_table
+
+
+def is_v1_match_file(path: Path) -> bool:
+    """True for a parquet file with the scraper's v1 match columns."""
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(path)
+    return schema_version(schema) == 1 and all(name in schema.names for name in MATCH_COLUMNS)
+
+
+def migrate_file(path: Path, out_path: Optional[Path] = None) -> Tuple[int, int]:
+    """
+    Rewrite a v1 match file in the v2 schema.
+
+    Args:
+        path (Path): v1 parquet file.
+        out_path (Path): Where to write the v2 file, path itself by default.
+
+    Returns:
+        (int, int): File size in bytes before and after.
+    """
+    old_size = path.stat().st_size
+    out_path = out_path or path
+    _write_atomic(read_table(path, version=2), out_path)
+    return old_size, out_path.stat().st_size
+
+
+def migrate_store(store: Path = MATCH_STORE_DIR) -> List[Tuple[Path, int, int]]:
+    """
+    Rewrite the v1 fragments of a match store in place, keeping their names.
+    """
+    return [(fragment, *migrate_file(fragment)) for fragment in list_fragments(store) if is_v1_match_file(fragment)]
+
+
+def load_times(path: Path, columns: Iterable[str], version: int, repeat: int = 3) -> float:
+    """Best time of reading columns of a file, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_table(path, columns=list(columns), version=version)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    import click as ck
+
+    from .match_schema import HERO_COLUMNS
+
+    @ck.command()
+    @ck.argument("paths", nargs=-1, type=ck.Path(exists=True, dir_okay=False, path_type=Path))
+    @ck.option("--out-dir", type=ck.Path(file_okay=False, path_type=Path), default=None,
+               help="Write the v2 files here instead of replacing the originals.")
+    @ck.option("--store", is_flag=True, help="Migrate the v1 fragments of the match store.")
+    def main(paths, out_dir: Optional[Path], store: bool):
+        """Convert match parquet files to the v2 schema."""
+        if store:
+            for fragment, old_size, new_size in migrate_store():
+                ck.echo(f"{fragment}: {old_size:,} -> {new_size:,} bytes")
+            return
+
+        paths = paths or sorted((PROJECT_DIR / "data").glob("*_match_data.parquet"))
+        for path in paths:
+            if not is_v1_match_file(path):
+                ck.secho(f"Skipping {path}: not a v1 match file.", fg="yellow")
+                continue
+            out_path = out_dir / path.name if out_dir else path
+            if out_dir:
+                out_dir.mkdir(parents=True, exist_ok=True)
+
+            old_full = load_times(path, MATCH_COLUMNS, version=1)
+            old_train = load_times(path, ["radiant_draft", "dire_draft", "result"], version=1)
+            old_size, new_size = migrate_file(path, out_path)
+            new_full = load_times(out_path, MATCH_COLUMNS, version=1)
+            new_train = load_times(out_path, HERO_COLUMNS + ["radiant_win"], version=2)
+            ck.secho(f"{path.name}: {old_size:,} -> {new_size:,} bytes ({new_size / old_size:.0%}), "
+                     f"full load {old_full * 1e3:.1f} -> {new_full * 1e3:.1f} ms, "
+                     f"training columns {old_train * 1e3:.1f} -> {new_train * 1e3:.1f} ms", fg="green")
+
+    main()
@@ -0,0 +1,73 @@
+# ========================================================
+# numpy_predictor.py
+# ========================================================
+# Pure-NumPy inference for a DraftPredictionNN exported with export_numpy.py.
+# Importing this module does not import torch.
+
+from pathlib import Path
+import numpy as np
+
+from .config import HEROS, NUMPY_MODEL_PATH
+from .encoding import encode_draft_pairs, encode_drafts
+
+
+class NumpyDraftPredictor:
+    """
+    Predicts Radiant win probabilities from an exported .npz weight bundle.
+    """
+    def __init__(self, bundle_path: Path = NUMPY_MODEL_PATH):
+        with np.load(bundle_path) as bundle:
+            if bundle["heroes"].tolist() != HEROS:
+                raise ValueError(f"{bundle_path} was exported with a different hero list; re-export the model")
+            self.embedding = bundle["embedding"]
+            n_layers = sum(1 for name in bundle.files if name.startswith("weight_"))
+            # Pre-transpose so each layer is x @ W + b
+            self.layers = [(bundle[f"weight_{i}"].T.copy(), bundle[f"bias_{i}"]) for i in range(n_layers)]
+
+    def encode_team(self, team: np.ndarray) -> np.ndarray:
+        """
+        Mean of the hero embeddings of [N, 5] hero indices, shape [N, embedding_dim].
+
+        Padding slots (index 0) are left out of the mean, as in DraftPredictionNN.encode_team.
+        """
+        picked = (team != 0)[..., None]
+        return (self.embedding[team] * picked).sum(axis=1) / np.maximum(picked.sum(axis=1), 1)
+
+    def score_pair(self, radiant_embed: np.ndarray, dire_embed: np.ndarray) -> np.ndarray:
+        """Apply the MLP head to team embeddings, returning probabilities of shape [N]."""
+        x = np.concatenate([radiant_embed, dire_embed], axis=1)
+        for weight, bias in self.layers[:-1]:
+            x = np.maximum(x @ weight + bias, 0.0)
+        weight, bias = self.layers[-1]
+        logits = (x @ weight + bias).reshape(-1)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict(self, radiant_heroes, dire_heroes) -> float:
+        """Predict the probability of a Radiant victory for one draft."""
+        radiant = encode_drafts([radiant_heroes], team_size=max(len(radiant_heroes), 1))
+        dire = encode_drafts([dire_heroes], team_size=max(len(dire_heroes), 1))
+        return float(self.score_pair(self.encode_team(radiant), self.encode_team(dire))[0])
+
+    def predict_drafts(self, drafts, dire=None, chunk_size: int = 65536) -> np.ndarray:
+        """
+        Predict the probability of a Radiant victory for many drafts at once.
+
+        Accepts the same inputs as DraftPredictor.predict_drafts.
+        """
+        radiant_idx, dire_idx = encode_draft_pairs(drafts, dire)
+        probabilities = np.empty(len(radiant_idx), dtype=np.float32)
+        for start in range(0, len(radiant_idx), chunk_size):
+            stop = start + chunk_size
+            probabilities[start:stop] = self.score_pair(
+                self.encode_team(radiant_idx[start:stop]), self.encode_team(dire_idx[start:stop])
+            )
+        return probabilities
+
+
+if __name__ == "__main__":
+    predictor = NumpyDraftPredictor()
+    radiant_heroes = ["Lycan", "Enchantress", "Dragon Knight", "Lion", "Ember Spirit"]
+    dire_heroes = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
+    prediction = predictor.predict(radiant_heroes, dire_heroes)
+    winner = "Radiant" if prediction > 0.5 else "Dire"
+    print(f"{winner} wins with confidence {prediction:.2f}")
@@ -0,0 +1,105 @@
+# ========================================================
+# pick_recommender.py
+# ========================================================
+# Ranks every available hero for the next pick of a partial draft.
+#
+# A team embedding is the mean of its hero embeddings, so adding candidate c
+# to a team with embedding sum S and n heroes gives (S + v_c) / (n + 1).
+# All candidates are therefore scored with a single batched pass through the
+# MLP head instead of one full forward (and model load) per hero.
+
+from typing import Iterable, List, Optional, Tuple
+import torch
+
+from .config import HEROS, HERO_MAP
+from .embedding_model import DraftPredictionNN
+from .encoding import TEAM_SIZE
+from .predict_embedding_model import DraftPredictor
+
+SIDES = ("radiant", "dire")
+
+
+def _hero_indices(heroes: Iterable[str]) -> List[int]:
+    """Convert hero names to indices, rejecting unknown heroes."""
+    indices = []
+    for hero in heroes:
+        if hero not in HERO_MAP:
+            raise KeyError(f"Unknown hero: {hero}")
+        indices.append(HERO_MAP[hero])
+    return indices
+
+
+class PickRecommender:
+    """
+    Scores all candidate heroes for the next pick with one batched forward pass.
+    """
+    def __init__(self, predictor: Optional[DraftPredictor] = None, model: Optional[DraftPredictionNN] = None):
+        if model is None:
+            model = (predictor or DraftPredictor()).model
+        self.model = model.eval()
+        self.hero_embeddings = model.embedding.weight.detach()  # Shape [num_heroes, embedding_dim]
+
+    def team_sum(self, team: List[int]) -> torch.Tensor:
+        """Sum of the hero embeddings of a team, shape [embedding_dim]."""
+        return self.hero_embeddings[team].sum(dim=0)
+
+    def available_heroes(self, radiant: List[int], dire: List[int], banned: List[int]) -> torch.Tensor:
+        """Indices of heroes that are neither picked nor banned."""
+        available = torch.ones(len(self.hero_embeddings), dtype=torch.bool)
+        available[0] = False  # Padding index
+        available[radiant + dire + banned] = False
+        return available.nonzero().view(-1)
+
+    def score_candidates(self, radiant: List[int], dire: List[int], candidates: torch.Tensor,
+                         side: str = "radiant") -> torch.Tensor:
+        """
+        Probability of a Radiant victory after side picks each candidate.
+
+        Teams are averaged over the heroes picked so far, matching predict_draft
+        for partial drafts. An empty team embeds to the zero vector.
+        """
+        picking, other = (radiant, dire) if side == "radiant" else (dire, radiant)
+        picking_embed = (self.team_sum(picking) + self.hero_embeddings[candidates]) / (len(picking) + 1)
+        other_embed = self.team_sum(other) / max(len(other), 1)
+        other_embed = other_embed.expand_as(picking_embed)
+
+        with torch.inference_mode():
+            if side == "radiant":
+                return self.model.score_pair(picking_embed, other_embed).view(-1)
+            return self.model.score_pair(other_embed, picking_embed).view(-1)
+
+    def recommend(self, radiant_heroes: Iterable[str], dire_heroes: Iterable[str], side: str = "radiant",
+                  banned: Iterable[str] = (), top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Rank the available heroes for the next pick of side.
+
+        Args:
+            radiant_heroes: Heroes picked by Radiant so far.
+            dire_heroes: Heroes picked by Dire so far.
+            side (str): "radiant" or "dire", the team making the pick.
+            banned: Banned heroes, excluded along with the picked ones.
+            top_k (int): Number of recommendations to return.
+
+        Returns:
+            list: (hero, win probability for side) pairs, best first.
+        """
+        if side not in SIDES:
+            raise ValueError(f"side must be one of {SIDES}, got {side!r}")
+        radiant, dire = _hero_indices(radiant_heroes), _hero_indices(dire_heroes)
+        if len(radiant if side == "radiant" else dire) >= TEAM_SIZE:
+            raise ValueError(f"The {side} team has already picked {TEAM_SIZE} heroes")
+
+        candidates = self.available_heroes(radiant, dire, _hero_indices(banned))
+        radiant_win = self.score_candidates(radiant, dire, candidates, side)
+        win = radiant_win if side == "radiant" else 1 - radiant_win
+
+        best = torch.topk(win, k=min(top_k, len(candidates)))
+        return [(HEROS[candidates[i] - 1], p) for i, p in zip(best.indices.tolist(), best.values.tolist())]
+
+
+if __name__ == "__main__":
+    recommender = PickRecommender()
+    radiant_heroes = ["Lycan", "Enchantress", "Dragon Knight", "Lion"]
+    dire_heroes = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
+    for hero, probability in recommender.recommend(radiant_heroes, dire_heroes, side="radiant", top_k=5):
+        print(f"{hero:<24} {probability:.2%}")
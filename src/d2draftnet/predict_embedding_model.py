@@ -1,7 +1,11 @@
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
 import torch
 import torch.nn as nn
 from d2draftnet.embedding_model import DraftPredictionNN, load_model
 from d2draftnet.config import MODEL_PATH, HERO_MAP, EMBEDDING_DIM, LAYERS, NUM_HEROS
+from d2draftnet.encoding import encode_draft_pairs
 
 def get_hero_indices(hero_list):
     """Convert hero names to model input indices."""
@@ -27,6 +31,131 @@ def predict_draft(radiant_heroes, dire_heroes):
         prediction = model(radiant_team, dire_team)
         return prediction.item()
 
+class TeamEmbeddingCache:
+    """
+    LRU cache of team embedding vectors keyed by the sorted hero-index tuple,
+    packed into one int64 with 8 bits per hero.
+
+    The team embedding is a mean, so hero order does not matter. Repeated teams
+    within a batch are encoded once, and teams seen in earlier calls are not
+    encoded again while they stay within max_size.
+    """
+    def __init__(self, model: DraftPredictionNN, max_size: int = 100_000):
+        self.model = model
+        self.max_size = max_size
+        self.vectors: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def encode(self, teams) -> torch.Tensor:
+        """
+        Team embeddings for an [N, 5] array of hero indices.
+
+        Returns:
+            torch.Tensor: Shape [N, embedding_dim].
+        """
+        teams = np.sort(np.asarray(teams, dtype=np.int64).reshape(len(teams), -1), axis=1)
+
+        # De-duplicate on the packed keys, which is a fast 1-D unique
+        keys = (teams << (8 * np.arange(teams.shape[1]))).sum(axis=1)
+        unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        vectors = [None] * len(unique_keys)
+        missing = []
+        for i, key in enumerate(unique_keys.tolist()):
+            vector = self.vectors.get(key)
+            if vector is None:
+                missing.append(i)
+            else:
+                self.vectors.move_to_end(key)
+                vectors[i] = vector
+
+        if missing:
+            with torch.inference_mode():
+                encoded = self.model.encode_team(torch.from_numpy(teams[first[missing]]))
+            for i, vector in zip(missing, encoded.clone().unbind()):
+                vectors[i] = vector
+                self.vectors[int(unique_keys[i])] = vector
+            while len(self.vectors) > self.max_size:
+                self.vectors.popitem(last=False)
+
+        self.misses += len(missing)
+        self.hits += len(teams) - len(missing)
+        if not vectors:
+            return torch.empty(0, self.model.embedding.embedding_dim)
+        return torch.stack(vectors)[torch.from_numpy(inverse.reshape(-1))]
+
+class DraftPredictor:
+    """
+    Loads the trained model once and keeps it resident in eval mode.
+
+    Use this instead of predict_draft when scoring many drafts, e.g. from a
+    live match feed, to avoid deserialising the weights on every call.
+    """
+    def __init__(self, model_path: Path = MODEL_PATH, num_heroes: int = NUM_HEROS,
+                 embedding_dim: int = EMBEDDING_DIM, layers: list = LAYERS, team_cache_size: int = 0):
+        self.model_path = model_path
+        self.model = DraftPredictionNN(num_heroes=num_heroes, embedding_dim=embedding_dim, dropout_prob=1e-3, layers=layers)
+        self.model.load_state_dict(torch.load(model_path))
+        self.model.eval()
+
+        # Cache team embeddings across predict_drafts calls, e.g. when scanning matchups
+        self.team_cache = TeamEmbeddingCache(self.model, team_cache_size) if team_cache_size > 0 else None
+
+    def predict(self, radiant_heroes, dire_heroes) -> float:
+        """Predict the probability of a Radiant victory for one draft."""
+        radiant_team = get_hero_indices(radiant_heroes)
+        dire_team = get_hero_indices(dire_heroes)
+        with torch.inference_mode():
+            return self.model(radiant_team, dire_team).item()
+
+    def predict_drafts(self, drafts, dire=None, chunk_size: int = 65536) -> np.ndarray:
+        """
+        Predict the probability of a Radiant victory for many drafts at once.
+
+        Args:
+            drafts: Drafts in any form accepted by encode_draft_pairs.
+            dire: The dire side when drafts holds only the radiant side.
+            chunk_size (int): Maximum number of drafts per forward pass.
+
+        Returns:
+            np.ndarray: float32 array of shape [N] with one probability per draft.
+        """
+        radiant_idx, dire_idx = encode_draft_pairs(drafts, dire)
+        if self.team_cache is not None:
+            return self._predict_cached(radiant_idx, dire_idx, chunk_size)
+
+        radiant_team = torch.from_numpy(np.ascontiguousarray(radiant_idx, dtype=np.int64))
+        dire_team = torch.from_numpy(np.ascontiguousarray(dire_idx, dtype=np.int64))
+
+        probabilities = np.empty(len(radiant_team), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(radiant_team), chunk_size):
+                stop = start + chunk_size
+                outputs = self.model(radiant_team[start:stop], dire_team[start:stop])
+                probabilities[start:stop] = outputs.view(-1).numpy()
+        return probabilities
+
+    def _predict_cached(self, radiant_idx, dire_idx, chunk_size: int) -> np.ndarray:
+        """Score drafts by applying the MLP head to cached team embeddings."""
+        probabilities = np.empty(len(radiant_idx), dtype=np.float32)
+        for start in range(0, len(radiant_idx), chunk_size):
+            stop = start + chunk_size
+            radiant_embed = self.team_cache.encode(radiant_idx[start:stop])
+            dire_embed = self.team_cache.encode(dire_idx[start:stop])
+            with torch.inference_mode():
+                probabilities[start:stop] = self.model.score_pair(radiant_embed, dire_embed).view(-1).numpy()
+        return probabilities
+
+def predict_drafts(drafts, dire=None, chunk_size: int = 65536, model_path: Path = MODEL_PATH) -> np.ndarray:
+    """Loads the trained model and predicts many draft outcomes in one vectorised pass."""
+    return DraftPredictor(model_path).predict_drafts(drafts, dire, chunk_size=chunk_size)
+
 if __name__ == "__main__":
     radiant_heroes = ["Lycan", "Enchantress", "Dragon Knight", "Lion", "Ember Spirit"]
     dire_heroes = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
@@ -1,8 +1,9 @@
 from pathlib import Path
 import click as ck
-import pandas as pd
 
 from d2draftnet.config import MATCH_DATA_PATH
+from d2draftnet.match_store import _to_table, _write_atomic, read_table
+from d2draftnet.migrate_schema import is_v1_match_file
 
 """
 Remove repeated entries from a JSON file.
@@ -11,8 +12,9 @@ Remove repeated entries from a JSON file.
 def remove_repeats(file_path: Path):
     """Removed match which do not a unique match ID."""
 
-    # Load the data
-    df = pd.read_parquet(file_path)
+    # Load the data, as v1 records whichever schema the file is in
+    was_v1 = is_v1_match_file(file_path)
+    df = read_table(file_path).to_pandas()
 
     # Get the total number of data points
     N_total = len(df)
@@ -28,7 +30,11 @@ def remove_repeats(file_path: Path):
 
     # Save the changes if the user confirms
     if ck.confirm("Do you want to save the changes?"):
-        df.to_parquet(file_path, index=False)
+        # Keep the file's schema, so a migrated file stays v2
+        if was_v1:
+            df.to_parquet(file_path, index=False)
+        else:
+            _write_atomic(_to_table(df), file_path)
         ck.secho(f"Saved changes to {file_path}.", fg="green")
         ck.secho(f"Total entries: {len(df)}.", fg="green")
 
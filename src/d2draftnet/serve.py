@@ -0,0 +1,99 @@
+# ========================================================
+# serve.py
+# ========================================================
+# Serves draft predictions from a resident DraftPredictor.
+#
+# JSON-lines over stdin/stdout:
+#   echo '{"radiant": ["Axe", ...], "dire": ["Lion", ...]}' | python -m d2draftnet.serve
+# Local HTTP server (POST the same JSON to /predict):
+#   python -m d2draftnet.serve --http 8000
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+import json
+import sys
+import click as ck
+
+from .config import MODEL_PATH
+from .predict_embedding_model import DraftPredictor
+
+
+def handle_request(predictor: DraftPredictor, request: dict) -> dict:
+    """
+    Answer a single prediction request.
+
+    Args:
+        predictor (DraftPredictor): Resident predictor.
+        request (dict): {"radiant": [hero names], "dire": [hero names]}.
+
+    Returns:
+        dict: {"radiant_win": probability} or {"error": message}.
+    """
+    try:
+        return {"radiant_win": predictor.predict(request["radiant"], request["dire"])}
+    except (KeyError, TypeError, ValueError, RuntimeError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def serve_stdin(predictor: DraftPredictor, stdin=sys.stdin, stdout=sys.stdout):
+    """Answer one JSON request per input line until EOF."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            response = handle_request(predictor, json.loads(line))
+        except json.JSONDecodeError as e:
+            response = {"error": f"JSONDecodeError: {e}"}
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def make_http_server(predictor: DraftPredictor, host: str, port: int) -> HTTPServer:
+    """Build an HTTP server answering POST /predict with the resident predictor."""
+
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/predict":
+                self.send_error(404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                response = handle_request(predictor, json.loads(self.rfile.read(length)))
+            except json.JSONDecodeError as e:
+                response = {"error": f"JSONDecodeError: {e}"}
+            body = json.dumps(response).encode()
+            self.send_response(400 if "error" in response else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HTTPServer((host, port), PredictionHandler)
+
+
+@ck.command()
+@ck.option("--model-path", type=ck.Path(path_type=Path), default=MODEL_PATH, show_default=True)
+@ck.option("--http", "port", type=int, default=None, help="Serve HTTP on this port instead of stdin.")
+@ck.option("--host", default="127.0.0.1", show_default=True)
+def main(model_path: Path, port, host: str):
+    """Serve draft predictions from a model loaded once."""
+    predictor = DraftPredictor(model_path)
+    if port is None:
+        serve_stdin(predictor)
+        return
+
+    server = make_http_server(predictor, host, port)
+    ck.secho(f"Serving predictions on http://{host}:{port}/predict", fg="green", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# ========================================================
+# stub_server.py
+# ========================================================
+# A local stand-in for the Dotabuff match pages, used by the scraper tests
+# and benchmarks: match records are rendered as match table pages and served
+# over HTTP at /matches?page=N, so the scraper runs end to end offline.
+
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import threading
+import time
+
+
+def render_matches_page(records) -> str:
+    """Render match records as a Dotabuff-style match table page."""
+    def heroes(draft):
+        return "".join(
+            f'<div class="image-container"><a href="/heroes/{escape(hero.lower())}">'
+            f'<img class="image-hero image-icon" title="{escape(hero)}" src="/assets/heroes/hero.jpg"></a></div>'
+            for hero in draft
+        )
+
+    rows = "".join(
+        f'<tr><td class="cell-large"><a href="/matches/{r["id"]}">{r["id"]}</a>'
+        f'<div class="subtext"><time datetime="{r["date"]}T00:00:00+00:00">{r["date"]}</time></div></td>'
+        f'<td>{escape(r["game_mode"])}<div class="subtext">{escape(r["skill"])}</div></td>'
+        f'<td><a class="{"won" if r["result"] == "Radiant Victory" else "lost"}" href="/matches/{r["id"]}">'
+        f'{escape(r["result"])}</a></td>'
+        f'<td>{r["duration"]}<div class="bar bar-default"><div class="segment" style="width: 50%"></div></div></td>'
+        f'<td class="r-none-mobile">{heroes(r["radiant_draft"])}</td>'
+        f'<td class="r-none-mobile">{heroes(r["dire_draft"])}</td></tr>'
+        for r in records
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Matches - DOTABUFF</title></head><body><div class="content-inner">'
+        '<table class="table table-striped"><thead><tr><th>Match</th><th>Mode</th><th>Result</th>'
+        '<th>Duration</th><th>Radiant</th><th>Dire</th></tr></thead>'
+        f'<tbody>{rows}</tbody></table></div></body></html>'
+    )
+
+
+class StubDotabuffServer:
+    """
+    Local HTTP server serving canned match pages at /matches?page=N.
+
+    Pages past the end return 404 and pages given as None return 503. Use as
+    a context manager; base_url is the page URL template to pass to the scraper.
+    """
+    def __init__(self, pages, delay: float = 0.0):
+        self.pages = [page if page is None or isinstance(page, str) else render_matches_page(page) for page in pages]
+        self.delay = delay
+        self.requests = 0
+        self.requested_pages = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def do_GET(self):
+                stub.requests += 1
+                page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+                stub.requested_pages.append(page)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if not 1 <= page <= len(stub.pages):
+                    body, status = b"Not found", 404
+                elif stub.pages[page - 1] is None:
+                    body, status = b"Service unavailable", 503
+                else:
+                    body, status = stub.pages[page - 1].encode(), 200
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/matches?page={{}}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def stub_pages_from_parquet(per_page: int = 50, max_pages: int = 40):
+    """Split the bundled match data into pages of records for StubDotabuffServer."""
+    from .config import load_data
+
+    records = load_data().head(per_page * max_pages)
+    records = [dict(r, radiant_draft=list(r["radiant_draft"]), dire_draft=list(r["dire_draft"]))
+               for r in records.to_dict("records")]
+    return [records[i:i + per_page] for i in range(0, len(records), per_page)]
@@ -0,0 +1,252 @@
+# ========================================================
+# sweep.py
+# ========================================================
+# Parallel hyperparameter sweeps over ModelTraining.
+#
+# Trials run in a process pool, one torch thread each, so a sweep keeps every
+# core busy without the trials competing for threads. The encoded drafts are
+# cached once before the pool starts (see draft_cache.py), so no worker parses
+# the match data; each trial memory-maps the .npy file and copies its train
+# and test splits into its own tensors, so a sweep holds one copy of the
+# dataset per worker.
+#
+# Each finished trial is appended as one JSON line to the results file,
+# keyed by a hash of its parameters and run settings, including the test
+# fraction and a fingerprint of the match data. A trial that raises is recorded with its
+# error instead of metrics and does not stop the others. Running the same
+# sweep again skips the trials already finished, and retries failed ones, so
+# an interrupted sweep resumes where it stopped.
+#
+# Usage:
+#     python -m d2draftnet.sweep --embedding-dim 2,3,4 --learning-rate 5e-4,1e-3
+#     python -m d2draftnet.sweep --random 20 --layers 32x16,64x32   # random search
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import hashlib
+import json
+import os
+import time
+
+from .config import MODEL_PATH
+
+SWEEP_RESULTS_PATH = MODEL_PATH.parent / "sweep_results.jsonl"
+
+# Parameters searched over and the values of the base model
+SEARCH_PARAMS = ["embedding_dim", "dropout_prob", "batch_size", "learning_rate", "layers"]
+BASE_PARAMS = {"embedding_dim": 3, "dropout_prob": 1e-3, "batch_size": 64, "learning_rate": 5e-4, "layers": [32, 16]}
+
+
+def grid_trials(space: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+    """
+    Every combination of the values in a search space.
+
+    Args:
+        space (dict): Parameter name -> list of values. Parameters missing
+            from the space keep their BASE_PARAMS value.
+    """
+    names = list(space)
+    return [{**BASE_PARAMS, **dict(zip(names, values))} for values in product(*(space[name] for name in names))]
+
+
+def random_trials(space: Dict[str, Sequence], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    n distinct trials drawn uniformly from the values of a search space.
+
+    Fewer are returned if the space has fewer than n combinations.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    trials: Dict[str, Dict[str, Any]] = {}
+    for _ in range(n * 20):
+        if len(trials) == n:
+            break
+        params = {**BASE_PARAMS, **{name: values[rng.integers(len(values))] for name, values in space.items()}}
+        trials.setdefault(trial_id(params), params)
+    return list(trials.values())
+
+
+def trial_id(params: Dict[str, Any], **settings) -> str:
+    """Stable ID of a trial's parameters and run settings, see run_settings."""
+    return hashlib.sha1(json.dumps({**params, **settings}, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def run_settings(epochs: int, seed: Optional[int] = 0, train_test_split: float = 0.2,
+                 source: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    The settings besides its parameters that a trial ID is keyed on.
+
+    The match data is identified by its fingerprint, so a sweep rerun on
+    another source, or after matches were added, runs its trials again.
+    """
+    from .draft_cache import parquet_fingerprint
+    from .match_store import match_source
+
+    return {"epochs": epochs, "seed": seed, "train_test_split": train_test_split,
+            "data": parquet_fingerprint(source or match_source())}
+
+
+def finished_ids(records: Iterable[Dict[str, Any]]) -> set:
+    """IDs of the trials that finished without an error."""
+    return {record["trial_id"] for record in records if "error" not in record}
+
+
+def load_results(path: Path = SWEEP_RESULTS_PATH) -> List[Dict[str, Any]]:
+    """Trial records of a results file; a torn last line is ignored."""
+    if not path.exists():
+        return []
+    records = []
+    for line in path.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def run_trial(params: Dict[str, Any], epochs: int, train_test_split: float = 0.2, seed: Optional[int] = 0,
+              source: Optional[Path] = None, num_threads: int = 1) -> Dict[str, Any]:
+    """
+    Train and evaluate one model, returning its metrics and timings.
+
+    Runs in a pool worker, so the ModelTraining output is discarded.
+    """
+    import contextlib
+    import io
+    from .train_embedding_model import ModelTraining
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        trainer = ModelTraining(
+            embedding_dim=params["embedding_dim"], dropout_prob=params["dropout_prob"],
+            batch_size=params["batch_size"], learning_rate=params["learning_rate"], epochs=epochs,
+            layers=list(params["layers"]), train_test_split=train_test_split, seed=seed, source=source,
+            num_threads=num_threads,
+        )
+        loaded = time.perf_counter()
+        train_accuracy = trainer.train_model(show_plot=False, verbose=False, return_data=True)
+        trained = time.perf_counter()
+        test_accuracy = trainer.evaluate_model()
+    return {
+        **params,
+        "epochs": epochs,
+        "train_accuracy": float(train_accuracy[-1]) if train_accuracy else None,
+        "test_accuracy": float(test_accuracy),
+        "load_seconds": loaded - start,
+        "train_seconds": trained - loaded,
+        "eval_seconds": time.perf_counter() - trained,
+        "pid": os.getpid(),
+    }
+
+
+def run_sweep(trials: Iterable[Dict[str, Any]], epochs: int, results_path: Path = SWEEP_RESULTS_PATH,
+              max_workers: Optional[int] = None, source: Optional[Path] = None, seed: Optional[int] = 0,
+              train_test_split: float = 0.2, on_result=None) -> List[Dict[str, Any]]:
+    """
+    Run the trials not yet in the results file in a process pool.
+
+    Args:
+        trials: Parameter dicts, see grid_trials and random_trials.
+        epochs (int): Training epochs per trial.
+        results_path (Path): JSON lines file the trial records are appended to.
+        max_workers (int): Pool size, one per CPU by default.
+        source (Path): Match parquet file or store directory, the current patch by default.
+        seed (int): Seed of the train/test split and shuffling, the same for every trial.
+        train_test_split (float): Test fraction.
+        on_result: Called with each new trial record as it finishes.
+
+    Returns:
+        list: Every record in the results file, finished trials of earlier runs
+            included. Failed trials have an "error" field instead of metrics.
+    """
+    from .draft_cache import load_encoded_drafts
+    from .match_store import match_source
+
+    source = source or match_source()
+    settings = run_settings(epochs, seed, train_test_split, source)
+    done = finished_ids(load_results(results_path))
+    pending = {trial_id(params, **settings): params for params in trials}
+    pending = {key: params for key, params in pending.items() if key not in done}
+    if pending:
+        # Build the cache once; the workers only memory-map it
+        load_encoded_drafts(source)
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        if results_path.exists() and not results_path.read_bytes().endswith(b"\n"):
+            # Terminate a line torn by a crash so the next record starts on its own line
+            with open(results_path, "a") as f:
+                f.write("\n")
+
+        import multiprocessing
+
+        # spawn, not fork: a forked torch process can deadlock in its thread pools
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context) as pool:
+            futures = {pool.submit(run_trial, params, epochs, train_test_split, seed, source): key
+                       for key, params in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    record = {"trial_id": key, **future.result()}
+                except Exception as e:
+                    # Keep the other trials going; the failed one is retried by the next run
+                    record = {"trial_id": key, **pending[key], "epochs": epochs, "error": f"{type(e).__name__}: {e}"}
+                with open(results_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+                if on_result is not None:
+                    on_result(record)
+    return load_results(results_path)
+
+
+if __name__ == "__main__":
+    import click as ck
+
+    def _values(cast):
+        def parse(ctx, param, value):
+            return [cast(item) for item in value.split(",")] if value else None
+        return parse
+
+    def _layers(text: str) -> List[int]:
+        return [int(size) for size in text.split("x")]
+
+    @ck.command()
+    @ck.option("--embedding-dim", callback=_values(int), help="Comma separated values, e.g. 2,3,4.")
+    @ck.option("--dropout-prob", callback=_values(float))
+    @ck.option("--batch-size", callback=_values(int))
+    @ck.option("--learning-rate", callback=_values(float))
+    @ck.option("--layers", callback=_values(_layers), help="Layer sizes joined by x, e.g. 32x16,64x32.")
+    @ck.option("--random", "n_random", type=int, default=None, help="Draw this many trials instead of the grid.")
+    @ck.option("--epochs", default=10, show_default=True)
+    @ck.option("--workers", type=int, default=None, help="Pool size, one per CPU by default.")
+    @ck.option("--results", type=ck.Path(dir_okay=False, path_type=Path), default=SWEEP_RESULTS_PATH,
+               show_default=True)
+    @ck.option("--seed", default=0, show_default=True)
+    def main(embedding_dim, dropout_prob, batch_size, learning_rate, layers, n_random, epochs, workers, results, seed):
+        """Train a grid or random sample of models in parallel and record their metrics."""
+        space = {name: values for name, values in zip(SEARCH_PARAMS, [
+            embedding_dim, dropout_prob, batch_size, learning_rate, layers]) if values}
+        trials = random_trials(space, n_random, seed) if n_random else grid_trials(space)
+        done = finished_ids(load_results(results))
+        settings = run_settings(epochs, seed)
+        ids = {trial_id(params, **settings) for params in trials}
+        ck.echo(f"{len(trials)} trials, {len(ids & done)} already in {results}")
+
+        def report(record):
+            if "error" in record:
+                ck.secho(f"{record['trial_id']}  failed: {record['error']}", fg="red")
+                return
+            ck.echo(f"{record['trial_id']}  test {record['test_accuracy']:.2%}  "
+                    f"train {record['train_seconds']:.1f}s  "
+                    + ", ".join(f"{name}={record[name]}" for name in SEARCH_PARAMS))
+
+        start = time.perf_counter()
+        records = run_sweep(trials, epochs, results, max_workers=workers, seed=seed, on_result=report)
+        ck.secho(f"Finished in {time.perf_counter() - start:.1f}s", fg="green")
+
+        finished = [r for r in records if r["trial_id"] in ids and "error" not in r]
+        for record in sorted(finished, key=lambda r: -r["test_accuracy"])[:10]:
+            ck.echo(f"{record['test_accuracy']:8.2%}  " + ", ".join(f"{name}={record[name]}" for name in SEARCH_PARAMS))
+
+    main()
@@ -1,18 +1,31 @@
-from sklearn.model_selection import train_test_split
-from scipy.stats import binom
+# sklearn, scipy and matplotlib are imported on the code paths that use them
 from dataclasses import dataclass
 from torch.utils.data import DataLoader
-from sklearn.metrics import accuracy_score
 from pathlib import Path
-from typing import Any, Optional, List
-import matplotlib.pyplot as plt
+from typing import Any, Dict, Optional, List, Tuple
+import time
 import torch.optim as optim
 import torch.nn as nn
 import numpy as np
 import torch
 
-from .config import HEROS, MATCH_DATA_PATH, MODEL_PATH, load_data
-from .embedding_model import Dota2DraftDataset, DraftPredictionNN
+from .checkpoints import BEST_CHECKPOINT, LAST_CHECKPOINT, EarlyStopping, load_checkpoint, save_checkpoint
+from .config import HEROS, MATCH_STORE_DIR, MODEL_PATH, current_patch_for_parquet, load_data
+from .draft_cache import (
+    PATCH_TABLE_COLUMNS, decay_weights, encode_patch_table, load_encoded_drafts, load_patch_drafts,
+)
+from .match_store import match_source, read_patches, read_table
+from .training_metrics import TIMING_SECTIONS, MetricAccumulator, TrainingHistory, evaluate_batches
+from .embedding_model import (
+    Dota2DraftDataset, DraftBatchSampler, DraftPredictionNN, EncodedDraftDataset, StreamingDraftDataset,
+    remap_embedding,
+)
+
+
+def _stack_collate(samples):
+    """Collate per-sample (radiant, dire, label) tuples into batch tensors."""
+    return tuple(torch.stack(column) for column in zip(*samples))
+
 
 @dataclass
 class ModelTraining:
@@ -24,50 +37,174 @@ class ModelTraining:
     layers: list 
     train_test_split: float
     trained_models_dir: Path = MODEL_PATH.parent
+    encoded_dataset: bool = True  # Encode all drafts once instead of per sample
+    drop_last: bool = False  # Drop the last incomplete training batch
+    seed: Optional[int] = None  # Seed for the train/test split and batch shuffling
+    patches: Optional[List[str]] = None  # Train on these patches, oldest first, the current one by default
+    store: Path = MATCH_STORE_DIR  # Match store the patches are read from
+    filters: Any = None  # Row filters pushed down to the parquet reader, see match_store.filter_expression
+    streaming: bool = False  # Stream row groups instead of loading the dataset; splits on a hash of the match ID
+    buffer_size: int = 65536  # Matches held and shuffled at once when streaming
+    num_workers: int = 0  # DataLoader worker processes; 0 loads batches in the training process
+    pin_memory: bool = False  # Page-locked batches for faster host-to-GPU copies (ignored without CUDA)
+    persistent_workers: bool = False  # Keep loader workers alive between epochs (not when streaming)
+    num_threads: Optional[int] = None  # torch intra-op threads, torch's default (one per core) if None
+    lr_scaling: Optional[str] = None  # "linear" or "sqrt": scale learning_rate by batch_size / base_batch_size
+    base_batch_size: int = 64  # Batch size learning_rate was tuned for
+    source: Optional[Path] = None  # Parquet file or store directory to train on instead of patches
+    engine: str = "loader"  # "loader" iterates the DataLoader; "resident" slices batches out of the resident tensors
+    compile: bool = False  # torch.compile the forward pass and loss
+    eval_every: Optional[int] = None  # Full test pass every N steps, as costly as the epoch-end one, see self.history
+    checkpoint_dir: Optional[Path] = None  # Write best.pt and last.pt here after every epoch, see checkpoints.py
+    patience: Optional[int] = None  # Stop after this many epochs without a lower test log-loss
+    min_delta: float = 0.0  # Smallest test log-loss decrease that counts as an improvement
+    restore_best: bool = True  # With patience set, end training on the weights of the best epoch
+    resume: bool = False  # Continue from checkpoint_dir/last.pt; epochs is then the total budget
+    warm_start: Optional[Path] = None  # Start from these weights (a saved model or checkpoint), see load_warm_start
+    warm_start_heroes: Optional[List[str]] = None  # Hero list of the warm start weights if it is not stored with them
+    half_life_days: Optional[float] = None  # Weight the training loss by 0.5 ** (days before the newest match / this)
+    patch_decay: Optional[float] = None  # ...and by this factor per patch before the last of patches
 
     def __post_init__(self):
+        from sklearn.model_selection import train_test_split
+
         # Check if CUDA is available and set device
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {self.device}")
 
+        if self.engine not in ("loader", "resident"):
+            raise ValueError(f"engine must be 'loader' or 'resident', not {self.engine!r}")
+        if self.engine == "resident" and (self.streaming or not self.encoded_dataset):
+            raise ValueError("The resident engine needs the encoded, non-streaming dataset")
+        weighted = self.half_life_days is not None or self.patch_decay is not None
+        if weighted and (self.streaming or not self.encoded_dataset):
+            raise ValueError("Sample weights need the encoded, non-streaming dataset")
+        if self.source and self.patches:
+            raise ValueError("Give either source or patches; patches are read from the store")
+        if self.streaming and self.persistent_workers and self.num_workers > 0:
+            # Persistent workers keep their copy of the dataset, so set_epoch() would never reach them
+            raise ValueError("persistent_workers would repeat the first epoch's shuffle when streaming")
+        if self.num_threads is not None:
+            torch.set_num_threads(self.num_threads)
+
         # Ensure the trained models directory exists
         self.trained_models_dir.mkdir(parents=True, exist_ok=True)
 
-        # Load the dataframe
+        # Load the data
+        weights = None
         try:
-            data = load_data()
-            print(f"Loaded data from {MATCH_DATA_PATH}...")
+            if self.streaming:
+                # Only the sources; row groups are read by the loaders as batches are drawn
+                if self.source:
+                    data = [self.source]
+                else:
+                    data = [match_source(patch, self.store) for patch in self.patches or [current_patch_for_parquet]]
+            elif self.encoded_dataset and (self.filters or (self.source and weighted)):
+                # Only the hero, label and date columns of the matching rows are read
+                if self.source:
+                    import pyarrow as pa
+
+                    # The whole source counts as one patch
+                    patches = [self.source.name]
+                    table = read_table(self.source, PATCH_TABLE_COLUMNS, version=2, filters=self.filters)
+                    table = table.append_column("patch", pa.array(patches * table.num_rows, pa.string()))
+                else:
+                    patches = self.patches or [current_patch_for_parquet]
+                    table = read_patches(
+                        patches, PATCH_TABLE_COLUMNS, version=2, filters=self.filters, store=self.store
+                    )
+                data = encode_patch_table(table, patches)
+                if weighted:
+                    weights = decay_weights(data, self.half_life_days, self.patch_decay, len(patches) - 1)
+            elif self.encoded_dataset and (self.patches or weighted):
+                # Encoded [N, 13] rows of all patches with their patch and date, and the sample weights, cached
+                data, weights = load_patch_drafts(
+                    self.patches or [current_patch_for_parquet], self.half_life_days, self.patch_decay, self.store
+                )
+            elif self.encoded_dataset:
+                # Encoded [N, 11] hero indices and labels, cached next to the match data
+                data = load_encoded_drafts(self.source or match_source(store=self.store))
+            else:
+                data = load_data(filters=self.filters, patches=self.patches, store=self.store, source=self.source)
+            origin = ", ".join(self.patches) if self.patches else self.source or match_source(store=self.store)
+            print(f"Loaded data from {origin}...")
         # Load the data with the detected or fallback encoding
         except Exception as e:
             print(f"Failed to load CSV with encoding. Error: {e}")
             raise
 
-        print(f"Training from N = {len(data):,} samples")
-
-        # Convert Winner column to binary labels
-        labels = data["result"].apply(lambda x: 1 if x == "Radiant Victory" else 0).values
-
-        # Split into training and testing datasets
-        self.train_data, self.test_data, self.y_train, self.y_test = train_test_split(
-            data, labels, test_size=self.train_test_split, #random_state=42
-        )
-
-
-        # Initialize train DataLoader
-        self.train_loader = DataLoader(
-            Dota2DraftDataset(self.train_data, self.y_train), # Converts [Axel, Bane, Kez, ...] to [1, 2, 3, ...]
-            batch_size=self.batch_size,
-            shuffle=True,
-            collate_fn=lambda x: tuple(zip(*x))
-        )
-
-        # Initialize test DataLoader
-        self.test_loader = DataLoader(
-            Dota2DraftDataset(self.test_data, self.y_test),
-            batch_size=self.batch_size,
-            shuffle=False,
-            collate_fn=lambda x: tuple(zip(*x))
-        )
+        if not self.streaming:
+            print(f"Training from N = {len(data):,} samples")
+
+        if self.streaming:
+            # Deterministic split on the match ID, so no split copy of the data is made
+            streaming_args = dict(batch_size=self.batch_size, test_fraction=self.train_test_split,
+                                  buffer_size=self.buffer_size, filters=self.filters, seed=self.seed)
+            self.train_data = StreamingDraftDataset(data, split="train", shuffle=True, drop_last=self.drop_last,
+                                                    **streaming_args)
+            self.test_data = StreamingDraftDataset(data, split="test", **streaming_args)
+            self.train_loader = DataLoader(self.train_data, batch_size=None, **self.loader_options())
+            self.test_loader = DataLoader(self.test_data, batch_size=None, **self.loader_options())
+        elif self.encoded_dataset:
+            # Split the encoded rows; the train and test datasets hold the tensors
+            train_idx, test_idx = train_test_split(
+                np.arange(len(data)), test_size=self.train_test_split, random_state=self.seed
+            )
+            # Only the training loss is weighted; the test metrics weigh every match the same
+            train_dataset = EncodedDraftDataset.from_encoded(
+                data[train_idx], None if weights is None else weights[train_idx]
+            )
+            test_dataset = EncodedDraftDataset.from_encoded(data[test_idx])
+            self.train_data, self.test_data = train_dataset, test_dataset
+            self.y_train, self.y_test = train_dataset.labels.numpy().ravel(), test_dataset.labels.numpy().ravel()
+
+            # Whole batches are sliced out of the encoded tensors
+            self.train_loader = DataLoader(
+                train_dataset,
+                sampler=DraftBatchSampler(
+                    len(train_dataset), self.batch_size, shuffle=True, drop_last=self.drop_last, seed=self.seed
+                ),
+                batch_size=None,
+                **self.loader_options(),
+            )
+            self.test_loader = DataLoader(
+                test_dataset,
+                sampler=DraftBatchSampler(len(test_dataset), self.batch_size),
+                batch_size=None,
+                **self.loader_options(),
+            )
+        else:
+            # Convert Winner column to binary labels
+            labels = data["result"].apply(lambda x: 1 if x == "Radiant Victory" else 0).values
+
+            # Split into training and testing datasets
+            self.train_data, self.test_data, self.y_train, self.y_test = train_test_split(
+                data, labels, test_size=self.train_test_split, random_state=self.seed
+            )
+
+            train_generator = torch.Generator()
+            if self.seed is not None:
+                train_generator.manual_seed(self.seed)
+
+            # Initialize train DataLoader
+            self.train_loader = DataLoader(
+                Dota2DraftDataset(self.train_data, self.y_train),
+                batch_size=self.batch_size,
+                shuffle=True,
+                drop_last=self.drop_last,
+                generator=train_generator,
+                collate_fn=_stack_collate,
+                **self.loader_options(),
+            )
+
+            # Initialize test DataLoader
+            self.test_loader = DataLoader(
+                Dota2DraftDataset(self.test_data, self.y_test),
+                batch_size=self.batch_size,
+                shuffle=False,
+                collate_fn=_stack_collate,
+                **self.loader_options(),
+            )
 
         # Get the totol number of heroes
         self.num_heroes = len(HEROS) + 1
@@ -83,41 +220,301 @@ class ModelTraining:
         # Use binary cross-entropy loss
         self.criterion = nn.BCELoss()
 
-        # Use Adam optimizer
-        self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        # Use Adam optimizer; the resident engine updates all parameters in one fused kernel
+        self.optimizer = optim.Adam(
+            self.model.parameters(), lr=self.scaled_learning_rate(), fused=self.engine == "resident" or None
+        )
 
+        # Fixed shapes: the last partial batch compiles a second graph instead of a dynamic one
+        self._forward = torch.compile(self._forward_loss, dynamic=False) if self.compile else self._forward_loss
+        self.history = TrainingHistory()
+        self.early_stopping = EarlyStopping(self.patience, self.min_delta)
+        self._best_state: Optional[Dict[str, torch.Tensor]] = None
+        if self.warm_start is not None:
+            self.load_warm_start()
+        if self.engine == "resident":
+            self._shuffle_generator = torch.Generator()
+            if self.seed is not None:
+                self._shuffle_generator.manual_seed(self.seed)
+            else:
+                self._shuffle_generator.seed()
+
+        if self.resume:
+            self.resume_from_checkpoint()
+
+    def loader_options(self) -> dict:
+        """DataLoader keyword arguments for the worker and memory options."""
+        options = {"num_workers": self.num_workers, "pin_memory": self.pin_memory and torch.cuda.is_available()}
+        if self.num_workers > 0:
+            options["persistent_workers"] = self.persistent_workers
+        return options
+
+    def split_sizes(self) -> Tuple[int, int]:
+        """
+        Number of (train, test) matches.
+
+        Streamed splits have no length, so their matches are counted from
+        the ID column of the store.
+        """
+        if self.streaming:
+            return self.train_data.count(), self.test_data.count()
+        return len(self.train_data), len(self.test_data)
+
+    def scaled_learning_rate(self) -> float:
+        """
+        Learning rate for the batch size.
+
+        Larger batches take fewer optimizer steps per epoch, so the rate is
+        scaled up with them: linearly, or by the square root which is safer
+        for Adam.
+        """
+        ratio = self.batch_size / self.base_batch_size
+        if self.lr_scaling is None:
+            return self.learning_rate
+        if self.lr_scaling == "linear":
+            return self.learning_rate * ratio
+        if self.lr_scaling == "sqrt":
+            return self.learning_rate * ratio ** 0.5
+        raise ValueError(f"lr_scaling must be 'linear', 'sqrt' or None, not {self.lr_scaling!r}")
+
+    def hyperparameters(self) -> Dict[str, Any]:
+        """Model shape and training settings stored with checkpoints."""
+        return {
+            "num_heroes": self.num_heroes, "heroes": list(HEROS), "embedding_dim": self.embedding_dim,
+            "layers": list(self.layers),
+            "dropout_prob": self.dropout_prob, "batch_size": self.batch_size, "learning_rate": self.learning_rate,
+        }
+
+    def _train_generator(self) -> Optional[torch.Generator]:
+        """Generator of the training shuffle; streaming shuffles are seeded by the epoch instead."""
+        if self.engine == "resident":
+            return self._shuffle_generator
+        sampler = getattr(self.train_loader, "sampler", None)
+        if isinstance(sampler, DraftBatchSampler):
+            return sampler.generator
+        return getattr(self.train_loader, "generator", None)
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """Everything needed to resume training after the latest epoch."""
+        generator = self._train_generator()
+        last = self.history.epochs[-1] if self.history.epochs else None
+        return {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "epoch": last["epoch"] if last else -1,
+            "step": last["step"] if last else 0,
+            "metrics": last,
+            "history": {"epochs": self.history.epochs, "evaluations": self.history.evaluations},
+            "early_stopping": self.early_stopping.state_dict(),
+            "rng": {"torch": torch.get_rng_state(), "shuffle": generator.get_state() if generator else None},
+            "hyperparameters": self.hyperparameters(),
+        }
+
+    def resume_from_checkpoint(self):
+        """
+        Restore the state of checkpoint_dir/last.pt, if there is one.
+
+        The remaining budget is epochs minus the epochs already trained, or
+        none if the checkpointed run had stopped early.
+
+        Raises:
+            ValueError: If there is no checkpoint_dir or the checkpoint has another model shape.
+        """
+        if self.checkpoint_dir is None:
+            raise ValueError("resume needs a checkpoint_dir")
+        path = self.checkpoint_dir / LAST_CHECKPOINT
+        if not path.exists():
+            print(f"No checkpoint at {path}, training from scratch")
+            return
+
+        state = load_checkpoint(path)
+        shape = ("num_heroes", "embedding_dim", "layers")
+        saved, current = state["hyperparameters"], self.hyperparameters()
+        if any(saved[key] != current[key] for key in shape) or saved.get("heroes", HEROS) != current["heroes"]:
+            raise ValueError(f"Checkpoint {path} is for another model: "
+                             + ", ".join(f"{key}={saved[key]}" for key in shape))
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.history = TrainingHistory(**state["history"])
+        self.early_stopping.load_state_dict(state["early_stopping"])
+        torch.set_rng_state(state["rng"]["torch"])
+        generator = self._train_generator()
+        if generator is not None and state["rng"]["shuffle"] is not None:
+            generator.set_state(state["rng"]["shuffle"])
+        best_path = self.checkpoint_dir / BEST_CHECKPOINT
+        if best_path.exists():
+            self._best_state = load_checkpoint(best_path)["model"]
+
+        completed = len(self.history.epochs)
+        self.epochs = 0 if self.early_stopping.should_stop else max(self.epochs - completed, 0)
+        if self.early_stopping.should_stop:
+            self._restore_best()
+        print(f"Resumed from {path} after {completed} epochs, {self.epochs} left")
+
+    def load_warm_start(self):
+        """
+        Initialise the model with the weights in self.warm_start.
+
+        The file is a state dict written by save_model or a checkpoint written
+        during training. Embedding rows are matched to the current heroes by
+        name, so heroes added since are given new rows and the trained rows
+        are kept (see embedding_model.remap_embedding). Fine-tune on the new
+        matches only by pointing source at the new ingest partition or with a
+        date filter.
+
+        Raises:
+            ValueError: If the hero list of the weights is unknown and their
+                embedding does not have a row per current hero.
+        """
+        state = load_checkpoint(self.warm_start)
+        heroes = self.warm_start_heroes
+        if "model" in state:
+            heroes = heroes or state["hyperparameters"].get("heroes")
+            state = state["model"]
+        weight = state["embedding.weight"]
+        if heroes is None:
+            if len(weight) != self.num_heroes:
+                raise ValueError(f"{self.warm_start} has {len(weight) - 1} heroes, not {self.num_heroes - 1}; "
+                                 "pass the hero list it was trained with as warm_start_heroes")
+            heroes = HEROS
+        added = sorted(set(HEROS) - set(heroes))
+        self.model.load_state_dict({**state, "embedding.weight": remap_embedding(weight, heroes, HEROS)})
+        print(f"Warm start from {self.warm_start}" + (f", new heroes: {', '.join(added)}" if added else ""))
+
+    def _restore_best(self):
+        if self.patience is not None and self.restore_best and self._best_state is not None:
+            self.model.load_state_dict(self._best_state)
+
+    def _forward_loss(self, radiant_team, dire_team, labels, weights=None):
+        """Predictions and loss of a batch, weighting each match's loss by its sample weight if given."""
+        outputs = self.model(radiant_team, dire_team)
+        if weights is None:
+            return outputs, self.criterion(outputs, labels)
+        return outputs, nn.functional.binary_cross_entropy(outputs, labels, weight=weights)
+
+    def _resident_batches(self):
+        """
+        Training batches of one epoch of the resident engine.
+
+        The rows are gathered once into a shuffled copy and each batch is a
+        contiguous slice of it.
+        """
+        data = self.train_data
+        n = len(data)
+        order = torch.randperm(n, generator=self._shuffle_generator)
+        columns = [data.radiant, data.dire, data.labels] + ([] if data.weights is None else [data.weights])
+        columns = [column[order] for column in columns]
+        end = n - n % self.batch_size if self.drop_last else n
+        for start in range(0, end, self.batch_size):
+            stop = min(start + self.batch_size, end)
+            yield tuple(column[start:stop] for column in columns)
+
+    def _test_batches(self):
+        """Test batches; resident test tensors are evaluated in large slices."""
+        if isinstance(self.test_data, EncodedDraftDataset):
+            size = max(self.batch_size, 65536)
+            return (self.test_data[start:start + size] for start in range(0, len(self.test_data), size))
+        return iter(self.test_loader)
+
+    def evaluate_metrics(self) -> Dict[str, float]:
+        """Accuracy, log-loss and Brier score of the model on the test split."""
+        return evaluate_batches(self.model, self._test_batches())
+
+    def train_epoch(self, epoch: int, step: int = 0) -> Tuple[Dict[str, float], Dict[str, float], int]:
+        """
+        Train one epoch, accumulating the training metrics from the outputs of each step.
+
+        Args:
+            epoch (int): Index of the epoch, which seeds the streaming shuffle.
+            step (int): Optimizer steps taken before this epoch. The whole test
+                split is evaluated every eval_every steps into self.history;
+                the time is counted under "evaluation" in the timings.
+
+        Returns:
+            (dict, dict, int): Training metrics, seconds spent in each of
+                TIMING_SECTIONS, and the step count after the epoch.
+        """
+        if self.streaming:
+            self.train_data.set_epoch(epoch)
+        self.model.train()
+        metrics = MetricAccumulator()
+        timings = dict.fromkeys(TIMING_SECTIONS, 0.0)
+        batches = self._resident_batches() if self.engine == "resident" else self.train_loader
+
+        clock = time.perf_counter()
+        for radiant_team, dire_team, labels, *weights in batches:
+            now = time.perf_counter()
+            timings["data"], clock = timings["data"] + now - clock, now
+
+            # Forward pass; the metrics reuse its outputs
+            outputs, loss = self._forward(radiant_team, dire_team, labels, *weights)
+            metrics.update(outputs, labels, loss)
+            now = time.perf_counter()
+            timings["forward"], clock = timings["forward"] + now - clock, now
+
+            # Backward pass and optimization
+            self.optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            now = time.perf_counter()
+            timings["backward"], clock = timings["backward"] + now - clock, now
+            self.optimizer.step()
+            now = time.perf_counter()
+            timings["optimizer"], clock = timings["optimizer"] + now - clock, now
+
+            step += 1
+            if self.eval_every and step % self.eval_every == 0:
+                self.history.add_evaluation(epoch, step, self.evaluate_metrics())
+                now = time.perf_counter()
+                timings["evaluation"], clock = timings["evaluation"] + now - clock, now
+
+        return metrics.compute(), timings, step
 
     def train_model(self, show_plot: bool=True, verbose: bool=True, return_data: bool=False) -> Optional[List]:
-        """Train the model."""
-        accuracy_values = []
-        for epoch in range(self.epochs):
-            self.model.train()
-            accuracy: float = 0.0
-            loss: Any = 0.0
-            for radiant_team, dire_team, labels in self.train_loader:
-                radiant_team = torch.stack(radiant_team)
-                dire_team = torch.stack(dire_team)
-                labels = torch.stack(labels)
-
-                # Forward pass
-                outputs = self.model(radiant_team, dire_team)
-                loss = self.criterion(outputs, labels)
-
-                # Backward pass and optimization
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
-
-                # Accuracy
-                predictions = (outputs > 0.5).float()
-                correct = (predictions == labels).sum().item()
-                accuracy = correct / labels.size(0)
+        """
+        Train the model for self.epochs more epochs.
+
+        Per-epoch training and test metrics and timings are appended to
+        self.history. With patience set, training stops once the test log-loss
+        has not improved for that many epochs and, if restore_best, the model
+        is left with the weights of the best epoch. With a checkpoint_dir, the
+        best and last checkpoints are rewritten after every epoch. Returns the
+        training accuracy of each epoch of this call if return_data is set.
+        """
+        first_epoch = len(self.history.epochs)
+        step = self.history.epochs[-1]["step"] if self.history.epochs else 0
+        for epoch in range(first_epoch, first_epoch + self.epochs):
+            train, timings, step = self.train_epoch(epoch, step)
+            start = time.perf_counter()
+            test = self.evaluate_metrics()
+            timings["evaluation"] += time.perf_counter() - start
+            self.history.add_epoch(epoch, step, train, test, timings)
+
+            improved = self.early_stopping.update(test["log_loss"], epoch)
+            if improved:
+                self._best_state = {name: value.detach().clone() for name, value in self.model.state_dict().items()}
+            if self.checkpoint_dir is not None:
+                state = self.checkpoint_state()
+                if improved:
+                    save_checkpoint(state, self.checkpoint_dir / BEST_CHECKPOINT)
+                save_checkpoint(state, self.checkpoint_dir / LAST_CHECKPOINT)
 
             if verbose:
-                print(f"Epoch [{epoch + 1}/{self.epochs}], Loss: {loss.item():.4f}, Accuracy: {accuracy:.2%}")
-            accuracy_values.append(accuracy)
+                print(f"Epoch [{epoch + 1}/{first_epoch + self.epochs}], Loss: {train['loss']:.4f}, "
+                      f"Accuracy: {train['accuracy']:.2%}, Test log-loss: {test['log_loss']:.4f}, "
+                      f"Test accuracy: {test['accuracy']:.2%} ({sum(timings.values()):.2f}s: "
+                      + ", ".join(f"{name} {seconds:.2f}" for name, seconds in timings.items()) + ")")
+            if self.early_stopping.should_stop:
+                if verbose:
+                    print(f"Stopping early: no test log-loss improvement for {self.patience} epochs "
+                          f"(best {self.early_stopping.best:.4f} at epoch {self.early_stopping.best_epoch + 1})")
+                break
+
+        self._restore_best()
+        accuracy_values = self.history.series("train", "accuracy")[first_epoch:]
 
         if show_plot:
+            import matplotlib.pyplot as plt
+
             # smooth the accuracy values
             window = 7
             raw_accuracy = accuracy_values.copy()
@@ -141,45 +538,34 @@ class ModelTraining:
 
     def evaluate_model(self, verbose: bool = False, save_bool: bool = False) -> float:
         """Evaluate the model on the test set."""
-        self.model.eval()
-        all_preds, all_labels = [], []
-
-        with torch.no_grad():
-            for radiant_team, dire_team, labels in self.test_loader:
-                radiant_team = nn.utils.rnn.pad_sequence(radiant_team, batch_first=True, padding_value=0)
-                dire_team = nn.utils.rnn.pad_sequence(dire_team, batch_first=True, padding_value=0)
-                labels = torch.stack(labels)
-
-                outputs = self.model(radiant_team, dire_team)
-                predictions = (outputs > 0.5).float()
-
-                all_preds.extend(predictions.cpu().numpy())
-                all_labels.extend(labels.cpu().numpy())
-
-        accuracy: Any = accuracy_score(all_labels, all_preds)
+        accuracy = self.evaluate_metrics()["accuracy"]
         if verbose:
             print(f"Test Accuracy: {accuracy:.4f}")
         if save_bool:
             self.save_model()
         return accuracy
 
-    def save_model(self):
-        """Save the trained model to a file."""
-        filepath = MODEL_PATH
-        if not filepath.exists():
-            torch.save(self.model.state_dict(), filepath)
-            print(f"Model saved to {filepath}")
-        else:
+    def save_model(self, path: Optional[Path] = None, overwrite: Optional[bool] = None):
+        """
+        Save the trained model weights to a file.
+
+        Args:
+            path (Path): Destination, MODEL_PATH by default.
+            overwrite (bool): Whether to replace an existing file; asks if None.
+        """
+        filepath = path or MODEL_PATH
+        if filepath.exists() and overwrite is None:
             print("Model file already exists.")
-            val = input("(y/n) Overwrite the model file? ")
-            if val.lower() == "y":
-                torch.save(self.model.state_dict(), filepath)
-                print(f"Model saved to {filepath}")
-            else:
-                print("Model not saved.")
+            overwrite = input("(y/n) Overwrite the model file? ").lower() == "y"
+        if filepath.exists() and not overwrite:
+            print("Model not saved.")
+            return
+        save_checkpoint(self.model.state_dict(), filepath)
+        print(f"Model saved to {filepath}")
 
 if __name__ == "__main__":
-
+    import matplotlib.pyplot as plt
+    from scipy.stats import binom
     # Define the base parameters
     embedding_dim = 3
     dropout_prob = 1e-3
@@ -222,8 +608,7 @@ if __name__ == "__main__":
             train_test_split=params['train_test_split']
         )
 
-        N_train = len(trainer.train_data)
-        N_test = len(trainer.test_data)
+        N_train, N_test = trainer.split_sizes()
 
         # Train the model
         train_accuracy: Optional[List[Any]] = trainer.train_model(show_plot=True, verbose=True, return_data=True)
@@ -0,0 +1,131 @@
+# ========================================================
+# training_metrics.py
+# ========================================================
+# Running metrics for the training loop.
+#
+# MetricAccumulator is updated with the outputs the training step already
+# computed, so epoch-level metrics need neither a second pass over the data
+# nor a host sync per step. Updates only keep the detached batch tensors; they
+# are reduced into the running sums in one vectorized pass every flush_size
+# samples, which costs far less per step than reducing each small batch.
+#
+# TrainingHistory records the per-epoch metrics, the periodic test
+# evaluations and where the time of each epoch went.
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+import torch
+
+# Probabilities are clipped to [EPS, 1 - EPS] for the log-loss
+EPS = 1e-7
+
+# Sections of a training epoch that are timed
+TIMING_SECTIONS = ("data", "forward", "backward", "optimizer", "evaluation")
+
+
+class MetricAccumulator:
+    """
+    Running accuracy, log-loss and Brier score of binary predictions, plus the mean training loss.
+
+    Args:
+        flush_size (int): Pending samples that trigger a reduction into the sums.
+    """
+    def __init__(self, flush_size: int = 1 << 20):
+        self.flush_size = flush_size
+        self.reset()
+
+    def reset(self):
+        self.pending = []
+        self.pending_count = 0
+        self.count = torch.zeros((), dtype=torch.float64)
+        self.correct = torch.zeros((), dtype=torch.float64)
+        self.log_loss_sum = torch.zeros((), dtype=torch.float64)
+        self.brier_sum = torch.zeros((), dtype=torch.float64)
+        self.loss_sum = torch.zeros((), dtype=torch.float64)
+        self.has_loss = False
+
+    @torch.no_grad()
+    def update(self, probabilities: torch.Tensor, labels: torch.Tensor, loss: Optional[torch.Tensor] = None):
+        """
+        Add a batch.
+
+        Args:
+            probabilities: Predicted radiant win probabilities, any shape.
+            labels: 0/1 labels of the same size.
+            loss: Mean training loss of the batch, weighted by its size.
+        """
+        self.pending.append((probabilities.detach(), labels.detach(), None if loss is None else loss.detach()))
+        self.pending_count += probabilities.numel()
+        if self.pending_count >= self.flush_size:
+            self.flush()
+
+    @torch.no_grad()
+    def flush(self):
+        """Reduce the pending batches into the running sums."""
+        if not self.pending:
+            return
+        p = torch.cat([batch[0].reshape(-1) for batch in self.pending]).double()
+        y = torch.cat([batch[1].reshape(-1) for batch in self.pending]).double()
+        self.count += p.numel()
+        self.correct += ((p > 0.5) == (y > 0.5)).sum()
+        clipped = p.clamp(EPS, 1 - EPS)
+        self.log_loss_sum -= (y * clipped.log() + (1 - y) * (1 - clipped).log()).sum()
+        self.brier_sum += (p - y).square().sum()
+        losses = [(loss, batch.numel()) for batch, _, loss in self.pending if loss is not None]
+        if losses:
+            self.loss_sum += sum(loss.double() * n for loss, n in losses)
+            self.has_loss = True
+        self.pending, self.pending_count = [], 0
+
+    def compute(self) -> Dict[str, float]:
+        """The metrics so far, as floats."""
+        self.flush()
+        n = max(self.count.item(), 1.0)
+        metrics = {
+            "samples": int(self.count.item()),
+            "accuracy": self.correct.item() / n,
+            "log_loss": self.log_loss_sum.item() / n,
+            "brier": self.brier_sum.item() / n,
+        }
+        if self.has_loss:
+            metrics["loss"] = self.loss_sum.item() / n
+        return metrics
+
+
+def evaluate_batches(model: torch.nn.Module, batches: Iterable) -> Dict[str, float]:
+    """
+    Metrics of a model over (radiant, dire, labels) batches, in eval mode and without gradients.
+    """
+    was_training = model.training
+    model.eval()
+    metrics = MetricAccumulator()
+    with torch.no_grad():
+        for radiant_team, dire_team, labels in batches:
+            metrics.update(model(radiant_team, dire_team), labels)
+    model.train(was_training)
+    return metrics.compute()
+
+
+@dataclass
+class TrainingHistory:
+    """
+    Per-epoch metrics and timings of a training run.
+
+    epochs holds one record per epoch: {"epoch", "step", "train", "test",
+    "timings"}, with the train and test metric dicts of MetricAccumulator and
+    the seconds spent in each of TIMING_SECTIONS. evaluations holds the
+    periodic test evaluations: {"epoch", "step", "test"}.
+    """
+    epochs: List[Dict[str, Any]] = field(default_factory=list)
+    evaluations: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_epoch(self, epoch: int, step: int, train: Dict[str, float], test: Optional[Dict[str, float]],
+                  timings: Dict[str, float]):
+        self.epochs.append({"epoch": epoch, "step": step, "train": train, "test": test, "timings": timings})
+
+    def add_evaluation(self, epoch: int, step: int, test: Dict[str, float]):
+        self.evaluations.append({"epoch": epoch, "step": step, "test": test})
+
+    def series(self, split: str, name: str) -> List[Optional[float]]:
+        """One metric of every epoch, e.g. series("test", "log_loss")."""
+        return [(record[split] or {}).get(name) for record in self.epochs]
@@ -1,4 +1,5 @@
-from .config import MATCH_DATA_PATH
+from .config import load_data
+from .match_store import match_source
 import pandas as pd
 
 def check_repeats(df: pd.DataFrame) -> int:
@@ -15,12 +16,12 @@ def check_repeats(df: pd.DataFrame) -> int:
 
 def main():
     try:
-        df = pd.read_parquet(MATCH_DATA_PATH)
+        df = load_data()
     except Exception as e:
-        print(f"Error reading {MATCH_DATA_PATH}: {e}")
+        print(f"Error reading {match_source()}: {e}")
         return
 
-    print(f"Loaded {len(df)} matches from {MATCH_DATA_PATH}.")
+    print(f"Loaded {len(df)} matches from {match_source()}.")
     print(check_repeats(df), "repeated matches found.")
     print("Sample match data:\n")
     sample_match = df.iloc[1]
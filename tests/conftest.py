@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from d2draftnet.config import HEROS
+from d2draftnet.match_store import append_matches, partition_dir
+
+
+@pytest.fixture
+def match_store(tmp_path):
+    """
+    A store partition of 400 random drafts in 10 fragments; radiant wins when it has the lower first hero.
+
+    The store is a subdirectory of tmp_path, so caches written next to it stay in tmp_path.
+    """
+    rng = np.random.default_rng(0)
+    records = []
+    for i in range(400):
+        heroes = rng.choice(HEROS, 10, replace=False).tolist()
+        records.append({
+            "id": str(10**9 + i), "date": "2025-07-11", "duration": "38:02",
+            "result": "Radiant Victory" if heroes[0] < heroes[5] else "Dire Victory",
+            "game_mode": "All Pick", "skill": "Ranked Matchmaking",
+            "radiant_draft": heroes[:5], "dire_draft": heroes[5:],
+        })
+    for start in range(0, len(records), 40):
+        append_matches(records[start:start + 40], tmp_path / "matches", patch="test", ingest_date="2025-07-11")
+    return partition_dir(tmp_path / "matches", "test")
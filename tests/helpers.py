@@ -0,0 +1,19 @@
+"""
+Helpers shared by the tests: building match records, and the stub Dotabuff
+server of d2draftnet.stub_server.
+"""
+from d2draftnet.stub_server import StubDotabuffServer, render_matches_page
+
+
+def make_record(match_id: int) -> dict:
+    """A scraped match record with a fixed draft; radiant wins the odd IDs."""
+    return {
+        "id": str(match_id),
+        "date": "2025-07-11",
+        "duration": "38:02",
+        "result": "Radiant Victory" if match_id % 2 else "Dire Victory",
+        "game_mode": "All Pick",
+        "skill": "Ranked Matchmaking",
+        "radiant_draft": ["Axe", "Bane", "Lion", "Zeus", "Kez"],
+        "dire_draft": ["Pudge", "Sven", "Luna", "Lina", "Viper"],
+    }
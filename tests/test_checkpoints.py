@@ -0,0 +1,31 @@
+import torch
+
+from d2draftnet.checkpoints import EarlyStopping, load_checkpoint, save_checkpoint
+
+
+def test_early_stopping_counts_epochs_without_improvement():
+    """
+    Test that only decreases beyond min_delta reset the patience.
+    """
+    stopping = EarlyStopping(patience=2, min_delta=0.01)
+    assert [stopping.update(value, epoch) for epoch, value in enumerate([0.70, 0.65, 0.645, 0.66])] == [
+        True, True, False, False]
+    assert stopping.should_stop and stopping.best == 0.65 and stopping.best_epoch == 1
+
+    restored = EarlyStopping(patience=5)
+    restored.load_state_dict(stopping.state_dict())
+    assert restored.patience == 5 and restored.bad_epochs == 2 and not restored.should_stop
+    assert not EarlyStopping().should_stop
+
+
+def test_save_checkpoint_replaces_file(tmp_path):
+    """
+    Test that saving over a checkpoint leaves only the new file, with no temporary file behind.
+    """
+    path = tmp_path / "run" / "last.pt"
+    save_checkpoint({"epoch": 0, "weight": torch.zeros(2)}, path)
+    save_checkpoint({"epoch": 1, "weight": torch.ones(2)}, path)
+
+    state = load_checkpoint(path)
+    assert state["epoch"] == 1 and state["weight"].equal(torch.ones(2))
+    assert [child.name for child in path.parent.iterdir()] == ["last.pt"]
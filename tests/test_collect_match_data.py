@@ -0,0 +1,179 @@
+import pandas as pd
+import pytest
+import requests
+
+from d2draftnet import collect_match_data
+from d2draftnet.collect_match_data import (
+    PageFetchError, checkpoint_path, fetch_pages, load_checkpoint, main, parse_matches_page,
+)
+from d2draftnet.match_store import append_matches, list_fragments, partition_dir, quarantine_dir, read_matches
+from tests.helpers import StubDotabuffServer, make_record, render_matches_page
+
+
+@pytest.fixture
+def stub_pages():
+    """Five pages of ten matches where each page repeats the last three matches of the previous one."""
+    return [[make_record(1000 + i) for i in range(start, start + 10)] for start in range(0, 35, 7)]
+
+
+def test_parse_matches_page_roundtrip(stub_pages):
+    """
+    Test that a rendered page parses back to the same records.
+    """
+    assert parse_matches_page(render_matches_page(stub_pages[0])) == stub_pages[0]
+
+
+def test_fetch_pages_in_order(stub_pages):
+    """
+    Test that concurrent fetching yields pages in order and stops at the first missing page.
+    """
+    with StubDotabuffServer(stub_pages) as stub:
+        fetched = []
+        with pytest.raises(PageFetchError) as excinfo:
+            for page, records in fetch_pages(base_url=stub.base_url, concurrency=4, rate_limit=None):
+                fetched.append((page, records))
+    assert [page for page, _ in fetched] == [1, 2, 3, 4, 5]
+    assert [records for _, records in fetched] == stub_pages
+    assert excinfo.value.status_code == 404
+
+
+def test_main_deduplicates_against_existing(stub_pages, tmp_path):
+    """
+    Test that the scraper skips matches already on disk and repeated across pages.
+    """
+    append_matches([make_record(1000), make_record(1001)], tmp_path, patch="test")
+
+    with StubDotabuffServer(stub_pages) as stub:
+        main(20, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=3, rate_limit=None)
+
+    ids = read_matches(partition_dir(tmp_path, "test"))["id"].tolist()
+    assert ids == [str(i) for i in range(1000, 1022)]
+    assert len(list_fragments(tmp_path)) == 2
+
+
+def test_main_stops_when_pages_run_out(stub_pages, tmp_path):
+    """
+    Test that the scraper saves what it has when the server runs out of pages.
+    """
+    with StubDotabuffServer(stub_pages) as stub:
+        main(100, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=200)
+
+    assert len(read_matches(tmp_path)) == 38
+
+
+def test_main_duplicate_free_across_restarts(stub_pages, tmp_path):
+    """
+    Test that repeated scrapes of the same pages, and a crash before indexing, never store a match twice.
+    """
+    with StubDotabuffServer(stub_pages) as stub:
+        main(15, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None)
+        main(15, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None)
+
+        # A fragment written without updating the index, as if the scraper died in between
+        append_matches([make_record(1030)], tmp_path, patch="test")
+        main(100, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None)
+
+    ids = read_matches(tmp_path)["id"].tolist()
+    assert len(ids) == len(set(ids)) == 38
+    assert len(list_fragments(tmp_path)) == 4
+
+
+def test_main_flushes_in_batches(stub_pages, tmp_path):
+    """
+    Test that matches are written in fragments of flush_size and a complete scrape clears the checkpoint.
+    """
+    with StubDotabuffServer(stub_pages) as stub:
+        main(20, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None, flush_size=6)
+
+    assert len(list_fragments(tmp_path)) == 4
+    assert read_matches(tmp_path)["id"].tolist() == [str(i) for i in range(1000, 1020)]
+    assert not checkpoint_path(tmp_path).exists()
+
+
+def test_main_resumes_after_failed_page(stub_pages, tmp_path):
+    """
+    Test that a scrape stopped by a failing page resumes from that page.
+    """
+    pages = list(stub_pages)
+    pages[2] = None
+    with StubDotabuffServer(pages) as stub:
+        main(100, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None, flush_size=4)
+        assert load_checkpoint(tmp_path, stub.base_url) == 3
+        assert len(read_matches(tmp_path)) == 17
+
+        stub.pages[2] = render_matches_page(stub_pages[2])
+        stub.requested_pages.clear()
+        main(100, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=1, rate_limit=None, flush_size=4)
+
+    assert min(stub.requested_pages) == 3
+    ids = read_matches(tmp_path)["id"].tolist()
+    assert ids == [str(i) for i in range(1000, 1038)]
+
+
+def test_main_resumes_after_crash(stub_pages, tmp_path, monkeypatch):
+    """
+    Test that matches flushed before a crash are kept and the next run picks up where it stopped.
+    """
+    def crash_on_page_four(html):
+        if "1025" in html:
+            raise RuntimeError("parser crashed")
+        return parse_matches_page(html)
+
+    with StubDotabuffServer(stub_pages) as stub:
+        monkeypatch.setattr(collect_match_data, "parse_matches_page", crash_on_page_four)
+        with pytest.raises(RuntimeError):
+            main(100, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None,
+                 flush_size=5)
+        assert load_checkpoint(tmp_path, stub.base_url) == 4
+        assert read_matches(tmp_path)["id"].tolist() == [str(i) for i in range(1000, 1024)]
+
+        monkeypatch.undo()
+        main(14, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None, flush_size=5)
+
+    ids = read_matches(tmp_path)["id"].tolist()
+    assert ids == [str(i) for i in range(1000, 1038)]
+
+
+def test_main_quarantines_unknown_heroes(stub_pages, tmp_path):
+    """
+    Test that a match naming a hero missing from HEROS is set aside and the rest of its page is stored.
+    """
+    pages = [list(page) for page in stub_pages]
+    pages[0][3] = {**pages[0][3], "dire_draft": ["Largo", "Sven", "Luna", "Lina", "Viper"]}
+    with StubDotabuffServer(pages) as stub:
+        main(20, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None, flush_size=6)
+
+    ids = read_matches(tmp_path)["id"].tolist()
+    assert ids == [str(i) for i in range(1000, 1020) if i != 1003]
+    quarantined = pd.read_parquet(quarantine_dir(tmp_path, "test"))
+    assert quarantined["id"].tolist() == ["1003"] and quarantined["dire_draft"][0][0] == "Largo"
+    assert not checkpoint_path(tmp_path).exists()
+
+
+def test_main_failed_flush_does_not_mask_crash(stub_pages, tmp_path, monkeypatch):
+    """
+    Test that a crash is re-raised when saving the buffered matches fails too, and no checkpoint is written.
+    """
+    def crash_on_page_four(html):
+        if "1025" in html:
+            raise RuntimeError("parser crashed")
+        return parse_matches_page(html)
+
+    def disk_full(*args, **kwargs):
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr(collect_match_data, "parse_matches_page", crash_on_page_four)
+    monkeypatch.setattr(collect_match_data, "append_matches", disk_full)
+    with StubDotabuffServer(stub_pages) as stub:
+        with pytest.raises(RuntimeError):
+            main(100, store=tmp_path, patch="test", base_url=stub.base_url, concurrency=2, rate_limit=None)
+        assert load_checkpoint(tmp_path, stub.base_url) is None
+
+
+def test_fetch_pages_times_out_stalled_requests(stub_pages):
+    """
+    Test that a page the server never answers in time fails instead of blocking its worker.
+    """
+    with StubDotabuffServer(stub_pages, delay=1.0) as stub:
+        with pytest.raises(requests.Timeout):
+            next(fetch_pages(base_url=stub.base_url, rate_limit=None, timeout=0.1))
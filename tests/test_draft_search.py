@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from d2draftnet.config import HEROS
+from d2draftnet.draft_search import DraftSearch, default_pick_order
+from d2draftnet.pick_recommender import PickRecommender
+from d2draftnet.predict_embedding_model import DraftPredictor
+
+RADIANT = ["Lycan", "Enchantress", "Dragon Knight", "Lion"]
+DIRE = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit"]
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return DraftPredictor()
+
+
+def test_default_pick_order():
+    """
+    Test that the default order alternates and fills both teams.
+    """
+    assert default_pick_order(2, 2) == ["radiant", "dire"] * 3
+    assert default_pick_order(3, 1) == ["dire", "dire", "radiant", "dire", "radiant", "dire"]
+    assert default_pick_order(5, 5) == []
+
+
+def test_two_ply_search_matches_brute_force(predictor):
+    """
+    Test that a full-width two-pick search finds the exact minimax value.
+    """
+    search = DraftSearch(PickRecommender(predictor), beam_width=len(HEROS))
+    result = search.search(RADIANT, DIRE, pick_order=["radiant", "dire"])
+
+    candidates = [hero for hero in HEROS if hero not in RADIANT + DIRE]
+    pairs = [(RADIANT + [r], DIRE + [d]) for r in candidates for d in candidates if r != d]
+    probabilities = predictor.predict_drafts(pairs)
+    worst_case = {}
+    for (radiant, _), probability in zip(pairs, probabilities):
+        worst_case[radiant[-1]] = min(worst_case.get(radiant[-1], 1.0), probability)
+    best_pick = max(worst_case, key=worst_case.get)
+
+    assert result.best_pick == best_pick
+    assert result.value == pytest.approx(worst_case[best_pick], abs=1e-6)
+    assert result.nodes == len(candidates) + len(candidates) * (len(candidates) - 1)
+    assert result.line[0] == ("radiant", best_pick)
+    assert not result.truncated
+
+
+def test_search_respects_node_budget(predictor):
+    """
+    Test that the node budget stops the search early but still returns a pick.
+    """
+    search = DraftSearch(PickRecommender(predictor), beam_width=4, max_nodes=1000)
+    result = search.search(RADIANT[:2], DIRE[:2], banned=["Pudge"])
+    assert result.truncated
+    assert result.nodes <= 1000
+    assert result.best_pick not in RADIANT + DIRE + ["Pudge"]
+    assert np.isfinite(result.value)
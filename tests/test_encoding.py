@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from d2draftnet.config import HERO_MAP
+from d2draftnet.embedding_model import (
+    DraftBatchSampler, Dota2DraftDataset, EncodedDraftDataset, StreamingDraftDataset, in_test_split,
+    remap_embedding,
+)
+from d2draftnet.draft_cache import (
+    DAY_COL, PATCH_COL, cache_path, decay_weights, load_encoded_drafts, load_patch_drafts, patch_cache_path,
+    unpack_encoded,
+)
+from d2draftnet.encoding import encode_drafts, encode_heroes, encode_results
+from d2draftnet.match_store import append_matches, read_matches
+
+
+@pytest.fixture
+def match_frame():
+    """A small match DataFrame in the scraper's schema."""
+    return pd.DataFrame({
+        "radiant_draft": [["Axe", "Bane", "Lion", "Zeus", "Kez"], ["Io", "Mars", "Riki", "Ursa", "Tiny"]],
+        "dire_draft": [["Pudge", "Sven", "Luna", "Lina", "Viper"], ["Doom", "Chen", "Puck", "Slark", "Sniper"]],
+        "result": ["Radiant Victory", "Dire Victory"],
+    })
+
+
+def test_encode_heroes_matches_hero_map():
+    """
+    Test that the vectorised lookup agrees with HERO_MAP for every hero.
+    """
+    names = list(HERO_MAP)
+    assert encode_heroes(names).tolist() == [HERO_MAP[hero] for hero in names]
+
+
+def test_encode_heroes_unknown():
+    """
+    Test that an unknown hero name raises instead of silently mapping to a neighbour.
+    """
+    with pytest.raises(KeyError):
+        encode_heroes(["Axe", "Not A Hero"])
+
+
+def test_encode_drafts_pads_partial_drafts():
+    """
+    Test that drafts shorter than five heroes are padded with 0.
+    """
+    encoded = encode_drafts([["Axe", "Zeus"], [], ["Io"]])
+    assert encoded.shape == (3, 5)
+    assert encoded.tolist() == [[HERO_MAP["Axe"], HERO_MAP["Zeus"], 0, 0, 0], [0] * 5, [HERO_MAP["Io"], 0, 0, 0, 0]]
+
+
+def test_encoded_dataset_matches_row_dataset(match_frame):
+    """
+    Test that the pre-encoded dataset returns the same samples as the per-row dataset.
+    """
+    labels = encode_results(match_frame["result"])
+    row_dataset = Dota2DraftDataset(match_frame, labels)
+    encoded_dataset = EncodedDraftDataset.from_dataframe(match_frame, labels)
+
+    assert len(encoded_dataset) == len(row_dataset)
+    for idx in range(len(row_dataset)):
+        for expected, actual in zip(row_dataset[idx], encoded_dataset[idx]):
+            assert torch.equal(expected, actual)
+
+    radiant, dire, batch_labels = encoded_dataset[torch.tensor([1, 0])]
+    assert radiant.shape == dire.shape == (2, 5)
+    assert batch_labels.tolist() == [[0.0], [1.0]]
+
+
+def test_batch_sampler_covers_every_sample_once():
+    """
+    Test that a shuffled epoch visits each index exactly once and respects drop_last.
+    """
+    batches = list(DraftBatchSampler(10, batch_size=4, shuffle=True, seed=0))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sorted(torch.cat(batches).tolist()) == list(range(10))
+
+    batches = list(DraftBatchSampler(10, batch_size=4, drop_last=True))
+    assert [batch.tolist() for batch in batches] == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_batch_sampler_seed_is_reproducible():
+    """
+    Test that two samplers with the same seed produce the same permutations.
+    """
+    first = [batch.tolist() for batch in DraftBatchSampler(32, batch_size=8, shuffle=True, seed=7)]
+    second = [batch.tolist() for batch in DraftBatchSampler(32, batch_size=8, shuffle=True, seed=7)]
+    assert first == second
+
+
+def test_draft_cache_roundtrip(match_frame, tmp_path):
+    """
+    Test that the cache is built once, memory-mapped on reload and rebuilt when the parquet changes.
+    """
+    parquet = tmp_path / "matches.parquet"
+    match_frame.to_parquet(parquet, index=False)
+
+    encoded = load_encoded_drafts(parquet)
+    assert cache_path(parquet).exists()
+    radiant, dire, labels = unpack_encoded(encoded)
+    assert radiant.tolist() == encode_drafts(match_frame["radiant_draft"]).tolist()
+    assert dire.tolist() == encode_drafts(match_frame["dire_draft"]).tolist()
+    assert labels.tolist() == [1.0, 0.0]
+
+    reloaded = load_encoded_drafts(parquet)
+    assert isinstance(reloaded, np.memmap)
+
+    pd.concat([match_frame, match_frame]).to_parquet(parquet, index=False)
+    assert len(load_encoded_drafts(parquet)) == 4
+    assert len(list(tmp_path.glob("*.drafts.npy"))) == 1
+
+
+def test_hash_split_is_stable():
+    """
+    Test that the hash split keeps the test fraction and does not depend on row order.
+    """
+    ids = np.arange(7 * 10**9, 7 * 10**9 + 100_000)
+    mask = in_test_split(ids, 0.2)
+    assert abs(mask.mean() - 0.2) < 0.01
+    assert in_test_split(ids[::-1], 0.2).tolist() == mask[::-1].tolist()
+    assert in_test_split(ids, 0.2, salt=1).tolist() != mask.tolist()
+
+
+def test_streaming_dataset_covers_each_match_once(match_store):
+    """
+    Test that the train and test streams partition the matches, in batches bounded by the buffer.
+    """
+    train = StreamingDraftDataset([match_store], batch_size=16, buffer_size=50, shuffle=True, seed=0)
+    test = StreamingDraftDataset([match_store], batch_size=16, split="test")
+
+    train_batches, test_batches = list(train), list(test)
+    assert all(len(labels) == 16 for _, _, labels in train_batches[:-1])
+    labels = torch.cat([batch[2] for batch in train_batches + test_batches])
+    radiant_wins = (read_matches(match_store)["result"] == "Radiant Victory").sum()
+    assert len(labels) == 400 and labels.sum() == radiant_wins
+    assert sum(len(batch[2]) for batch in test_batches) == test.count()
+    assert train_batches[0][0].dtype == torch.long and train_batches[0][2].shape == (16, 1)
+
+
+def test_streaming_dataset_epochs_reshuffle(match_store):
+    """
+    Test that the shuffle is reproducible for a seed and epoch and changes between epochs.
+    """
+    def first_labels(epoch):
+        dataset = StreamingDraftDataset([match_store], batch_size=32, shuffle=True, seed=3)
+        dataset.set_epoch(epoch)
+        return next(iter(dataset))[2].ravel().tolist()
+
+    assert first_labels(0) == first_labels(0)
+    assert first_labels(0) != first_labels(1)
+
+
+def test_remap_embedding_keeps_rows_by_hero_name():
+    """
+    Test that trained rows follow their hero to its new index and that added heroes start at the mean row.
+    """
+    weight = torch.arange(8, dtype=torch.float32).view(4, 2)  # padding, Axe, Bane, Lina
+    remapped = remap_embedding(weight, ["Axe", "Bane", "Lina"], ["Axe", "Abaddon", "Lina", "Bane"])
+
+    assert remapped[0].equal(weight[0])
+    assert remapped[[1, 3, 4]].equal(weight[[1, 3, 2]])
+    assert remapped[2].equal(weight[1:].mean(dim=0))
+    with pytest.raises(ValueError):
+        remap_embedding(weight, ["Axe", "Bane"], ["Axe"])
+
+
+def test_patch_drafts_are_cached_with_decayed_weights(tmp_path):
+    """
+    Test that several patches are encoded into one array with patch and date columns, and weights by age.
+    """
+    store = tmp_path / "matches"
+    for patch, day, n in [("old", "2025-06-01", 30), ("new", "2025-06-11", 10)]:
+        append_matches([{
+            "id": str(i), "date": day, "duration": "38:02", "result": "Radiant Victory",
+            "game_mode": "All Pick", "skill": "Ranked Matchmaking",
+            "radiant_draft": ["Axe", "Bane", "Lion", "Zeus", "Kez"],
+            "dire_draft": ["Pudge", "Sven", "Luna", "Lina", "Viper"],
+        } for i in range(n)], store, patch=patch, ingest_date=day)
+
+    encoded, weights = load_patch_drafts(["old", "new"], half_life_days=10, store=store)
+    assert encoded.shape == (40, 13) and patch_cache_path(["old", "new"], store).exists()
+    assert encoded[:, PATCH_COL].tolist() == [0] * 30 + [1] * 10
+    assert set(encoded[:30, DAY_COL]) == {20240} and set(encoded[30:, DAY_COL]) == {20250}
+    # 10 days old is half the weight, normalised to a mean of 1
+    np.testing.assert_allclose(weights, [0.8] * 30 + [1.6] * 10, rtol=1e-6)
+    assert len(list(tmp_path.glob("*.weights.npy"))) == 1
+
+    np.testing.assert_allclose(decay_weights(encoded, patch_decay=0.25), [4 / 7] * 30 + [16 / 7] * 10, rtol=1e-6)
+    assert load_patch_drafts(["old", "new"], store=store)[1] is None
+
+
+def test_patch_decay_counts_from_last_requested_patch():
+    """
+    Test that patch age counts from the last requested patch when it has no rows, and that no rows give no weights.
+    """
+    encoded = np.zeros((4, 13), dtype=np.int16)
+    encoded[:, PATCH_COL] = [0, 0, 1, 1]
+    weights = decay_weights(encoded, patch_decay=0.5, last_patch=2)
+    # Patches 0 and 1 are two and one patches old; the weights keep that ratio at a mean of 1
+    np.testing.assert_allclose(weights, [2 / 3, 2 / 3, 4 / 3, 4 / 3], rtol=1e-6)
+    assert decay_weights(encoded[:0], half_life_days=10, patch_decay=0.5, last_patch=2).shape == (0,)
@@ -0,0 +1,15 @@
+import pytest
+
+from d2draftnet.benchmarks import IMPORT_BUDGETS, measure_import
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGETS)
+def test_import_skips_heavy_packages(module):
+    """
+    Test that importing an entry point does not pull in its heavy packages.
+
+    The time budgets depend on the machine and are checked by the imports benchmark instead.
+    """
+    _, forbidden = IMPORT_BUDGETS[module]
+    _, packages = measure_import(module)
+    assert not set(forbidden) & packages, f"{module} imports {sorted(set(forbidden) & packages)}"
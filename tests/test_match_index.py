@@ -0,0 +1,59 @@
+import numpy as np
+
+from d2draftnet.match_index import MatchIdIndex
+from d2draftnet.match_store import append_matches, compact
+from tests.helpers import make_record
+
+
+def test_index_persists_and_merges(tmp_path):
+    """
+    Test that added IDs survive reopening, before and after the log is merged.
+    """
+    index = MatchIdIndex(tmp_path, merge_threshold=5)
+    index.add(["8384021111", "8384021112", 8384021112])
+    assert len(index) == 2
+    assert not (tmp_path / "_match_ids.npy").exists()
+
+    reopened = MatchIdIndex(tmp_path, merge_threshold=5)
+    assert "8384021111" in reopened and 8384021112 in reopened and "8384021113" not in reopened
+
+    reopened.add(range(100, 104))
+    assert (tmp_path / "_match_ids.npy").exists() and not (tmp_path / "_match_ids.log").exists()
+    reopened = MatchIdIndex(tmp_path)
+    assert len(reopened) == 6
+    assert reopened.contains([100, "8384021111", 7]).tolist() == [True, True, False]
+
+
+def test_index_catches_up_with_store(tmp_path):
+    """
+    Test that fragments not yet indexed are read when the index is opened, and compaction keeps it valid.
+    """
+    fragment = append_matches([make_record(i) for i in range(3)], tmp_path, patch="test")
+    index = MatchIdIndex(tmp_path)
+    assert len(index) == 3
+
+    index.add([3, 4], append_matches([make_record(i) for i in range(3, 5)], tmp_path, patch="test"))
+    append_matches([make_record(5)], tmp_path, patch="test")
+    assert compact(tmp_path) == 2
+
+    index = MatchIdIndex(tmp_path)
+    assert index.catch_up() == 0
+    assert index.contains(range(7)).tolist() == [True] * 6 + [False]
+    assert not fragment.exists()
+
+
+def test_index_ignores_torn_log_entry(tmp_path):
+    """
+    Test that a partially written log entry is dropped and re-read from its fragment, and later IDs stay readable.
+    """
+    append_matches([make_record(1)], tmp_path, patch="test")
+    index = MatchIdIndex(tmp_path)
+    with open(tmp_path / "_match_ids.log", "ab") as f:
+        f.write(np.int64(2).tobytes()[:3])
+    index = MatchIdIndex(tmp_path)
+    assert len(index) == 1
+
+    index.add([333, 444])
+    reopened = MatchIdIndex(tmp_path)
+    assert 333 in reopened and 444 in reopened and 1 in reopened
+    assert reopened.logged_ids == {1, 333, 444}
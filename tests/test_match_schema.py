@@ -0,0 +1,108 @@
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from d2draftnet.config import HERO_MAP
+from d2draftnet.match_schema import (
+    HERO_COLUMNS, HEROES_KEY, MATCH_COLUMNS, format_duration, parse_duration, schema_v1, to_v1, to_v2,
+)
+from d2draftnet.match_store import list_fragments, read_table
+from d2draftnet.migrate_schema import is_v1_match_file, migrate_file, migrate_store
+
+RECORDS = [
+    {
+        "id": "8384021111", "date": "2025-07-11", "duration": "45:17", "result": "Radiant Victory",
+        "game_mode": "All Pick", "skill": "Ranked Matchmaking",
+        "radiant_draft": ["Luna", "Windranger", "Ember Spirit", "Pudge", "Muerta"],
+        "dire_draft": ["Rubick", "Templar Assassin", "Juggernaut", "Legion Commander", "Lion"],
+    },
+    {
+        "id": "8384021112", "date": "2025-07-12", "duration": "1:02:33", "result": "Dire Victory",
+        "game_mode": "Single Draft", "skill": "Normal Matchmaking",
+        "radiant_draft": ["Nature's Prophet", "Io", "Kez"],
+        "dire_draft": ["Zeus", "Tiny", "Lich", "Ursa", "Slark"],
+    },
+]
+
+
+def v1_table():
+    """The records as a v1 Arrow table."""
+    return pa.Table.from_pylist(RECORDS, schema=schema_v1())
+
+
+def test_duration_roundtrip():
+    """
+    Test that durations convert to seconds and back, normalising a leading zero.
+    """
+    assert parse_duration("45:17") == 2717
+    assert parse_duration("1:02:33") == 3753
+    assert parse_duration("") is None
+    assert format_duration(parse_duration("06:50")) == "6:50"
+    assert format_duration(3753) == "1:02:33"
+
+
+def test_v2_roundtrip():
+    """
+    Test that v1 -> v2 -> v1 returns the same records and v2 holds typed columns.
+    """
+    v2 = to_v2(v1_table())
+    assert v2.column("id").to_pylist() == [8384021111, 8384021112]
+    assert v2.column("radiant_win").to_pylist() == [True, False]
+    assert v2.column("duration").to_pylist() == [2717, 3753]
+    assert v2.column("radiant_0").to_pylist() == [HERO_MAP["Luna"], HERO_MAP["Nature's Prophet"]]
+    assert v2.column("radiant_4").to_pylist() == [HERO_MAP["Muerta"], 0]
+    assert to_v1(v2).to_pylist() == RECORDS
+    assert to_v1(v2.select(["radiant_win"]), ["result"]).column("result").to_pylist() == ["Radiant Victory", "Dire Victory"]
+
+
+def test_v2_unparseable_dates_are_null():
+    """
+    Test that empty and non-ISO dates convert to null instead of failing the table.
+    """
+    records = [{**RECORDS[0], "date": ""}, {**RECORDS[1], "date": "07/12/2025"}, RECORDS[0]]
+    v2 = to_v2(pa.Table.from_pylist(records, schema=schema_v1()))
+    assert v2.column("date").to_pylist()[:2] == [None, None]
+    assert str(v2.column("date")[2]) == "2025-07-11"
+
+
+def test_migrate_file_and_remap(tmp_path):
+    """
+    Test that a migrated file reads back the same, and indices written with another hero list are remapped.
+    """
+    path = tmp_path / "7_39c_match_data.parquet"
+    pq.write_table(v1_table(), path)
+    assert is_v1_match_file(path)
+    old_size, new_size = migrate_file(path)
+    assert not is_v1_match_file(path)
+    assert read_table(path).to_pylist() == RECORDS
+
+    # Rewrite the hero indices as if "Io" had been first in an older hero list
+    table = pq.read_table(path)
+    heroes = list(HERO_MAP)
+    old_heroes = ["Io"] + [hero for hero in heroes if hero != "Io"]
+    old_index = {hero: i + 1 for i, hero in enumerate(old_heroes)}
+    for column in HERO_COLUMNS:
+        old = [old_index[heroes[i - 1]] if i else 0 for i in table.column(column).to_pylist()]
+        table = table.set_column(table.column_names.index(column), column, pa.array(old, pa.uint8()))
+    metadata = {**table.schema.metadata, HEROES_KEY: json.dumps(old_heroes).encode()}
+    pq.write_table(table.replace_schema_metadata(metadata), path)
+    assert pq.read_table(path).column("radiant_1").to_pylist() != [HERO_MAP["Windranger"], HERO_MAP["Io"]]
+    assert read_table(path).to_pylist() == RECORDS
+
+
+def test_read_mixed_store(tmp_path):
+    """
+    Test that a store with v1 and v2 fragments reads in order, and migrating it changes nothing visible.
+    """
+    partition = tmp_path / "patch=test" / "ingest_date=2025-07-11"
+    partition.mkdir(parents=True)
+    pq.write_table(v1_table().slice(0, 1), partition / "part-00000000000000000001-a.parquet")
+    pq.write_table(to_v2(v1_table().slice(1, 1)), partition / "part-00000000000000000002-b.parquet")
+
+    assert read_table(tmp_path).to_pylist() == RECORDS
+    assert read_table(tmp_path, ["id", "radiant_win"], version=2).column("id").to_pylist() == [8384021111, 8384021112]
+    assert [fragment.name for fragment, _, _ in migrate_store(tmp_path)] == ["part-00000000000000000001-a.parquet"]
+    assert not any(is_v1_match_file(path) for path in list_fragments(tmp_path))
+    assert read_table(tmp_path).to_pylist() == RECORDS
+    assert list(read_table(tmp_path).column_names) == MATCH_COLUMNS
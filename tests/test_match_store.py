@@ -0,0 +1,107 @@
+import pytest
+
+from d2draftnet.draft_cache import cache_path, load_encoded_drafts
+from d2draftnet.match_store import (
+    MATCH_COLUMNS, append_matches, compact, list_fragments, match_source, partition_dir, read_matches, read_patches,
+    read_table,
+)
+from tests.helpers import make_record
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store with three fragments over two ingest dates of patch "test"."""
+    append_matches([make_record(i) for i in range(0, 3)], tmp_path, patch="test", ingest_date="2025-07-10")
+    append_matches([make_record(i) for i in range(3, 5)], tmp_path, patch="test", ingest_date="2025-07-11")
+    append_matches([make_record(i) for i in range(4, 8)], tmp_path, patch="test", ingest_date="2025-07-11")
+    return tmp_path
+
+
+def test_append_writes_new_fragments(store):
+    """
+    Test that appends add fragments and reads return every row in ingest order.
+    """
+    fragments = list_fragments(store)
+    assert len(fragments) == 3
+    assert {path.parent.name for path in fragments} == {"ingest_date=2025-07-10", "ingest_date=2025-07-11"}
+
+    data = read_matches(partition_dir(store, "test"))
+    assert list(data.columns) == MATCH_COLUMNS
+    assert data["id"].tolist() == ["0", "1", "2", "3", "4", "4", "5", "6", "7"]
+    assert list(data["radiant_draft"][0]) == ["Axe", "Bane", "Lion", "Zeus", "Kez"]
+
+
+def test_append_ignores_empty_batches_and_partial_writes(store):
+    """
+    Test that empty batches write nothing and hidden in-progress files are not read.
+    """
+    assert append_matches([], store, patch="test") is None
+    (partition_dir(store, "test", "2025-07-11") / ".part-0.parquet.tmp").write_bytes(b"partial")
+    assert len(read_matches(store)) == 9
+
+
+def test_compact_merges_partitions(store):
+    """
+    Test that compaction leaves one fragment per partition, drops repeated IDs and keeps the order.
+    """
+    assert compact(store) == 1
+    assert len(list_fragments(store)) == 2
+    assert read_matches(store)["id"].tolist() == [str(i) for i in range(8)]
+    assert compact(store) == 0
+
+
+def test_match_source_falls_back_to_legacy_file(tmp_path):
+    """
+    Test that a patch without a partition is read from its legacy parquet file.
+    """
+    assert match_source("test", tmp_path).suffix == ".parquet"
+    append_matches([make_record(1)], tmp_path, patch="test")
+    assert match_source("test", tmp_path) == partition_dir(tmp_path, "test")
+
+
+def test_draft_cache_of_partition(store):
+    """
+    Test that a partition gets a cache that is rebuilt when a fragment is added.
+    """
+    partition = partition_dir(store, "test")
+    assert len(load_encoded_drafts(partition)) == 9
+    assert cache_path(partition).exists()
+    assert len(read_matches(partition)) == 9
+
+    append_matches([make_record(8)], store, patch="test")
+    assert len(load_encoded_drafts(partition)) == 10
+    assert len(list(partition.glob("_*.drafts.npy"))) == 1
+
+
+@pytest.mark.parametrize("filters, ids", [
+    ([("result", "==", "Radiant Victory"), ("id", ">=", "4")], ["5", "7"]),
+    ([[("id", "<", 1)], [("date", ">", "2025-07-11")], [("id", "in", ["6", "7"])]], ["0", "6", "7"]),
+])
+def test_read_filters_v1_and_v2_files(store, tmp_path, filters, ids):
+    """
+    Test that v1-style filters select the same rows from v2 fragments and a v1 file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from d2draftnet.match_schema import schema_v1
+
+    legacy = tmp_path / "legacy.parquet"
+    pq.write_table(pa.Table.from_pylist([make_record(i) for i in range(8)], schema=schema_v1()), legacy)
+
+    compact(store)
+    for source in (partition_dir(store, "test"), legacy):
+        data = read_matches(source, columns=["id", "result"], filters=filters)
+        assert list(data.columns) == ["id", "result"]
+        assert data["id"].tolist() == ids
+
+
+def test_read_patches_as_one_table(store):
+    """
+    Test that several patches are read together with a patch column.
+    """
+    append_matches([make_record(i) for i in range(8, 10)], store, patch="other", ingest_date="2025-07-12")
+    table = read_patches(["test", "other"], columns=["id", "radiant_win"], version=2,
+                         filters=[("skill", "==", "Ranked Matchmaking")], store=store)
+    assert table.column_names == ["id", "radiant_win", "patch"]
+    assert table.column("patch").to_pylist() == ["test"] * 9 + ["other"] * 2
+    assert read_table(store, columns=["id"], version=2).num_rows == 11
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from d2draftnet.match_table import extract_matches, extract_matches_bs4
+from tests.helpers import render_matches_page
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture():
+    """The saved matches page and the records BeautifulSoup extracts from it."""
+    html = (FIXTURES / "dotabuff_matches_page.html").read_text(encoding="utf-8")
+    expected = json.loads((FIXTURES / "dotabuff_matches_page.json").read_text(encoding="utf-8"))
+    return html, expected
+
+
+def test_extract_matches_golden():
+    """
+    Test that both parsers extract the golden records from the saved page.
+    """
+    html, expected = load_fixture()
+    assert extract_matches_bs4(html) == expected
+    assert extract_matches(html) == expected
+
+
+def test_extract_matches_rendered_pages():
+    """
+    Test that both parsers agree on rendered pages, including escaped hero names.
+    """
+    record = {
+        "id": "8384021111",
+        "date": "2025-07-11",
+        "duration": "45:17",
+        "result": "Dire Victory",
+        "game_mode": "All Pick",
+        "skill": "Ranked Matchmaking",
+        "radiant_draft": ["Nature's Prophet", "Anti-Mage", "Io", "Keeper of the Light", "Drow Ranger"],
+        "dire_draft": ["Zeus", "Tiny", "Lich", "Ursa", "Slark"],
+    }
+    html = render_matches_page([record, dict(record, id="8384021112", result="Radiant Victory")])
+    assert extract_matches(html) == extract_matches_bs4(html)
+    assert [r["id"] for r in extract_matches(html)] == ["8384021111", "8384021112"]
+    assert extract_matches(html)[0]["radiant_draft"][0] == "Nature's Prophet"
+
+
+def test_extract_matches_without_table():
+    """
+    Test that a page without a match table yields no records.
+    """
+    html = "<html><body><p>Too many requests</p></body></html>"
+    assert extract_matches(html) == extract_matches_bs4(html) == []
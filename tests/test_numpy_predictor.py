@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from d2draftnet.config import PROJECT_DIR
+from d2draftnet.export_numpy import export_model
+from d2draftnet.match_store import read_table
+from d2draftnet.numpy_predictor import NumpyDraftPredictor
+from d2draftnet.predict_embedding_model import DraftPredictor
+
+PARQUET_FILES = sorted((PROJECT_DIR / "data").glob("*_*_match_data.parquet"))
+
+
+@pytest.fixture(scope="module")
+def predictors(tmp_path_factory):
+    """The torch predictor and a NumPy predictor exported from the same weights."""
+    torch_predictor = DraftPredictor()
+    bundle = export_model(torch_predictor.model, tmp_path_factory.mktemp("bundle") / "model.npz")
+    return torch_predictor, NumpyDraftPredictor(bundle)
+
+
+@pytest.mark.parametrize("parquet_file", PARQUET_FILES, ids=lambda path: path.name)
+def test_numpy_predictor_matches_torch(predictors, parquet_file):
+    """
+    Test that the exported NumPy predictor matches torch over the bundled match data.
+    """
+    torch_predictor, numpy_predictor = predictors
+    data = read_table(parquet_file, ["radiant_draft", "dire_draft"]).to_pandas()
+    np.testing.assert_allclose(
+        numpy_predictor.predict_drafts(data), torch_predictor.predict_drafts(data), atol=1e-5
+    )
+
+
+def test_numpy_predictor_single_draft(predictors):
+    """
+    Test single-draft predictions, including a partial draft.
+    """
+    torch_predictor, numpy_predictor = predictors
+    radiant = ["Lycan", "Enchantress", "Dragon Knight", "Lion", "Ember Spirit"]
+    dire = ["Gyrocopter", "Terrorblade", "Bounty Hunter"]
+    assert numpy_predictor.predict(radiant, dire) == pytest.approx(torch_predictor.predict(radiant, dire), abs=1e-5)
+    assert numpy_predictor.predict_drafts([(radiant, dire)])[0] == pytest.approx(
+        numpy_predictor.predict(radiant, dire), abs=1e-6)
@@ -0,0 +1,46 @@
+import pytest
+
+from d2draftnet.config import HEROS
+from d2draftnet.pick_recommender import PickRecommender
+from d2draftnet.predict_embedding_model import DraftPredictor
+
+RADIANT = ["Lycan", "Enchantress", "Dragon Knight"]
+DIRE = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit"]
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return DraftPredictor()
+
+
+@pytest.fixture(scope="module")
+def recommender(predictor):
+    return PickRecommender(predictor)
+
+
+@pytest.mark.parametrize("side", ["radiant", "dire"])
+def test_recommend_matches_full_forward(predictor, recommender, side):
+    """
+    Test that the batched candidate scores equal a full forward for each candidate draft.
+    """
+    banned = ["Pudge", "Invoker"]
+    recommendations = recommender.recommend(RADIANT, DIRE, side=side, banned=banned, top_k=len(HEROS))
+
+    excluded = set(RADIANT + DIRE + banned)
+    assert {hero for hero, _ in recommendations} == set(HEROS) - excluded
+    assert [p for _, p in recommendations] == sorted((p for _, p in recommendations), reverse=True)
+
+    for hero, probability in recommendations[:5]:
+        if side == "radiant":
+            expected = predictor.predict(RADIANT + [hero], DIRE)
+        else:
+            expected = 1 - predictor.predict(RADIANT, DIRE + [hero])
+        assert probability == pytest.approx(expected, abs=1e-6)
+
+
+def test_recommend_rejects_full_team(recommender):
+    """
+    Test that a team with five heroes cannot be given another pick.
+    """
+    with pytest.raises(ValueError):
+        recommender.recommend(RADIANT, DIRE + ["Tinker"], side="dire")
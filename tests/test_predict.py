@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import torch
+
+from d2draftnet.config import load_data
+from d2draftnet.encoding import encode_drafts
+from d2draftnet.predict_embedding_model import DraftPredictor
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return DraftPredictor()
+
+
+def test_predict_drafts_matches_single_predictions(predictor):
+    """
+    Test that the vectorised batch prediction agrees with one-at-a-time predictions.
+    """
+    data = load_data().head(300)
+    probabilities = predictor.predict_drafts(data, chunk_size=128)
+    expected = [predictor.predict(r, d) for r, d in zip(data["radiant_draft"], data["dire_draft"])]
+
+    assert probabilities.shape == (300,)
+    np.testing.assert_allclose(probabilities, expected, atol=1e-6)
+
+
+def test_predict_drafts_input_forms(predictor):
+    """
+    Test that pairs, separate sides and index arrays give the same result.
+    """
+    data = load_data().head(10)
+    radiant, dire = list(data["radiant_draft"]), list(data["dire_draft"])
+    radiant_idx, dire_idx = encode_drafts(radiant), encode_drafts(dire)
+
+    from_frame = predictor.predict_drafts(data)
+    np.testing.assert_allclose(predictor.predict_drafts(list(zip(radiant, dire))), from_frame)
+    np.testing.assert_allclose(predictor.predict_drafts(radiant, dire), from_frame)
+    np.testing.assert_allclose(predictor.predict_drafts(radiant_idx, dire_idx), from_frame)
+    np.testing.assert_allclose(predictor.predict_drafts(np.hstack([radiant_idx, dire_idx])), from_frame)
+    assert predictor.predict_drafts([]).shape == (0,)
+
+
+def test_team_cache_matches_uncached(predictor):
+    """
+    Test that cached team embeddings give the same predictions and respect the LRU bound.
+    """
+    data = load_data().head(50)
+    radiant = np.repeat(encode_drafts(data["radiant_draft"].head(5)), 50, axis=0)
+    dire = np.tile(encode_drafts(data["dire_draft"]), (5, 1))
+
+    cached = DraftPredictor(team_cache_size=20)
+    expected = predictor.predict_drafts(radiant, dire)
+    np.testing.assert_allclose(cached.predict_drafts(radiant, dire, chunk_size=64), expected, atol=1e-6)
+    assert len(cached.team_cache.vectors) <= 20
+
+    # Hero order within a team does not change the cached embedding
+    np.testing.assert_allclose(cached.predict_drafts(radiant[:, ::-1], dire), expected, atol=1e-6)
+    assert cached.team_cache.hit_rate > 0.5
+
+
+def test_partial_drafts_agree_across_apis(predictor):
+    """
+    Test that a partial draft gets the same probability from single, batched and pick recommender scoring.
+    """
+    from d2draftnet.config import HERO_MAP
+    from d2draftnet.pick_recommender import PickRecommender
+
+    radiant, dire = ["Lycan", "Enchantress", "Lion"], ["Gyrocopter", "Terrorblade"]
+    single = predictor.predict(radiant, dire)
+    assert predictor.predict_drafts([(radiant, dire)])[0] == pytest.approx(single, abs=1e-6)
+    assert DraftPredictor(team_cache_size=8).predict_drafts([(radiant, dire)])[0] == pytest.approx(single, abs=1e-6)
+
+    recommender = PickRecommender(predictor)
+    candidate = torch.tensor([HERO_MAP["Tinker"]])
+    picked = recommender.score_candidates([HERO_MAP[hero] for hero in radiant[:2]], [HERO_MAP[hero] for hero in dire],
+                                          candidate, side="radiant")
+    assert picked.item() == pytest.approx(predictor.predict(radiant[:2] + ["Tinker"], dire), abs=1e-6)
+    assert predictor.predict_drafts([(radiant[:2] + ["Tinker"], dire)])[0] == pytest.approx(picked.item(), abs=1e-6)
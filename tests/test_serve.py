@@ -0,0 +1,57 @@
+import io
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from d2draftnet.predict_embedding_model import DraftPredictor, predict_draft
+from d2draftnet.serve import make_http_server, serve_stdin
+
+RADIANT = ["Lycan", "Enchantress", "Dragon Knight", "Lion", "Ember Spirit"]
+DIRE = ["Gyrocopter", "Terrorblade", "Bounty Hunter", "Earth Spirit", "Tinker"]
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return DraftPredictor()
+
+
+def test_resident_predictor_matches_predict_draft(predictor):
+    """
+    Test that the resident predictor gives the same probability as predict_draft.
+    """
+    assert predictor.predict(RADIANT, DIRE) == pytest.approx(predict_draft(RADIANT, DIRE))
+
+
+def test_serve_stdin(predictor):
+    """
+    Test that each JSON line gets one JSON response, including errors.
+    """
+    stdin = io.StringIO(json.dumps({"radiant": RADIANT, "dire": DIRE}) + "\nnot json\n")
+    stdout = io.StringIO()
+    serve_stdin(predictor, stdin, stdout)
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert responses[0]["radiant_win"] == pytest.approx(predictor.predict(RADIANT, DIRE))
+    assert "error" in responses[1]
+
+
+def test_serve_http(predictor):
+    """
+    Test a POST /predict round trip against the local HTTP server.
+    """
+    server = make_http_server(predictor, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/predict",
+            data=json.dumps({"radiant": RADIANT, "dire": DIRE}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            assert json.loads(response.read())["radiant_win"] == pytest.approx(predictor.predict(RADIANT, DIRE))
+    finally:
+        server.shutdown()
+        server.server_close()
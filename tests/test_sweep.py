@@ -0,0 +1,84 @@
+import json
+
+from d2draftnet.match_store import append_matches, partition_dir
+from d2draftnet.sweep import (
+    BASE_PARAMS, grid_trials, load_results, random_trials, run_settings, run_sweep, trial_id,
+)
+from tests.helpers import make_record
+
+
+def test_grid_trials_fill_base_params():
+    """
+    Test that the grid is the product of the given values with the base model elsewhere.
+    """
+    trials = grid_trials({"embedding_dim": [2, 3], "layers": [[32, 16], [64, 32]]})
+    assert len(trials) == 4
+    assert {(t["embedding_dim"], tuple(t["layers"])) for t in trials} == {(2, (32, 16)), (2, (64, 32)),
+                                                                         (3, (32, 16)), (3, (64, 32))}
+    assert all(t["learning_rate"] == BASE_PARAMS["learning_rate"] for t in trials)
+
+
+def test_random_trials_are_distinct_and_seeded():
+    """
+    Test that random search draws distinct trials, reproducibly, and stops at the space size.
+    """
+    space = {"embedding_dim": [2, 3, 4], "batch_size": [64, 256]}
+    trials = random_trials(space, 4, seed=1)
+    assert len({trial_id(t) for t in trials}) == 4
+    assert trials == random_trials(space, 4, seed=1)
+    assert len(random_trials(space, 10)) == 6
+
+
+def test_trial_id_depends_on_settings():
+    """
+    Test that the same parameters with other epochs or seed are a different trial.
+    """
+    assert trial_id(dict(BASE_PARAMS)) == trial_id({**BASE_PARAMS})
+    assert trial_id(BASE_PARAMS, epochs=5, seed=0) != trial_id(BASE_PARAMS, epochs=10, seed=0)
+
+
+def test_sweep_resumes_from_results(tmp_path):
+    """
+    Test that finished trials are not run again and a torn last line is ignored.
+    """
+    results = tmp_path / "results.jsonl"
+    trials = grid_trials({"embedding_dim": [2, 3]})
+    records = [{"trial_id": trial_id(t, **run_settings(epochs=3, seed=0)), **t, "test_accuracy": 0.5} for t in trials]
+    results.write_text("".join(json.dumps(r) + "\n" for r in records) + '{"trial_id": "tor')
+
+    assert load_results(results) == records
+    assert run_sweep(trials, epochs=3, results_path=results, seed=0) == records
+
+
+def test_sweep_runs_trials_in_pool_and_records_failures(match_store, tmp_path):
+    """
+    Test that trials run in worker processes, and a failing trial is recorded without losing the others.
+    """
+    results = tmp_path / "results.jsonl"
+    good = {**BASE_PARAMS, "embedding_dim": 2, "layers": [4, 2]}
+    bad = {**BASE_PARAMS, "layers": [4, 2, 1]}  # The model takes exactly two layers
+    records = run_sweep([good, bad], epochs=1, results_path=results, max_workers=1, source=match_store)
+
+    by_id = {record["trial_id"]: record for record in records}
+    settings = run_settings(epochs=1, seed=0, source=match_store)
+    finished = by_id[trial_id(good, **settings)]
+    assert 0.0 <= finished["test_accuracy"] <= 1.0 and finished["epochs"] == 1
+    assert "AssertionError" in by_id[trial_id(bad, **settings)]["error"]
+    assert load_results(results) == records and len(records) == 2
+
+
+def test_trial_id_depends_on_data(match_store, tmp_path):
+    """
+    Test that a trial finished on one source and test fraction is not reused for another, but is for the same.
+    """
+    other = tmp_path / "other"
+    append_matches([make_record(i) for i in range(100)], other, patch="test")
+    ids = [trial_id(BASE_PARAMS, **run_settings(1, 0, split, source))
+           for source, split in [(match_store, 0.2), (match_store, 0.5), (partition_dir(other, "test"), 0.2)]]
+    assert len(set(ids)) == 3
+
+    results = tmp_path / "results.jsonl"
+    record = {"trial_id": ids[0], **BASE_PARAMS, "test_accuracy": 0.5}
+    results.write_text(json.dumps(record) + "\n")
+    records = run_sweep([BASE_PARAMS], epochs=1, results_path=results, source=match_store, train_test_split=0.2)
+    assert records == [record]
@@ -0,0 +1,232 @@
+import pytest
+import torch
+
+from d2draftnet.checkpoints import load_checkpoint
+from d2draftnet.config import HERO_MAP, HEROS, current_patch_for_parquet
+from d2draftnet.match_store import append_matches
+from d2draftnet.train_embedding_model import ModelTraining
+from tests.helpers import make_record
+
+
+def make_trainer(source, **options) -> ModelTraining:
+    """A small trainer on source, or on the patches of a store if source is None; models are saved next to the data."""
+    data_dir = source or options["store"]
+    params = dict(embedding_dim=3, dropout_prob=0.0, batch_size=32, learning_rate=1e-2, epochs=3, layers=[8, 4],
+                  train_test_split=0.25, seed=0, source=source, trained_models_dir=data_dir.parent)
+    return ModelTraining(**{**params, **options})
+
+
+def test_resident_engine_trains(match_store):
+    """
+    Test that the resident engine runs whole epochs and reports epoch accuracies.
+    """
+    trainer = make_trainer(match_store, engine="resident")
+    before = trainer.model.embedding.weight.detach().clone()
+    accuracies = trainer.train_model(show_plot=False, verbose=False, return_data=True)
+
+    assert len(accuracies) == 3 and all(0.0 <= accuracy <= 1.0 for accuracy in accuracies)
+    assert not trainer.model.embedding.weight.detach().equal(before)
+    assert 0.0 <= trainer.evaluate_model() <= 1.0
+
+
+def test_resident_engine_options_are_checked(match_store):
+    """
+    Test that unknown engines and the resident engine without encoded data are rejected.
+    """
+    with pytest.raises(ValueError):
+        make_trainer(match_store, engine="turbo")
+    with pytest.raises(ValueError):
+        make_trainer(match_store, engine="resident", streaming=True)
+
+
+@pytest.mark.parametrize("scaling, expected", [(None, 1e-2), ("linear", 5e-3), ("sqrt", 1e-2 * 0.5 ** 0.5)])
+def test_learning_rate_scales_with_batch_size(match_store, scaling, expected):
+    """
+    Test that lr_scaling scales the learning rate by batch_size / base_batch_size, linearly or by its square root.
+    """
+    trainer = make_trainer(match_store, lr_scaling=scaling)
+    assert trainer.scaled_learning_rate() == pytest.approx(expected)
+    assert trainer.optimizer.param_groups[0]["lr"] == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        make_trainer(match_store, lr_scaling="cubic")
+
+
+def test_loader_options_are_gated(match_store):
+    """
+    Test that pin_memory needs CUDA, persistent_workers needs workers, and streaming refuses persistent workers.
+    """
+    trainer = make_trainer(match_store, pin_memory=True, persistent_workers=True)
+    assert trainer.loader_options() == {"num_workers": 0, "pin_memory": torch.cuda.is_available()}
+    trainer.num_workers = 2
+    assert trainer.loader_options()["persistent_workers"] is True
+
+    with pytest.raises(ValueError):
+        make_trainer(match_store, streaming=True, num_workers=2, persistent_workers=True)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_split_sizes_count_every_match(match_store, streaming):
+    """
+    Test that the split sizes cover every match, including streamed splits which have no length.
+    """
+    n_train, n_test = make_trainer(match_store, streaming=streaming).split_sizes()
+    assert n_train + n_test == 400 and 0 < n_test < n_train
+
+
+def test_row_dataset_reads_patches_from_store(match_store):
+    """
+    Test that the unencoded dataset reads its patches from the configured store.
+    """
+    trainer = make_trainer(None, patches=["test"], store=match_store.parent, encoded_dataset=False)
+    assert len(trainer.train_data) + len(trainer.test_data) == 400
+    assert set(trainer.train_data["patch"]) == {"test"}
+
+
+@pytest.mark.parametrize("options", [
+    {}, {"patch_decay": 0.5}, {"encoded_dataset": False}, {"streaming": True},
+], ids=["encoded", "weighted", "rows", "streaming"])
+@pytest.mark.parametrize("filtered", [False, True])
+def test_source_is_read_on_every_branch(match_store, tmp_path, options, filtered):
+    """
+    Test that every dataset branch trains on source, with its filters, rather than the current patch of the store.
+    """
+    decoy = tmp_path / "decoy"
+    append_matches([make_record(i) for i in range(50)], decoy, patch=current_patch_for_parquet)
+    filters = [("id", ">=", 10**9 + 100)] if filtered else None
+    trainer = make_trainer(match_store, store=decoy, filters=filters, **options)
+    assert sum(trainer.split_sizes()) == (300 if filtered else 400)
+
+    with pytest.raises(ValueError):
+        make_trainer(match_store, patches=["test"])
+
+
+def test_num_threads_sets_torch_threads(match_store):
+    """
+    Test that num_threads sets the torch intra-op thread count.
+    """
+    default = torch.get_num_threads()
+    try:
+        make_trainer(match_store, num_threads=2)
+        assert torch.get_num_threads() == 2
+    finally:
+        torch.set_num_threads(default)
+
+
+@pytest.mark.parametrize("engine", ["loader", "resident"])
+def test_history_records_epochs_and_evaluations(match_store, engine):
+    """
+    Test that training records epoch-level metrics, timings and the periodic evaluations.
+    """
+    trainer = make_trainer(match_store, engine=engine, eval_every=4)
+    accuracies = trainer.train_model(show_plot=False, verbose=False, return_data=True)
+
+    history = trainer.history
+    assert [record["epoch"] for record in history.epochs] == [0, 1, 2]
+    assert accuracies == history.series("train", "accuracy")
+    assert all(record["train"]["samples"] == 300 and record["test"]["samples"] == 100 for record in history.epochs)
+    assert set(history.epochs[0]["timings"]) == {"data", "forward", "backward", "optimizer", "evaluation"}
+    # 300 training matches in batches of 32 is 10 steps per epoch
+    assert [record["step"] for record in history.evaluations] == [4, 8, 12, 16, 20, 24, 28]
+    assert history.epochs[-1]["test"]["accuracy"] == trainer.evaluate_model()
+
+    trainer.epochs = 1
+    trainer.train_model(show_plot=False, verbose=False)
+    assert history.epochs[-1]["epoch"] == 3 and history.epochs[-1]["step"] == 40
+
+
+def test_early_stopping_restores_best_epoch(match_store):
+    """
+    Test that training stops once the test log-loss stalls and keeps the best epoch's weights.
+    """
+    trainer = make_trainer(match_store, epochs=50, learning_rate=5e-2, patience=2, min_delta=1e-3)
+    trainer.train_model(show_plot=False, verbose=False)
+
+    stopping = trainer.early_stopping
+    assert len(trainer.history.epochs) == stopping.best_epoch + 3 < 50
+    assert trainer.evaluate_metrics()["log_loss"] == pytest.approx(stopping.best)
+
+
+def test_checkpoints_are_written_and_resumed(match_store, tmp_path):
+    """
+    Test that best and last checkpoints are saved and that a resumed run continues the history.
+    """
+    checkpoint_dir = tmp_path / "checkpoints"
+    trainer = make_trainer(match_store, epochs=2, checkpoint_dir=checkpoint_dir)
+    trainer.train_model(show_plot=False, verbose=False)
+    assert sorted(path.name for path in checkpoint_dir.iterdir()) == ["best.pt", "last.pt"]
+
+    last = load_checkpoint(checkpoint_dir / "last.pt")
+    assert last["epoch"] == 1 and last["step"] == 20 and last["metrics"] == trainer.history.epochs[-1]
+
+    resumed = make_trainer(match_store, epochs=3, checkpoint_dir=checkpoint_dir, resume=True)
+    assert resumed.epochs == 1
+    assert resumed.history.epochs == trainer.history.epochs
+    for name, value in trainer.model.state_dict().items():
+        assert resumed.model.state_dict()[name].equal(value)
+
+    resumed.train_model(show_plot=False, verbose=False)
+    assert [record["epoch"] for record in resumed.history.epochs] == [0, 1, 2]
+    assert load_checkpoint(checkpoint_dir / "last.pt")["step"] == 30
+
+    with pytest.raises(ValueError):
+        make_trainer(match_store, embedding_dim=4, checkpoint_dir=checkpoint_dir, resume=True)
+
+
+def test_save_model_does_not_prompt(match_store, tmp_path):
+    """
+    Test that save_model with an explicit overwrite choice never asks.
+    """
+    trainer = make_trainer(match_store)
+    path = tmp_path / "model.pth"
+    trainer.save_model(path, overwrite=False)
+    assert path.exists()
+    trainer.save_model(path, overwrite=True)
+    assert set(load_checkpoint(path)) == set(trainer.model.state_dict())
+
+
+def test_warm_start_grows_embedding_for_new_heroes(match_store, tmp_path):
+    """
+    Test that a warm start keeps the trained rows of every known hero and adds rows for new ones.
+    """
+    trainer = make_trainer(match_store, epochs=1)
+    trainer.train_model(show_plot=False, verbose=False)
+    # The same model as if it had been trained before the last hero was added
+    new_hero = HEROS[-1]
+    state = {name: value.clone() for name, value in trainer.model.state_dict().items()}
+    state["embedding.weight"] = state["embedding.weight"][:-1]
+    path = tmp_path / "previous.pth"
+    torch.save(state, path)
+
+    with pytest.raises(ValueError):
+        make_trainer(match_store, warm_start=path)
+    warm = make_trainer(match_store, warm_start=path, warm_start_heroes=HEROS[:-1])
+    weight = warm.model.embedding.weight.detach()
+    assert weight[:-1].equal(state["embedding.weight"])
+    assert weight[HERO_MAP[new_hero]].equal(state["embedding.weight"][1:].mean(dim=0))
+    assert warm.model.fc[0].weight.equal(trainer.model.fc[0].weight)
+
+    # Checkpoints carry their hero list
+    checkpointed = make_trainer(match_store, epochs=1, checkpoint_dir=tmp_path / "checkpoints")
+    checkpointed.train_model(show_plot=False, verbose=False)
+    warm = make_trainer(match_store, warm_start=tmp_path / "checkpoints" / "last.pt")
+    assert warm.model.embedding.weight.equal(checkpointed.model.embedding.weight)
+
+
+@pytest.mark.parametrize("engine", ["loader", "resident"])
+def test_sample_weights_scale_the_training_loss(match_store, engine):
+    """
+    Test that decayed sample weights reach the loss of each training batch and leave the test split unweighted.
+    """
+    trainer = make_trainer(None, patches=["test"], store=match_store.parent, patch_decay=0.5, engine=engine)
+    assert trainer.test_data.weights is None
+    radiant, dire, labels, weights = next(iter(trainer._resident_batches() if engine == "resident"
+                                               else trainer.train_loader))
+    _, loss = trainer._forward_loss(radiant, dire, labels, weights)
+    _, unweighted = trainer._forward_loss(radiant, dire, labels)
+    # A single patch of a single day has every weight at 1
+    assert weights.eq(1).all() and loss.item() == pytest.approx(unweighted.item())
+    assert trainer._forward_loss(radiant, dire, labels, 2 * weights)[1].item() == pytest.approx(2 * loss.item())
+    trainer.train_model(show_plot=False, verbose=False)
+
+    with pytest.raises(ValueError):
+        make_trainer(match_store, half_life_days=30, streaming=True)
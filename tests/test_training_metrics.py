@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import torch
+
+from d2draftnet.training_metrics import MetricAccumulator, TrainingHistory
+
+
+@pytest.mark.parametrize("flush_size", [1 << 20, 7])
+def test_accumulator_matches_direct_metrics(flush_size):
+    """
+    Test that metrics accumulated over batches equal the metrics of all predictions at once.
+    """
+    rng = np.random.default_rng(0)
+    p = rng.uniform(0.01, 0.99, 100)
+    y = (rng.uniform(size=100) < p).astype(float)
+
+    metrics = MetricAccumulator(flush_size=flush_size)
+    for start in range(0, 100, 16):
+        batch_p = torch.tensor(p[start:start + 16], dtype=torch.float32).view(-1, 1)
+        batch_y = torch.tensor(y[start:start + 16], dtype=torch.float32).view(-1, 1)
+        metrics.update(batch_p, batch_y, torch.nn.functional.binary_cross_entropy(batch_p, batch_y))
+    result = metrics.compute()
+
+    log_loss = -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+    assert result["samples"] == 100
+    assert result["accuracy"] == pytest.approx(np.mean((p > 0.5) == y))
+    assert result["log_loss"] == pytest.approx(log_loss, rel=1e-5)
+    assert result["loss"] == pytest.approx(log_loss, rel=1e-5)
+    assert result["brier"] == pytest.approx(np.mean((p - y) ** 2), rel=1e-5)
+
+
+def test_history_series():
+    """
+    Test that series() reads one metric per epoch, None where a split was not evaluated.
+    """
+    history = TrainingHistory()
+    history.add_epoch(0, 10, {"accuracy": 0.5}, None, {"data": 0.1})
+    history.add_epoch(1, 20, {"accuracy": 0.6}, {"accuracy": 0.55}, {"data": 0.1})
+    assert history.series("train", "accuracy") == [0.5, 0.6]
+    assert history.series("test", "accuracy") == [None, 0.55]